@@ -0,0 +1,225 @@
+"""
+HTTP API for the SAR AI Copilot case service.
+
+Responsibilities:
+- Expose case CRUD, status transitions and SAR drafting over HTTP
+- Queue drafting jobs and report their status for polling
+- Share one consistent case store between UI replicas and workers
+
+Run with:
+    uvicorn backend.api.app:app --host 0.0.0.0 --port 8000
+    python -m backend.jobs.worker --processes 4
+"""
+
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from backend.cases.service import CaseNotFound, build_default_service
+from backend.cases.state import InvalidTransition, StaleCaseVersion
+
+
+class CaseCreate(BaseModel):
+    customer_id: str
+    customer_name: str
+    risk_score: float
+    alert_reason: str
+    transaction_summary: str
+    jurisdiction: Optional[str] = None
+    status: str = "NEW"
+
+
+class AlertIn(CaseCreate):
+    # Triggering transactions ({source, target, amount, channel}, optionally
+    # tx_id, timestamp, country) and the customer's linked accounts, used to
+    # fingerprint the alert and, with Postgres, appended to the ledger
+    transactions: Optional[List[Dict[str, Any]]] = None
+    linked_accounts: Optional[List[str]] = None
+    actor: str = "intake"
+
+
+class CaseUpdate(BaseModel):
+    expected_version: Optional[int] = None
+    customer_name: Optional[str] = None
+    risk_score: Optional[float] = None
+    alert_reason: Optional[str] = None
+    transaction_summary: Optional[str] = None
+    jurisdiction: Optional[str] = None
+
+
+class TransitionRequest(BaseModel):
+    status: str
+    actor: str = "api"
+    expected_version: Optional[int] = None
+
+
+class DraftRequest(BaseModel):
+    actor: str = "api"
+
+
+app = FastAPI(title="SAR AI Copilot Case Service")
+service = build_default_service()
+
+
+def _get_or_404(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except CaseNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except StaleCaseVersion as exc:
+        raise HTTPException(status_code=409, detail={"code": "stale_version", "message": str(exc)})
+    except InvalidTransition as exc:
+        raise HTTPException(status_code=409, detail={"code": "invalid_transition", "message": str(exc)})
+
+
+@app.get("/health")
+def health() -> Dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/memory")
+def memory_usage() -> Dict[str, Any]:
+    return service.memory_usage()
+
+
+@app.get("/cases")
+def list_cases(
+    status: Optional[str] = None,
+    band: Optional[str] = None,
+    search: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 25,
+    sort_by: str = "case_id",
+    descending: bool = False,
+) -> Dict[str, Any]:
+    try:
+        page = service.query(
+            status=status,
+            band=band,
+            search=search,
+            offset=offset,
+            limit=min(limit, 200),
+            sort_by=sort_by,
+            descending=descending,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return asdict(page)
+
+
+@app.get("/cases/counts")
+def case_counts() -> Dict[str, Any]:
+    return asdict(service.counts())
+
+
+@app.post("/cases", status_code=201)
+def create_case(body: CaseCreate) -> Dict[str, Any]:
+    return service.create(body.model_dump())
+
+
+@app.post("/alerts")
+def ingest_alert(body: AlertIn) -> Dict[str, Any]:
+    alert = body.model_dump(exclude={"actor"}, exclude_none=True)
+    return service.ingest_alert(alert, actor=body.actor)
+
+
+@app.get("/cases/{case_id}")
+def get_case(case_id: int) -> Dict[str, Any]:
+    return _get_or_404(service.get, case_id)
+
+
+@app.get("/cases/{case_id}/context")
+def get_case_context(case_id: int) -> Dict[str, Any]:
+    return _get_or_404(service.get_context, case_id)
+
+
+@app.get("/cases/{case_id}/attributions")
+def get_case_attributions(case_id: int) -> Dict[str, Any]:
+    attributions = _get_or_404(service.get_attributions, case_id)
+    if attributions is None:
+        raise HTTPException(status_code=404, detail=f"No attributions computed for case {case_id}")
+    return attributions
+
+
+@app.patch("/cases/{case_id}")
+def update_case(case_id: int, body: CaseUpdate) -> Dict[str, Any]:
+    changes = body.model_dump(exclude_none=True)
+    expected_version = changes.pop("expected_version", None)
+    return _get_or_404(service.update, case_id, changes, expected_version=expected_version)
+
+
+@app.get("/cases/{case_id}/cluster")
+def get_case_cluster(case_id: int) -> List[int]:
+    return _get_or_404(service.case_cluster, case_id)
+
+
+@app.post("/cases/{case_id}/transitions")
+def transition_case(case_id: int, body: TransitionRequest) -> Dict[str, Any]:
+    return _get_or_404(
+        service.transition,
+        case_id,
+        body.status,
+        actor=body.actor,
+        expected_version=body.expected_version,
+    )
+
+
+@app.post("/cases/{case_id}/sar", status_code=202)
+def draft_sar(case_id: int, body: DraftRequest) -> Dict[str, Any]:
+    """Queue a SAR draft; poll /jobs/{job_id} for completion."""
+    return _get_or_404(service.enqueue_draft, case_id, actor=body.actor)
+
+
+@app.get("/cases/{case_id}/sar/job")
+def latest_sar_job(case_id: int) -> Dict[str, Any]:
+    job = service.latest_job(case_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No SAR job for case {case_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int) -> Dict[str, Any]:
+    job = service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.get("/cases/{case_id}/sar")
+def latest_sar(case_id: int) -> Dict[str, Any]:
+    draft = _get_or_404(service.latest_draft, case_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail=f"No SAR draft for case {case_id}")
+    return draft
+
+
+@app.get("/cases/{case_id}/audit/verify")
+def verify_audit(case_id: int, full: bool = False) -> Dict[str, Any]:
+    result = _get_or_404(service.verify_audit, case_id, full)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Audit log is not enabled")
+    return result
+
+
+@app.get("/cases/{case_id}/traces")
+def list_traces(case_id: int) -> List[Dict[str, Any]]:
+    return _get_or_404(service.list_traces, case_id)
+
+
+@app.get("/cases/{case_id}/traces/diff")
+def diff_traces(case_id: int, from_version: int, to_version: Optional[int] = None) -> Dict[str, Any]:
+    diff = _get_or_404(service.diff_traces, case_id, from_version, to_version)
+    if diff is None:
+        raise HTTPException(status_code=404, detail=f"Trace versions not found for case {case_id}")
+    return diff
+
+
+@app.post("/cases/{case_id}/traces/{version}/replay")
+def replay_trace(case_id: int, version: int, body: DraftRequest) -> Dict[str, Any]:
+    replay = _get_or_404(service.replay_trace, case_id, version, actor=body.actor)
+    if replay is None:
+        raise HTTPException(status_code=404, detail=f"No replayable trace v{version} for case {case_id}")
+    return replay
@@ -0,0 +1,129 @@
+"""
+HTTP client for the SAR AI Copilot case service.
+
+Mirrors the CaseService interface so the Streamlit UI can switch between
+an in-process service and a remote one without code changes.
+"""
+
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from backend.cases.repository import CasePage, CaseCounts
+from backend.cases.service import CaseNotFound
+from backend.cases.state import InvalidTransition, StaleCaseVersion
+
+
+class CaseServiceClient:
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _request(self, method: str, path: str, **kwargs):
+        response = self.session.request(
+            method,
+            f"{self.base_url}{path}",
+            timeout=self.timeout,
+            **kwargs,
+        )
+        if response.status_code == 404:
+            raise CaseNotFound(response.json().get("detail", path))
+        if response.status_code == 409:
+            detail = response.json().get("detail", {})
+            error = StaleCaseVersion if detail.get("code") == "stale_version" else InvalidTransition
+            raise error(detail.get("message", path))
+        response.raise_for_status()
+        return response.json()
+
+    def counts(self) -> CaseCounts:
+        return CaseCounts(**self._request("GET", "/cases/counts"))
+
+    def query(self, **filters) -> CasePage:
+        params = {k: v for k, v in filters.items() if v is not None}
+        return CasePage(**self._request("GET", "/cases", params=params))
+
+    def get(self, case_id: int) -> Dict[str, Any]:
+        return self._request("GET", f"/cases/{case_id}")
+
+    def get_context(self, case_id: int) -> Dict[str, Any]:
+        return self._request("GET", f"/cases/{case_id}/context")
+
+    def get_attributions(self, case_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return self._request("GET", f"/cases/{case_id}/attributions")
+        except CaseNotFound:
+            return None
+
+    def create(self, case: Dict[str, Any], actor: str = "ui") -> Dict[str, Any]:
+        return self._request("POST", "/cases", json=case)
+
+    def ingest_alert(self, alert: Dict[str, Any], actor: str = "intake") -> Dict[str, Any]:
+        return self._request("POST", "/alerts", json=dict(alert, actor=actor))
+
+    def case_cluster(self, case_id: int) -> List[int]:
+        return self._request("GET", f"/cases/{case_id}/cluster")
+
+    def update(
+        self,
+        case_id: int,
+        changes: Dict[str, Any],
+        actor: str = "ui",
+        expected_version: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        return self._request("PATCH", f"/cases/{case_id}", json=dict(changes, expected_version=expected_version))
+
+    def transition(
+        self,
+        case_id: int,
+        status: str,
+        actor: str = "ui",
+        expected_version: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        return self._request(
+            "POST",
+            f"/cases/{case_id}/transitions",
+            json={"status": status, "actor": actor, "expected_version": expected_version},
+        )
+
+    def enqueue_draft(self, case_id: int, actor: str = "ui") -> Dict[str, Any]:
+        return self._request("POST", f"/cases/{case_id}/sar", json={"actor": actor})
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return self._request("GET", f"/jobs/{job_id}")
+        except CaseNotFound:
+            return None
+
+    def latest_job(self, case_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return self._request("GET", f"/cases/{case_id}/sar/job")
+        except CaseNotFound:
+            return None
+
+    def latest_draft(self, case_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return self._request("GET", f"/cases/{case_id}/sar")
+        except CaseNotFound:
+            return None
+
+    def memory_usage(self) -> Dict[str, Any]:
+        return self._request("GET", "/memory")
+
+    def list_traces(self, case_id: int) -> List[Dict[str, Any]]:
+        return self._request("GET", f"/cases/{case_id}/traces")
+
+    def diff_traces(self, case_id: int, from_version: int, to_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        params = {"from_version": from_version}
+        if to_version is not None:
+            params["to_version"] = to_version
+        try:
+            return self._request("GET", f"/cases/{case_id}/traces/diff", params=params)
+        except CaseNotFound:
+            return None
+
+    def replay_trace(self, case_id: int, version: int, actor: str = "ui") -> Optional[Dict[str, Any]]:
+        try:
+            return self._request("POST", f"/cases/{case_id}/traces/{version}/replay", json={"actor": actor})
+        except CaseNotFound:
+            return None
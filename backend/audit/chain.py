@@ -0,0 +1,306 @@
+"""
+Tamper-evident audit log verification for SAR AI Copilot.
+
+Responsibilities:
+- Mirror the per-case hash chain stamped by the audit_logs trigger
+  (backend/db/postgres.py) so entries can be re-hashed independently
+- Build Merkle checkpoints over chain segments (per case) and over whole
+  days, and issue O(log n) inclusion proofs against them
+- Verify a case incrementally: only entries after the latest checkpoint
+  are re-hashed, anchored on that checkpoint's head hash
+
+Run periodically and on demand:
+    python -m backend.audit.chain checkpoint
+    python -m backend.audit.chain verify --case 3
+    python -m backend.audit.chain verify-day --day 2026-02-01
+    python -m backend.audit.chain prove --entry 1042
+"""
+
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+GENESIS_HASH = "0" * 64
+
+
+def entry_payload(prev_hash: str, case_id: Optional[int], seq: int, action: Optional[str],
+                  details_text: Optional[str], created_at_text: Optional[str]) -> str:
+    """Byte-for-byte the concat_ws('|', ...) hashed by chain_audit_log()."""
+    return "|".join([
+        prev_hash,
+        "" if case_id is None else str(case_id),
+        str(seq),
+        action or "",
+        details_text or "",
+        created_at_text or "",
+    ])
+
+
+def entry_hash(row: Dict[str, Any]) -> str:
+    payload = entry_payload(
+        row["prev_hash"], row["case_id"], row["seq"], row["action"], row["details_text"], row["created_at_text"]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# -------------------------------
+# Merkle trees
+# -------------------------------
+def _node(left: str, right: str) -> str:
+    return hashlib.sha256(bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _next_level(level: List[str]) -> List[str]:
+    # An odd node out is promoted unchanged
+    return [_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+
+
+def merkle_root(leaves: List[str]) -> str:
+    if not leaves:
+        return GENESIS_HASH
+    level = list(leaves)
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_proof(leaves: List[str], index: int) -> List[Tuple[str, str]]:
+    """Sibling path for ``leaves[index]`` as (side, hash) pairs, leaf to root."""
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("left" if sibling < index else "right", level[sibling]))
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: str, proof: List[Tuple[str, str]], root: str) -> bool:
+    node = leaf
+    for side, sibling in proof:
+        node = _node(sibling, node) if side == "left" else _node(node, sibling)
+    return node == root
+
+
+# -------------------------------
+# Verification
+# -------------------------------
+@dataclass
+class VerificationResult:
+    ok: bool
+    scope: str
+    scope_key: str
+    checked: int
+    anchored_at: int = 0
+    first_bad_ref: Optional[int] = None
+    reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def verify_chain(rows: List[Dict[str, Any]], start_hash: str, start_seq: int) -> Tuple[bool, int, Optional[int], Optional[str]]:
+    """
+    Re-hash consecutive chain entries from a trusted ``start_hash``.
+    Returns (ok, checked, first_bad_seq, reason).
+    """
+    prev, expected_seq = start_hash, start_seq + 1
+    for checked, row in enumerate(rows):
+        if row["seq"] != expected_seq:
+            return False, checked, expected_seq, "missing entry"
+        if row["prev_hash"] != prev:
+            return False, checked, row["seq"], "broken link"
+        if entry_hash(row) != row["entry_hash"]:
+            return False, checked, row["seq"], "entry modified"
+        prev, expected_seq = row["entry_hash"], expected_seq + 1
+    return True, len(rows), None, None
+
+
+class AuditChain:
+    """Checkpointing and verification over a PostgresClient's audit tables."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _latest_case_checkpoint(self, case_id: int) -> Optional[Dict[str, Any]]:
+        checkpoints = self.client.audit_checkpoints("case", str(case_id))
+        return checkpoints[-1] if checkpoints else None
+
+    # -------------------------------
+    # Checkpoints
+    # -------------------------------
+    def checkpoint_case(self, case_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Verify the entries since the last checkpoint and seal them under a
+        new Merkle root. Returns None if there is nothing new.
+        """
+        last = self._latest_case_checkpoint(case_id)
+        start_seq = last["last_ref"] if last else 0
+        start_hash = last["head_hash"] if last else GENESIS_HASH
+
+        rows = self.client.audit_entries(case_id, from_seq=start_seq + 1)
+        if not rows:
+            return None
+        ok, _, bad_seq, reason = verify_chain(rows, start_hash, start_seq)
+        if not ok:
+            raise ValueError(f"Case {case_id} audit chain invalid at seq {bad_seq}: {reason}")
+
+        checkpoint = {
+            "scope": "case",
+            "scope_key": str(case_id),
+            "first_ref": start_seq + 1,
+            "last_ref": rows[-1]["seq"],
+            "leaf_count": len(rows),
+            "merkle_root": merkle_root([r["entry_hash"] for r in rows]),
+            "head_hash": rows[-1]["entry_hash"],
+            "prev_root": last["merkle_root"] if last else None,
+        }
+        checkpoint["id"] = self.client.save_audit_checkpoint(checkpoint)
+        return checkpoint
+
+    def checkpoint_all(self) -> List[Dict[str, Any]]:
+        return [cp for cp in map(self.checkpoint_case, self.client.audit_cases_behind_checkpoint()) if cp]
+
+    def checkpoint_day(self, day: str) -> Optional[Dict[str, Any]]:
+        rows = self.client.audit_entries_for_day(day)
+        if not rows:
+            return None
+        bad = next((r for r in rows if entry_hash(r) != r["entry_hash"]), None)
+        if bad is not None:
+            raise ValueError(f"Audit entry {bad['id']} on {day} was modified")
+        checkpoint = {
+            "scope": "day",
+            "scope_key": day,
+            "first_ref": rows[0]["id"],
+            "last_ref": rows[-1]["id"],
+            "leaf_count": len(rows),
+            "merkle_root": merkle_root([r["entry_hash"] for r in rows]),
+            "head_hash": None,
+            "prev_root": None,
+        }
+        checkpoint["id"] = self.client.save_audit_checkpoint(checkpoint)
+        return checkpoint
+
+    # -------------------------------
+    # Verification
+    # -------------------------------
+    def verify_case(self, case_id: int, full: bool = False) -> VerificationResult:
+        """
+        Incremental by default: sealed segments are trusted and only the tail
+        after the latest checkpoint is re-hashed. ``full`` re-hashes
+        everything and re-derives every checkpoint root.
+        """
+        checkpoints = self.client.audit_checkpoints("case", str(case_id))
+        head = self.client.audit_head(case_id)
+
+        if full or not checkpoints:
+            rows = self.client.audit_entries(case_id)
+            ok, checked, bad_seq, reason = verify_chain(rows, GENESIS_HASH, 0)
+            if ok:
+                by_seq = {r["seq"]: r["entry_hash"] for r in rows}
+                for cp in checkpoints:
+                    leaves = [by_seq.get(s) for s in range(cp["first_ref"], cp["last_ref"] + 1)]
+                    if None in leaves or merkle_root(leaves) != cp["merkle_root"]:
+                        ok, bad_seq, reason = False, cp["first_ref"], f"checkpoint {cp['id']} root mismatch"
+                        break
+            anchored_at = 0
+        else:
+            last = checkpoints[-1]
+            anchor = self.client.audit_entries(case_id, from_seq=last["last_ref"], to_seq=last["last_ref"])
+            # Re-hash the anchor row: its stored entry_hash alone would let an
+            # edited sealed row through
+            if not anchor or entry_hash(anchor[0]) != last["head_hash"] or anchor[0]["entry_hash"] != last["head_hash"]:
+                return VerificationResult(False, "case", str(case_id), 0, last["last_ref"], last["last_ref"],
+                                          "checkpoint head does not match stored entry")
+            rows = self.client.audit_entries(case_id, from_seq=last["last_ref"] + 1)
+            ok, checked, bad_seq, reason = verify_chain(rows, last["head_hash"], last["last_ref"])
+            anchored_at = last["last_ref"]
+
+        if ok and head is not None:
+            last_hash = rows[-1]["entry_hash"] if rows else (checkpoints[-1]["head_hash"] if checkpoints else GENESIS_HASH)
+            if head["head_hash"] != last_hash:
+                ok, bad_seq, reason = False, head["seq"], "chain head mismatch (truncated log?)"
+
+        return VerificationResult(ok, "case", str(case_id), checked, anchored_at, bad_seq, reason)
+
+    def verify_day(self, day: str) -> VerificationResult:
+        checkpoints = self.client.audit_checkpoints("day", day)
+        rows = self.client.audit_entries_for_day(day)
+        for checked, row in enumerate(rows):
+            if entry_hash(row) != row["entry_hash"]:
+                return VerificationResult(False, "day", day, checked, first_bad_ref=row["id"], reason="entry modified")
+        if checkpoints:
+            cp = checkpoints[-1]
+            sealed = [r["entry_hash"] for r in rows if cp["first_ref"] <= r["id"] <= cp["last_ref"]]
+            if len(sealed) != cp["leaf_count"] or merkle_root(sealed) != cp["merkle_root"]:
+                return VerificationResult(False, "day", day, len(rows), reason="day checkpoint root mismatch")
+        return VerificationResult(True, "day", day, len(rows))
+
+    def prove_entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Inclusion proof of one entry against the case checkpoint that seals it."""
+        entry = self.client.audit_entry(entry_id)
+        if entry is None or entry["seq"] is None:
+            return None
+        case_id = entry["case_id"] or 0
+        checkpoint = next(
+            (cp for cp in self.client.audit_checkpoints("case", str(case_id))
+             if cp["first_ref"] <= entry["seq"] <= cp["last_ref"]),
+            None,
+        )
+        if checkpoint is None:
+            return None
+        leaves = self.client.audit_hashes(case_id, checkpoint["first_ref"], checkpoint["last_ref"])
+        leaf = entry_hash(entry)
+        proof = merkle_proof(leaves, entry["seq"] - checkpoint["first_ref"])
+        return {
+            "entry_id": entry_id,
+            "case_id": case_id,
+            "seq": entry["seq"],
+            "leaf": leaf,
+            "proof": proof,
+            "checkpoint_id": checkpoint["id"],
+            "merkle_root": checkpoint["merkle_root"],
+            "valid": verify_proof(leaf, proof, checkpoint["merkle_root"]),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint and verify the hash-chained audit log")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("checkpoint", help="Seal new entries of every case under Merkle checkpoints")
+    verify_cmd = commands.add_parser("verify", help="Verify one case's audit history")
+    verify_cmd.add_argument("--case", type=int, required=True)
+    verify_cmd.add_argument("--full", action="store_true")
+    day_cmd = commands.add_parser("verify-day", help="Verify (and optionally seal) one day")
+    day_cmd.add_argument("--day", required=True, help="YYYY-MM-DD")
+    day_cmd.add_argument("--seal", action="store_true")
+    prove_cmd = commands.add_parser("prove", help="Inclusion proof for one audit entry")
+    prove_cmd.add_argument("--entry", type=int, required=True)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from backend.db.postgres import PostgresClient
+
+    load_dotenv()
+    chain = AuditChain(PostgresClient())
+
+    if args.command == "checkpoint":
+        sealed = chain.checkpoint_all()
+        print(f"Sealed {sum(cp['leaf_count'] for cp in sealed)} entries across {len(sealed)} cases")
+    elif args.command == "verify":
+        print(json.dumps(chain.verify_case(args.case, full=args.full).to_dict(), indent=2))
+    elif args.command == "verify-day":
+        result = chain.verify_day(args.day)
+        if result.ok and args.seal:
+            chain.checkpoint_day(args.day)
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(json.dumps(chain.prove_entry(args.entry), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+Case context snapshots for SAR AI Copilot.
+
+Responsibilities:
+- Lazily load the facts behind a case (profile, transactions, timeline,
+  exposure metrics, screening, traced fund flows, peer statistics)
+- Memoize each source per case version with its own TTL and load missing sources
+  concurrently
+- Serialize everything into one snapshot shared by the UI, the SAR prompt
+  and the explainability trace
+
+Sources are plain callables, so demo data, Postgres queries or external
+screening APIs can be swapped in without touching consumers. Sources whose
+name starts with an underscore are shared loaders other sources depend on
+(e.g. the single Postgres detail query); they stay out of the snapshot.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Optional, List, Tuple
+
+from backend.cases.demo import DEMO_AS_OF, DEMO_PROFILES, DEMO_TRANSACTIONS
+from backend.graph.transactions import GraphTraceCache, Transfer, TransactionGraph
+from backend.memory import MemoryBudget, approx_size
+
+# A source takes the case dict plus already-loaded dependencies
+SourceFn = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+
+@dataclass
+class ContextSource:
+    name: str
+    load: SourceFn
+    ttl_seconds: float = 300.0
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class CaseContext:
+    case: Dict[str, Any]
+    data: Dict[str, Any]
+    built_at: datetime = field(default_factory=datetime.utcnow)
+    _serialized: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+    @property
+    def case_id(self) -> int:
+        return self.case["case_id"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe snapshot, serialized once and reused by every consumer."""
+        if self._serialized is None:
+            facts = {k: v for k, v in self.data.items() if not k.startswith("_")}
+            self._serialized = json.loads(json.dumps(
+                {"case": self.case, "built_at": self.built_at.isoformat(), **facts},
+                default=str,
+            ))
+        return self._serialized
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash; changes whenever any underlying fact changes."""
+        snapshot = dict(self.to_dict())
+        snapshot.pop("built_at", None)
+        # Workflow bookkeeping is not a fact about the customer
+        snapshot["case"] = {k: v for k, v in snapshot["case"].items() if k not in ("status", "version")}
+        return hashlib.sha256(json.dumps(snapshot, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def to_sar_input(self):
+        from backend.llm.model import SARInput
+
+        data = self.to_dict()
+        profile = dict(data.get("profile") or {})
+        profile.update({
+            "customer_id": self.case["customer_id"],
+            "customer_name": self.case["customer_name"],
+            "risk_score": self.case["risk_score"],
+        })
+        transaction_summary = {
+            "summary": self.case["transaction_summary"],
+            "exposure": data.get("exposure"),
+            "timeline": data.get("timeline"),
+            "screening": data.get("screening"),
+        }
+        flows = (data.get("flows") or {}).get("summary")
+        if flows:
+            transaction_summary["traced_flows"] = flows
+        return SARInput(
+            customer_profile=profile,
+            transaction_summary=transaction_summary,
+            alert_reason=self.case["alert_reason"],
+            jurisdiction=self.case.get("jurisdiction") or profile.get("home_country"),
+        )
+
+    def to_signals(self) -> Dict[str, Any]:
+        """Input signals recorded on the explainability trace."""
+        data = self.to_dict()
+        return {
+            "risk_score": self.case["risk_score"],
+            "exposure": data.get("exposure"),
+            "screening": data.get("screening"),
+            "flows": data.get("flows"),
+            "context_fingerprint": self.fingerprint,
+        }
+
+
+class CaseContextBuilder:
+    """
+    Memoizing, concurrent loader for case context snapshots.
+
+    Each (case, source) result is cached for the case version it was
+    loaded from, until its TTL expires. A snapshot is rebuilt only when the
+    case version changes or a source expires.
+    Under a memory ``budget`` the least recently loaded cases are dropped
+    first (they are simply reloaded when opened again).
+    """
+
+    name = "case_context"
+
+    def __init__(self, sources: List[ContextSource], max_workers: int = 4, budget: Optional[MemoryBudget] = None):
+        self.sources = {s.name: s for s in sources}
+        # (case_id, source) -> (case version, expiry, value)
+        self._memo: Dict[Tuple[int, str], Tuple[Any, float, Any]] = {}
+        self._sizes: Dict[Tuple[int, str], int] = {}
+        self._bytes = 0
+        self._evictions = 0
+        self._snapshots: Dict[int, Tuple[Any, float, CaseContext]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="case-context")
+        self.budget = budget
+        if budget is not None:
+            budget.register(self)
+            # Flow analyses behind the "flows" source share the budget
+            _flow_cache.register(budget)
+
+    def _cached(self, case_id: int, version, name: str, now: float):
+        entry = self._memo.get((case_id, name))
+        if entry and entry[0] == version and entry[1] > now:
+            return True, entry[2]
+        return False, None
+
+    def _closure(self, names) -> List[str]:
+        """``names`` plus everything they depend on, in source order."""
+        needed, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.sources[name].depends_on)
+        return [n for n in self.sources if n in needed]
+
+    def _load_sources(self, case: Dict[str, Any], now: float, names: Optional[List[str]] = None) -> Tuple[Dict[str, Any], float]:
+        case_id, version = case["case_id"], case.get("version")
+        names = names or list(self.sources)
+        loaded: Dict[str, Any] = {}
+        expires = float("inf")
+
+        with self._lock:
+            for name in names:
+                hit, value = self._cached(case_id, version, name, now)
+                if hit:
+                    loaded[name] = value
+                    expires = min(expires, self._memo[(case_id, name)][1])
+
+        # Load in dependency waves; sources within a wave run concurrently
+        pending = [n for n in names if n not in loaded]
+        while pending:
+            ready = [n for n in pending if all(d in loaded for d in self.sources[n].depends_on)]
+            if not ready:
+                raise ValueError(f"Unresolvable context source dependencies: {pending}")
+            futures = {
+                n: self._executor.submit(self.sources[n].load, case, {d: loaded[d] for d in self.sources[n].depends_on})
+                for n in ready
+            }
+            for name, future in futures.items():
+                loaded[name] = future.result()
+                source_expiry = now + self.sources[name].ttl_seconds
+                expires = min(expires, source_expiry)
+                size = approx_size(loaded[name])
+                with self._lock:
+                    self._forget((case_id, name))
+                    self._memo[(case_id, name)] = (version, source_expiry, loaded[name])
+                    self._sizes[(case_id, name)] = size
+                    self._bytes += size
+            pending = [n for n in pending if n not in loaded]
+
+        if self.budget is not None:
+            self.budget.check()
+        return loaded, expires
+
+    def build(self, case: Dict[str, Any]) -> CaseContext:
+        case_id = case["case_id"]
+        version = case.get("version")
+        now = time.monotonic()
+
+        with self._lock:
+            snap = self._snapshots.get(case_id)
+            if snap and snap[0] == version and snap[1] > now:
+                return snap[2]
+
+        data, expires = self._load_sources(case, now)
+        context = CaseContext(case=dict(case), data=data)
+        with self._lock:
+            self._snapshots[case_id] = (version, expires, context)
+        return context
+
+    def load(self, case: Dict[str, Any], *names: str) -> Dict[str, Any]:
+        """Only the named sources (and their dependencies), through the same memo."""
+        data, _ = self._load_sources(case, time.monotonic(), self._closure(names))
+        return {name: data[name] for name in names}
+
+    def invalidate(self, case_id: int, source: Optional[str] = None):
+        with self._lock:
+            self._snapshots.pop(case_id, None)
+            for name in ([source] if source else list(self.sources)):
+                self._forget((case_id, name))
+
+    def _forget(self, key: Tuple[int, str]):
+        if self._memo.pop(key, None) is not None:
+            self._bytes -= self._sizes.pop(key)
+
+    # -------------------------------
+    # Memory budget
+    # -------------------------------
+    def memory_usage(self) -> int:
+        return self._bytes
+
+    def shed(self, nbytes: int) -> int:
+        """Drop expired entries, then whole cases, least recently loaded first."""
+        start = self._bytes
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, (_, expiry, _) in self._memo.items() if expiry <= now]:
+                self._forget(key)
+            for case_id in [c for c, (_, expiry, _) in self._snapshots.items() if expiry <= now]:
+                del self._snapshots[case_id]
+            for case_id in list(dict.fromkeys(case_id for case_id, _ in self._memo)):
+                if start - self._bytes >= nbytes:
+                    break
+                self._snapshots.pop(case_id, None)
+                for name in self.sources:
+                    self._forget((case_id, name))
+                self._evictions += 1
+        return start - self._bytes
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._memo),
+            "cases": len(self._snapshots),
+            "hot_bytes": self._bytes,
+            "evictions": self._evictions,
+        }
+
+
+# -------------------------------
+# Demo sources (local mode)
+# -------------------------------
+def _demo_transfers(case: Dict[str, Any]) -> List[Dict[str, Any]]:
+    as_of = datetime.fromisoformat(DEMO_AS_OF)
+    rows = []
+    for tx in DEMO_TRANSACTIONS.get(case["customer_id"], []):
+        row = dict(tx)
+        row["timestamp"] = as_of + timedelta(days=row.pop("day"))
+        rows.append(row)
+    return sorted(rows, key=lambda r: r["timestamp"])
+
+
+def _demo_profile(case, deps):
+    return dict(DEMO_PROFILES.get(case["customer_id"], {}))
+
+
+def _demo_transactions(case, deps):
+    return _demo_transfers(case)
+
+
+def build_timeline(case: Dict[str, Any], txs: List[Dict[str, Any]], as_of: datetime) -> List[Dict[str, Any]]:
+    events = []
+    for tx in txs:
+        outgoing = tx["source"] == case["customer_id"]
+        events.append({
+            "day": round((tx["timestamp"] - as_of).total_seconds() / 86400, 1),
+            "amount": tx["amount"],
+            "direction": "out" if outgoing else "in",
+            "counterparty": tx["target"] if outgoing else tx["source"],
+            "country": tx.get("country"),
+            "flagged": bool(tx.get("flagged")),
+        })
+    return events
+
+
+def _demo_timeline(case, deps):
+    return build_timeline(case, deps["transactions"], datetime.fromisoformat(DEMO_AS_OF))
+
+
+def exposure_from_transactions(case, deps):
+    txs = deps["transactions"]
+    profile = deps["profile"]
+    home = profile.get("home_country")
+    amounts = [tx["amount"] for tx in txs]
+    foreign = {tx.get("country") for tx in txs if tx.get("country") and tx.get("country") != home}
+    window_days = 0
+    if txs:
+        window_days = max(1, (txs[-1]["timestamp"] - txs[0]["timestamp"]).days + 1)
+    return {
+        "transaction_count": len(txs),
+        "total_amount": sum(amounts),
+        "highest_single_transfer": max(amounts, default=0),
+        "offshore_jurisdictions": len(foreign),
+        "sub_threshold_count": sum(1 for a in amounts if 9000 <= a < 10000),
+        "flagged_count": sum(1 for tx in txs if tx.get("flagged")),
+        "monitoring_window_days": window_days,
+    }
+
+
+def _demo_screening(case, deps):
+    profile = deps["profile"]
+    return {
+        "pep": bool(profile.get("pep")),
+        "sanctions_hit": bool(profile.get("sanctions_hit")),
+        "adverse_media": False,
+        "jurisdictions": sorted({tx["country"] for tx in deps["transactions"] if tx.get("country")}),
+    }
+
+
+# Shared by every builder in the process; bounded, and registered with the
+# memory budget of any builder that has one
+_flow_cache = GraphTraceCache(max_entries=2048)
+
+
+def flows_from_transactions(case, deps):
+    txs = deps["transactions"]
+    graph = TransactionGraph(
+        Transfer(tx["source"], tx["target"], float(tx["amount"]), tx["timestamp"], tx.get("tx_id"))
+        for tx in txs
+    )
+    analysis = _flow_cache.analyze_case(case["case_id"], case["customer_id"], graph)
+    return {"summary": analysis.to_prompt_summary(), **analysis.to_dict()}
+
+
+def peer_source(stats, ttl_seconds: float = 60.0) -> ContextSource:
+    """
+    Peer-group percentiles / z-scores for the case's exposure metrics.
+    ``stats`` may be a Deferred; it is resolved on the first case load.
+    """
+    from backend.lazy import resolve
+
+    def load(case, deps):
+        from backend.stats.peers import peer_metrics
+
+        return resolve(stats).peer_report(deps["profile"], peer_metrics(case, deps["exposure"]))
+
+    return ContextSource("peers", load, ttl_seconds=ttl_seconds, depends_on=("profile", "exposure"))
+
+
+def demo_sources(peer_stats=None) -> List[ContextSource]:
+    sources = [
+        ContextSource("profile", _demo_profile, ttl_seconds=3600),
+        ContextSource("transactions", _demo_transactions, ttl_seconds=300),
+        ContextSource("screening", _demo_screening, ttl_seconds=300, depends_on=("profile", "transactions")),
+        ContextSource("timeline", _demo_timeline, ttl_seconds=300, depends_on=("transactions",)),
+        ContextSource("exposure", exposure_from_transactions, ttl_seconds=300, depends_on=("transactions", "profile")),
+        ContextSource("flows", flows_from_transactions, ttl_seconds=300, depends_on=("transactions",)),
+    ]
+    if peer_stats is not None:
+        sources.append(peer_source(peer_stats))
+    return sources
+
+
+# -------------------------------
+# Postgres sources (shared deployments)
+# -------------------------------
+def postgres_sources(client, peer_stats=None, max_transactions: int = 500, ttl_seconds: float = 60.0) -> List[ContextSource]:
+    """
+    Context from the customer ledger. One ``case_detail`` query (primary
+    key and index lookups only; exposure comes from the trigger-maintained
+    customer_360 row) feeds profile, screening, exposure and transactions;
+    timeline and flows are derived from those rows in-process.
+    """
+
+    def detail(case, deps):
+        return client.case_detail(case["case_id"], max_transactions=max_transactions) or {}
+
+    def field_of(name, default):
+        return lambda case, deps: deps["_detail"].get(name, default)
+
+    def timeline(case, deps):
+        return build_timeline(case, deps["transactions"], deps["_detail"].get("as_of") or datetime.utcnow())
+
+    sources = [
+        ContextSource("_detail", detail, ttl_seconds=ttl_seconds),
+        ContextSource("profile", field_of("profile", {}), ttl_seconds=ttl_seconds, depends_on=("_detail",)),
+        ContextSource("transactions", field_of("transactions", []), ttl_seconds=ttl_seconds, depends_on=("_detail",)),
+        ContextSource("screening", field_of("screening", {}), ttl_seconds=ttl_seconds, depends_on=("_detail",)),
+        ContextSource("exposure", field_of("exposure", {}), ttl_seconds=ttl_seconds, depends_on=("_detail",)),
+        ContextSource("timeline", timeline, ttl_seconds=ttl_seconds, depends_on=("_detail", "transactions")),
+        ContextSource("flows", flows_from_transactions, ttl_seconds=ttl_seconds, depends_on=("transactions",)),
+    ]
+    if peer_stats is not None:
+        sources.append(peer_source(peer_stats))
+    return sources
@@ -0,0 +1,232 @@
+"""
+Alert intake deduplication for SAR AI Copilot.
+
+Responsibilities:
+- Fingerprint an alert as a set of shingles: counterparties, amount
+  buckets per direction and channel, and word pairs of the alert text
+- Index open cases by customer, linked accounts, typology and a MinHash
+  LSH over those fingerprints
+- Decide whether a new alert merges into an open case, joins a cluster of
+  similar cases, or opens a new case
+
+Matching is one MinHash signature plus dictionary lookups. Only the
+cases sharing an account or an LSH bucket are scored, so a decision
+takes well under a millisecond and does not grow with the queue size.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.cases.typology import infer_typology
+
+NUM_PERM = 64
+# 32 bands of 2 rows: pairs above ~0.2 Jaccard become candidates; the
+# signature estimate then decides
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+_PRIME = np.uint64((1 << 61) - 1)
+# Fixed seed: signatures must agree across processes and restarts
+_rng = np.random.default_rng(20260201)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _hash32(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def minhash(shingles: Iterable[str]) -> np.ndarray:
+    hashes = np.fromiter((_hash32(s) for s in shingles), dtype=np.uint64)
+    if not hashes.size:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    # hash < 2^32 and a < 2^32, so a * hash + b stays within uint64
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """MinHash estimate of the Jaccard similarity of two fingerprints."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def amount_bucket(amount: float) -> int:
+    """Half-octave buckets: 9,400 and 9,900 share one, 19,000 does not."""
+    return int(math.log2(max(float(amount), 1.0)) * 2)
+
+
+def alert_shingles(alert: Dict[str, Any], accounts: FrozenSet[str], transactions: Iterable[Dict[str, Any]] = ()) -> Set[str]:
+    text = f"{alert.get('alert_reason') or ''} {alert.get('transaction_summary') or ''}".lower()
+    words = _WORD_RE.findall(text)
+    shingles = {f"w:{a} {b}" for a, b in zip(words, words[1:])}
+    for tx in transactions:
+        outgoing = tx["source"] in accounts
+        counterparty = tx["target"] if outgoing else tx["source"]
+        if counterparty in accounts:
+            continue  # moves between the customer's own accounts
+        shingles.add(f"cp:{counterparty}")
+        shingles.add(f"amt:{'out' if outgoing else 'in'}:{tx.get('channel', '')}:{amount_bucket(tx['amount'])}")
+    return shingles
+
+
+@dataclass
+class Fingerprint:
+    customer_id: str
+    accounts: FrozenSet[str]
+    typology: str
+    signature: np.ndarray
+
+    def merged(self, other: "Fingerprint") -> "Fingerprint":
+        """
+        Fingerprint of this case after ``other`` is merged into it: the
+        MinHash of a union of shingle sets is the element-wise minimum.
+        """
+        return Fingerprint(
+            customer_id=self.customer_id,
+            accounts=self.accounts | other.accounts,
+            typology=self.typology,
+            signature=np.minimum(self.signature, other.signature),
+        )
+
+
+def fingerprint(alert: Dict[str, Any], linked_accounts: Iterable[str] = (), transactions: Iterable[Dict[str, Any]] = ()) -> Fingerprint:
+    accounts = frozenset([alert["customer_id"], *linked_accounts])
+    return Fingerprint(
+        customer_id=alert["customer_id"],
+        accounts=accounts,
+        typology=infer_typology(alert.get("alert_reason") or "", alert.get("transaction_summary") or ""),
+        signature=minhash(alert_shingles(alert, accounts, transactions)),
+    )
+
+
+@dataclass
+class DedupDecision:
+    action: str  # "merge" | "cluster" | "new"
+    case_id: Optional[int] = None  # case merged into, or the closest clustered case
+    cluster: Optional[List[int]] = None
+    similarity: float = 0.0
+    reason: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class AlertIndex:
+    """
+    Open cases keyed for intake matching.
+
+    - Same customer, same typology: merge into that case
+    - Shared linked account, same typology: merge into that case
+    - LSH candidate of the same typology at ``cluster_threshold`` or
+      above: open a new case in the candidate's cluster
+    """
+
+    def __init__(self, cluster_threshold: float = 0.5):
+        self.cluster_threshold = cluster_threshold
+        self._cases: Dict[int, Fingerprint] = {}
+        self._by_account: Dict[str, Set[int]] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self._cluster_of: Dict[int, int] = {}  # case -> cluster id (its first case)
+        self._clusters: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    def __contains__(self, case_id: int) -> bool:
+        return case_id in self._cases
+
+    @staticmethod
+    def _bands(signature: np.ndarray):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def add(self, case_id: int, fp: Fingerprint, cluster_with: Optional[int] = None):
+        with self._lock:
+            self._remove(case_id)
+            self._insert(case_id, fp)
+            if cluster_with is not None and cluster_with in self._cases:
+                cluster_id = self._cluster_of.setdefault(cluster_with, cluster_with)
+                self._clusters.setdefault(cluster_id, {cluster_with}).add(case_id)
+                self._cluster_of[case_id] = cluster_id
+
+    def fold(self, case_id: int, fp: Fingerprint):
+        """Fold a merged alert's fingerprint into an indexed case, keeping its cluster."""
+        with self._lock:
+            current = self._cases.get(case_id)
+            if current is None:
+                return
+            cluster_id = self._cluster_of.get(case_id)
+            self._remove(case_id)
+            self._insert(case_id, current.merged(fp))
+            if cluster_id is not None:
+                self._clusters[cluster_id].add(case_id)
+                self._cluster_of[case_id] = cluster_id
+
+    def _insert(self, case_id: int, fp: Fingerprint):
+        self._cases[case_id] = fp
+        for account in fp.accounts:
+            self._by_account.setdefault(account, set()).add(case_id)
+        for key in self._bands(fp.signature):
+            self._buckets.setdefault(key, set()).add(case_id)
+
+    def remove(self, case_id: int):
+        """Drop a case that is no longer open; the rest of its cluster stays."""
+        with self._lock:
+            self._remove(case_id)
+
+    def _remove(self, case_id: int):
+        fp = self._cases.pop(case_id, None)
+        if fp is None:
+            return
+        for account in fp.accounts:
+            self._by_account.get(account, set()).discard(case_id)
+        for key in self._bands(fp.signature):
+            self._buckets.get(key, set()).discard(case_id)
+        cluster_id = self._cluster_of.pop(case_id, None)
+        if cluster_id is not None:
+            self._clusters[cluster_id].discard(case_id)
+
+    def cluster_of(self, case_id: int) -> List[int]:
+        with self._lock:
+            return self._members(case_id)
+
+    def _members(self, case_id: int) -> List[int]:
+        if case_id not in self._cases:
+            return []
+        cluster_id = self._cluster_of.get(case_id)
+        return sorted(self._clusters[cluster_id]) if cluster_id is not None else [case_id]
+
+    def match(self, fp: Fingerprint) -> DedupDecision:
+        with self._lock:
+            direct: Set[int] = set()
+            for account in fp.accounts:
+                direct |= self._by_account.get(account, set())
+            direct = {c for c in direct if self._cases[c].typology == fp.typology}
+            if direct:
+                best = max(direct, key=lambda c: (self._cases[c].customer_id == fp.customer_id,
+                                                  similarity(fp.signature, self._cases[c].signature)))
+                reason = "same customer" if self._cases[best].customer_id == fp.customer_id else "linked account"
+                return DedupDecision(
+                    "merge", best, similarity=similarity(fp.signature, self._cases[best].signature),
+                    reason=f"{reason}, {fp.typology}",
+                )
+
+            candidates: Set[int] = set()
+            for key in self._bands(fp.signature):
+                candidates |= self._buckets.get(key, set())
+            scored = [
+                (similarity(fp.signature, self._cases[c].signature), c)
+                for c in candidates if self._cases[c].typology == fp.typology
+            ]
+            if scored:
+                score, best = max(scored)
+                if score >= self.cluster_threshold:
+                    return DedupDecision("cluster", best, self._members(best), score, f"similar {fp.typology} pattern")
+            return DedupDecision("new")
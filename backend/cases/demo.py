@@ -0,0 +1,105 @@
+"""
+Demo case data for SAR AI Copilot.
+
+Used to seed the in-process case store when no Postgres database is
+configured (hackathon / local mode), plus a small customer profile and
+transaction ledger behind the case detail view.
+"""
+
+DEMO_CASES = [
+    {
+        "case_id": 1,
+        "customer_id": "CUST-001",
+        "customer_name": "John Doe",
+        "risk_score": 86.5,
+        "status": "NEW",
+        "alert_reason": "Unusual spike in cross-border transfers.",
+        "transaction_summary": "Multiple high-value transfers to offshore accounts within 7 days.",
+        "jurisdiction": "US"
+    },
+    {
+        "case_id": 2,
+        "customer_id": "CUST-002",
+        "customer_name": "Priya Sharma",
+        "risk_score": 72.3,
+        "status": "UNDER_REVIEW",
+        "alert_reason": "Structuring detected below reporting threshold.",
+        "transaction_summary": "Frequent cash deposits slightly below compliance threshold.",
+        "jurisdiction": "IN"
+    },
+    {
+        "case_id": 3,
+        "customer_id": "CUST-003",
+        "customer_name": "Michael Tan",
+        "risk_score": 91.2,
+        "status": "NEW",
+        "alert_reason": "Rapid movement of funds across high-risk jurisdictions.",
+        "transaction_summary": "Three large transfers routed through layered shell accounts in 48 hours.",
+        "jurisdiction": "GB"
+    },
+    {
+        "case_id": 4,
+        "customer_id": "CUST-004",
+        "customer_name": "Sara Williams",
+        "risk_score": 67.4,
+        "status": "UNDER_REVIEW",
+        "alert_reason": "Inconsistent income declaration patterns.",
+        "transaction_summary": "Account activity inconsistent with declared business revenue profile.",
+        "jurisdiction": "US"
+    },
+    {
+        "case_id": 5,
+        "customer_id": "CUST-005",
+        "customer_name": "Arjun Mehta",
+        "risk_score": 78.9,
+        "status": "NEW",
+        "alert_reason": "Structuring behavior across multiple accounts.",
+        "transaction_summary": "Repeated sub-threshold deposits across linked accounts within 5 days.",
+        "jurisdiction": "IN"
+    }
+]
+
+# Demo ledger, one list per customer. ``day`` is relative to DEMO_AS_OF.
+DEMO_AS_OF = "2026-02-01T12:00:00"
+
+DEMO_PROFILES = {
+    "CUST-001": {"region": "APAC", "tier": 3, "customer_type": "Individual", "declared_annual_income": 180000, "home_country": "SG", "pep": False, "sanctions_hit": False},
+    "CUST-002": {"region": "APAC", "tier": 2, "customer_type": "Individual", "declared_annual_income": 42000, "home_country": "IN", "pep": False, "sanctions_hit": False},
+    "CUST-003": {"region": "EMEA", "tier": 3, "customer_type": "Corporate", "declared_annual_income": 900000, "home_country": "AE", "pep": False, "sanctions_hit": False},
+    "CUST-004": {"region": "US", "tier": 2, "customer_type": "SME", "declared_annual_income": 250000, "home_country": "US", "pep": False, "sanctions_hit": False},
+    "CUST-005": {"region": "APAC", "tier": 2, "customer_type": "Individual", "declared_annual_income": 60000, "home_country": "IN", "pep": True, "sanctions_hit": False, "linked_accounts": ["CUST-005-B", "CUST-005-C"]},
+}
+
+DEMO_TRANSACTIONS = {
+    "CUST-001": [
+        {"tx_id": "T1-1", "source": "CUST-001", "target": "SG-ENTITY-77", "amount": 45000, "day": -7, "country": "SG", "channel": "wire"},
+        {"tx_id": "T1-2", "source": "CUST-001", "target": "HK-BENEF-12", "amount": 62000, "day": -5, "country": "HK", "channel": "wire"},
+        {"tx_id": "T1-3", "source": "CUST-001", "target": "VG-OFFSHORE-3", "amount": 125000, "day": -3, "country": "VG", "channel": "wire", "flagged": True},
+        {"tx_id": "T1-4", "source": "CUST-001", "target": "MY-TRADE-9", "amount": 38000, "day": -1, "country": "MY", "channel": "wire"},
+    ],
+    "CUST-002": [
+        {"tx_id": f"T2-{i}", "source": "CASH", "target": "CUST-002", "amount": amount, "day": day, "country": "IN", "channel": "cash"}
+        for i, (amount, day) in enumerate([(9500, -9), (9700, -8), (9400, -6), (9800, -5), (9600, -3), (9900, -2)], start=1)
+    ],
+    "CUST-003": [
+        {"tx_id": "T3-1", "source": "CUST-003", "target": "SHELL-A", "amount": 310000, "day": -2.0, "country": "CY", "channel": "wire"},
+        {"tx_id": "T3-2", "source": "SHELL-A", "target": "SHELL-B", "amount": 305000, "day": -1.6, "country": "LV", "channel": "wire"},
+        {"tx_id": "T3-3", "source": "SHELL-B", "target": "SHELL-C", "amount": 298000, "day": -1.1, "country": "AE", "channel": "wire"},
+        {"tx_id": "T3-4", "source": "SHELL-C", "target": "CUST-003", "amount": 120000, "day": -0.4, "country": "AE", "channel": "wire"},
+    ],
+    "CUST-004": [
+        {"tx_id": "T4-1", "source": "VARIOUS", "target": "CUST-004", "amount": 88000, "day": -20, "country": "US", "channel": "ach"},
+        {"tx_id": "T4-2", "source": "VARIOUS", "target": "CUST-004", "amount": 91000, "day": -12, "country": "US", "channel": "ach"},
+        {"tx_id": "T4-3", "source": "CUST-004", "target": "MX-SUPPLIER-4", "amount": 150000, "day": -4, "country": "MX", "channel": "wire"},
+    ],
+    "CUST-005": [
+        {"tx_id": f"T5-{i}", "source": "CASH", "target": account, "amount": amount, "day": day, "country": "IN", "channel": "cash"}
+        for i, (account, amount, day) in enumerate(
+            [("CUST-005", 9600, -5), ("CUST-005-B", 9800, -4), ("CUST-005-C", 9700, -4), ("CUST-005", 9500, -2), ("CUST-005-B", 9900, -1)],
+            start=1,
+        )
+    ] + [
+        {"tx_id": "T5-6", "source": "CUST-005-B", "target": "CUST-005", "amount": 19000, "day": -0.5, "country": "IN", "channel": "transfer"},
+        {"tx_id": "T5-7", "source": "CUST-005-C", "target": "CUST-005", "amount": 9500, "day": -0.5, "country": "IN", "channel": "transfer"},
+    ],
+}
@@ -0,0 +1,393 @@
+"""
+Case repository layer for SAR AI Copilot.
+
+Responsibilities:
+- Keep dashboard counters (by status and risk band) up to date incrementally
+- Serve filtered, paginated case lists without scanning every case
+- Offer the same interface over an in-process store and Postgres
+
+The dashboard only talks to a repository, so swapping the demo store for
+Postgres does not touch UI code.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from backend.cases.state import OPEN_STATUSES, InvalidTransition, StaleCaseVersion, allowed_sources, check_transition
+from backend.memory import MemoryBudget, SpillableStore
+
+RISK_BANDS = ("High", "Medium", "Low")
+CASE_STATUSES = ("NEW", "UNDER_REVIEW", "SAR_DRAFTED", "CLOSED_FALSE_POSITIVE")
+SORT_KEYS = ("case_id", "risk_score", "customer_name", "status")
+
+
+def risk_band(risk_score: float) -> str:
+    """Map a risk score onto the dashboard band (same cut-offs as the UI)."""
+    if risk_score >= 80:
+        return "High"
+    if risk_score >= 70:
+        return "Medium"
+    return "Low"
+
+
+@dataclass
+class CaseCounts:
+    total: int = 0
+    by_status: Dict[str, int] = field(default_factory=dict)
+    by_band: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class CasePage:
+    items: List[Dict[str, Any]]
+    total: int
+    offset: int
+    limit: int
+    # True when ``total`` is a lower bound (large search results are not fully counted)
+    total_capped: bool = False
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.total // self.limit)) if self.limit else 1
+
+
+def _search_tokens(text: Optional[str]) -> List[str]:
+    # Same normalization as PostgresClient.list_cases: words, non-alphanumerics dropped
+    tokens = ("".join(ch for ch in tok if ch.isalnum()) for tok in (text or "").lower().split())
+    return [tok for tok in tokens if tok]
+
+
+def _name_tokens(name: Optional[str]) -> Set[str]:
+    return set(_search_tokens(name))
+
+
+class InMemoryCaseRepository:
+    """
+    Indexed in-process case store.
+
+    Counters and per-status / per-band id sets are updated on every write,
+    so reads never iterate over the full case list. Drafts are kept per
+    (case, draft) in a SpillableStore, so with a ``budget`` old narratives
+    spill to disk instead of accumulating in RAM.
+    """
+
+    def __init__(self, cases: Optional[List[Dict[str, Any]]] = None, budget: Optional[MemoryBudget] = None):
+        self._cases: Dict[int, Dict[str, Any]] = {}
+        self._ids: List[int] = []
+        self._by_status: Dict[str, Set[int]] = {}
+        self._by_band: Dict[str, Set[int]] = {}
+        self._by_customer: Dict[str, Set[int]] = {}
+        self._status_counts: Counter = Counter()
+        self._band_counts: Counter = Counter()
+        # Sorted (token, case_id) pairs for word-prefix search
+        self._name_index: List[Tuple[str, int]] = []
+        self._drafts = SpillableStore("drafts", budget)
+        self._draft_counts: Dict[int, int] = {}
+        self._next_id = 1
+
+        for case in cases or []:
+            self.add(case)
+
+    # -------------------------------
+    # Writes
+    # -------------------------------
+    def add(self, case: Dict[str, Any]) -> int:
+        case_id = case.get("case_id") or self._next_id
+        self._next_id = max(self._next_id, case_id + 1)
+        stored = dict(case, case_id=case_id, version=case.get("version", 1))
+        if case_id in self._cases:
+            self._unindex(self._cases[case_id])
+        else:
+            insort(self._ids, case_id)
+        self._cases[case_id] = stored
+        self._index(stored)
+        return case_id
+
+    def update(self, case_id: int, expected_version: Optional[int] = None, **changes) -> Dict[str, Any]:
+        if "status" in changes:
+            raise InvalidTransition("Status changes must go through transition()")
+        return self._apply(case_id, expected_version, changes)
+
+    def _apply(self, case_id: int, expected_version: Optional[int], changes: Dict[str, Any]) -> Dict[str, Any]:
+        case = self._cases[case_id]
+        if expected_version is not None and case["version"] != expected_version:
+            raise StaleCaseVersion(f"Case {case_id} is at version {case['version']}, expected {expected_version}")
+        self._unindex(case)
+        case.update(changes)
+        case["version"] += 1
+        self._index(case)
+        return case
+
+    def transition(
+        self,
+        case_id: int,
+        to_status: str,
+        expected_version: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # Callers serialize writes (CaseService holds its lock), so the
+        # check-then-update here is atomic for this store.
+        case = self._cases[case_id]
+        check_transition(case["status"], to_status)
+        return self._apply(case_id, expected_version, {"status": to_status})
+
+    def save_draft(self, case_id: int, narrative: str, model_name: str) -> int:
+        draft_id = self._draft_counts.get(case_id, 0) + 1
+        self._draft_counts[case_id] = draft_id
+        self._drafts.put((case_id, draft_id), {
+            "draft_id": draft_id,
+            "case_id": case_id,
+            "narrative": narrative,
+            "model_name": model_name,
+            "created_at": datetime.utcnow(),
+        })
+        return draft_id
+
+    def delete_draft(self, case_id: int, draft_id: int):
+        self._drafts.pop((case_id, draft_id))
+        if self._draft_counts.get(case_id) == draft_id:
+            if draft_id == 1:
+                del self._draft_counts[case_id]
+            else:
+                self._draft_counts[case_id] = draft_id - 1
+
+    def _index(self, case: Dict[str, Any]):
+        case_id = case["case_id"]
+        band = risk_band(case["risk_score"])
+        self._by_status.setdefault(case["status"], set()).add(case_id)
+        self._by_band.setdefault(band, set()).add(case_id)
+        self._by_customer.setdefault(case.get("customer_id"), set()).add(case_id)
+        self._status_counts[case["status"]] += 1
+        self._band_counts[band] += 1
+        for tok in _name_tokens(case.get("customer_name")):
+            insort(self._name_index, (tok, case_id))
+
+    def _unindex(self, case: Dict[str, Any]):
+        case_id = case["case_id"]
+        band = risk_band(case["risk_score"])
+        self._by_status[case["status"]].discard(case_id)
+        self._by_band[band].discard(case_id)
+        self._by_customer[case.get("customer_id")].discard(case_id)
+        self._status_counts[case["status"]] -= 1
+        self._band_counts[band] -= 1
+        for tok in _name_tokens(case.get("customer_name")):
+            pos = bisect_left(self._name_index, (tok, case_id))
+            if pos < len(self._name_index) and self._name_index[pos] == (tok, case_id):
+                del self._name_index[pos]
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def get(self, case_id: int) -> Optional[Dict[str, Any]]:
+        return self._cases.get(case_id)
+
+    def latest_draft(self, case_id: int) -> Optional[Dict[str, Any]]:
+        draft_id = self._draft_counts.get(case_id)
+        return self._drafts.get((case_id, draft_id)) if draft_id else None
+
+    def open_cases_for_accounts(self, accounts: List[str]) -> List[Dict[str, Any]]:
+        """Open cases whose customer is one of ``accounts``."""
+        ids = set().union(*(self._by_customer.get(a, set()) for a in accounts))
+        return [self._cases[i] for i in sorted(ids) if self._cases[i]["status"] in OPEN_STATUSES]
+
+    def intake_lock(self, accounts: List[str]):
+        # The store only lives in this process; CaseService serializes intake
+        return nullcontext()
+
+    def counts(self) -> CaseCounts:
+        return CaseCounts(
+            total=len(self._cases),
+            by_status={k: v for k, v in self._status_counts.items() if v},
+            by_band={k: v for k, v in self._band_counts.items() if v},
+        )
+
+    def _search_ids(self, search: str) -> Set[int]:
+        term = search.strip().lstrip("#").lower()
+        matches: Optional[Set[int]] = None
+        for tok in _search_tokens(term):
+            ids = set()
+            pos = bisect_left(self._name_index, (tok, -1))
+            while pos < len(self._name_index) and self._name_index[pos][0].startswith(tok):
+                ids.add(self._name_index[pos][1])
+                pos += 1
+            matches = ids if matches is None else matches & ids
+        matches = matches or set()
+        if term.isdigit() and int(term) in self._cases:
+            matches.add(int(term))
+        return matches
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        band: Optional[str] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 25,
+        sort_by: str = "case_id",
+        descending: bool = False,
+    ) -> CasePage:
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+
+        candidate_sets = []
+        if status:
+            candidate_sets.append(self._by_status.get(status, set()))
+        if band:
+            candidate_sets.append(self._by_band.get(band, set()))
+        if search and search.strip():
+            candidate_sets.append(self._search_ids(search))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            ids = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+        else:
+            ids = None
+
+        return CasePage(
+            items=[self._cases[i] for i in self._page_ids(ids, offset, limit, sort_by, descending)],
+            total=len(self._ids) if ids is None else len(ids),
+            offset=offset,
+            limit=limit,
+        )
+
+    def _page_ids(self, ids: Optional[Set[int]], offset: int, limit: int, sort_by: str, descending: bool) -> List[int]:
+        """
+        Select only the ids of the requested page.
+
+        Id order on the full set slices the maintained sorted id list; any
+        other order uses a bounded heap, so cost grows with the page end
+        rather than with a full sort of the queue.
+        """
+        if sort_by == "case_id":
+            ordered = self._ids if ids is None else sorted(ids)
+            if descending:
+                end = len(ordered) - offset
+                return ordered[max(0, end - limit):max(0, end)][::-1]
+            return ordered[offset:offset + limit]
+
+        pool = self._ids if ids is None else ids
+
+        def key(case_id):
+            value = self._cases[case_id].get(sort_by)
+            if isinstance(value, str):
+                value = value.lower()
+            return (value is None, value, case_id)
+
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(offset + limit, pool, key=key)[offset:]
+
+
+class PostgresCaseRepository:
+    """
+    Same interface as InMemoryCaseRepository, backed by PostgresClient.
+
+    Counters come from the trigger-maintained ``case_stats`` table and
+    pagination is done with LIMIT/OFFSET in the database.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def add(self, case: Dict[str, Any]) -> int:
+        return self.client.create_case(
+            customer_id=case["customer_id"],
+            risk_score=case["risk_score"],
+            status=case.get("status", "NEW"),
+            customer_name=case.get("customer_name"),
+            alert_reason=case.get("alert_reason"),
+            transaction_summary=case.get("transaction_summary"),
+            jurisdiction=case.get("jurisdiction"),
+        )
+
+    def update(self, case_id: int, expected_version: Optional[int] = None, **changes) -> Optional[Dict[str, Any]]:
+        if "status" in changes:
+            raise InvalidTransition("Status changes must go through transition()")
+        if not self.client.update_case(case_id, changes, expected_version=expected_version):
+            raise StaleCaseVersion(f"Case {case_id} changed since version {expected_version}")
+        return self.client.get_case(case_id)
+
+    def transition(
+        self,
+        case_id: int,
+        to_status: str,
+        expected_version: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Guarded status change plus audit entry in one round trip. The
+        failure reason is only looked up when the guarded update misses.
+        """
+        row = self.client.transition_case(
+            case_id,
+            to_status,
+            allowed_from=allowed_sources(to_status),
+            expected_version=expected_version,
+            details=details,
+        )
+        if row is not None:
+            row.pop("from_status", None)
+            return row
+
+        current = self.client.get_case(case_id)
+        if current is None:
+            raise KeyError(case_id)
+        if expected_version is not None and current["version"] != expected_version:
+            raise StaleCaseVersion(f"Case {case_id} is at version {current['version']}, expected {expected_version}")
+        check_transition(current["status"], to_status)
+        # Status was legal when re-read: a concurrent writer got in between
+        raise StaleCaseVersion(f"Case {case_id} changed concurrently")
+
+    def get(self, case_id: int) -> Optional[Dict[str, Any]]:
+        return self.client.get_case(case_id)
+
+    def save_draft(self, case_id: int, narrative: str, model_name: str) -> int:
+        return self.client.save_sar_draft(case_id, narrative, model_name)
+
+    def delete_draft(self, case_id: int, draft_id: int):
+        self.client.delete_sar_draft(draft_id)
+
+    def latest_draft(self, case_id: int) -> Optional[Dict[str, Any]]:
+        return self.client.latest_sar_draft(case_id)
+
+    def open_cases_for_accounts(self, accounts: List[str]) -> List[Dict[str, Any]]:
+        return self.client.open_cases_for_accounts(accounts, sorted(OPEN_STATUSES))
+
+    def intake_lock(self, accounts: List[str]):
+        return self.client.intake_lock(accounts)
+
+    def counts(self) -> CaseCounts:
+        counts = CaseCounts()
+        for row in self.client.case_counts():
+            n = row["case_count"]
+            counts.total += n
+            counts.by_status[row["status"]] = counts.by_status.get(row["status"], 0) + n
+            counts.by_band[row["risk_band"]] = counts.by_band.get(row["risk_band"], 0) + n
+        return counts
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        band: Optional[str] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 25,
+        sort_by: str = "case_id",
+        descending: bool = False,
+    ) -> CasePage:
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+        rows, total, capped = self.client.list_cases(
+            status=status,
+            risk_band=band,
+            search=search,
+            offset=offset,
+            limit=limit,
+            sort_by=sort_by,
+            descending=descending,
+        )
+        return CasePage(items=rows, total=total, offset=offset, limit=limit, total_capped=capped)
@@ -0,0 +1,665 @@
+"""
+Case service for SAR AI Copilot.
+
+Responsibilities:
+- Own case CRUD, status changes and SAR drafting behind one interface
+- Write audit entries and explainability traces for every change
+- Serve case context snapshots to the UI and the drafting path
+- Queue SAR drafting jobs and expose their status for polling
+- Serve prefetched drafts instantly and invalidate them when a case changes
+- Report in-process store sizes under the memory budget (backend.memory)
+- Choose the backing store (Postgres when configured, demo store otherwise)
+
+The FastAPI app (backend/api/app.py) exposes this service over HTTP and
+the Streamlit UI talks to it either in-process or through the HTTP client.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional, Callable
+
+from backend.cases.repository import CasePage, CaseCounts, InMemoryCaseRepository, PostgresCaseRepository
+from backend.cases.context import CaseContextBuilder, demo_sources, postgres_sources
+from backend.cases.demo import DEMO_CASES, DEMO_PROFILES, DEMO_TRANSACTIONS
+from backend.cases.state import NEW, OPEN_STATUSES, SAR_DRAFTED, InvalidTransition, StaleCaseVersion, check_transition
+from backend.explainability.trace import ExplainabilityEngine
+from backend.jobs.prefetch import ForegroundGate, start_prefetcher
+from backend.lazy import Deferred, resolve
+from backend.memory import MemoryBudget, default_budget
+
+logger = logging.getLogger(__name__)
+
+
+class CaseNotFound(LookupError):
+    pass
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _tx_id(customer_id: str, tx: Dict[str, Any]) -> str:
+    """Stable id for an alert transaction without one, so replayed alerts are not double counted."""
+    key = "|".join(str(tx.get(k, "")) for k in ("source", "target", "amount", "channel", "timestamp"))
+    return f"ALERT-{_sha256(f'{customer_id}|{key}')[:24]}"
+
+
+def _default_llm_factory():
+    # Imported lazily: the LangChain stack is only needed once a draft is requested
+    from backend.llm.cache import SARNarrativeCache
+    from backend.llm.model import SARLLM
+    from backend.rag.pipeline import SARRAGPipeline
+
+    return SARLLM(cache=SARNarrativeCache(budget=default_budget()), rag=SARRAGPipeline())
+
+
+class CaseService:
+    def __init__(
+        self,
+        repository,
+        audit=None,
+        jobs=None,
+        llm_factory: Callable[[], Any] = _default_llm_factory,
+        explain_engine: Optional[ExplainabilityEngine] = None,
+        context_builder: Optional[CaseContextBuilder] = None,
+        ledger=None,
+        memory: Optional[MemoryBudget] = None,
+        peer_stats=None,
+        peer_stats_path: Optional[str] = None,
+    ):
+        self.repository = repository
+        self.audit = audit
+        self.jobs = jobs
+        # Customer / transaction store fed by alert intake (Postgres mode)
+        self.ledger = ledger
+        # Budget the in-process stores (drafts, traces, caches) register with
+        self.memory = memory
+        # Peer sketches (may be Deferred) fed by intake; new observations are
+        # merged into ``peer_stats_path`` periodically and at exit
+        self.peer_stats = peer_stats
+        self.peer_stats_path = peer_stats_path
+        # Customer totals in local mode (no ledger): demo ledger plus ingested alerts
+        self._local_exposure: Dict[str, Dict[str, Any]] = {}
+        if peer_stats_path:
+            atexit.register(self.flush_peer_stats)
+        self.explain_engine = explain_engine or ExplainabilityEngine()
+        self.context_builder = context_builder or CaseContextBuilder(demo_sources())
+        self._llm_factory = llm_factory
+        self._llm = None
+        self._lock = threading.RLock()
+        # Built from the open cases on the first alert intake
+        self.alert_index = Deferred(self._build_alert_index)
+        self._intake_lock = threading.Lock()
+        # Interactive LLM calls hold the gate; a SARPrefetcher yields to them
+        self.foreground = ForegroundGate()
+        self.prefetcher = None
+
+    @property
+    def llm(self):
+        with self._lock:
+            if self._llm is None:
+                self._llm = self._llm_factory()
+            return self._llm
+
+    def _log(self, case_id: int, action: str, details: Dict[str, Any]):
+        if self.audit is not None:
+            self.audit.log_action(case_id, action, details)
+
+    # -------------------------------
+    # CRUD
+    # -------------------------------
+    def counts(self) -> CaseCounts:
+        return self.repository.counts()
+
+    def query(self, **filters) -> CasePage:
+        return self.repository.query(**filters)
+
+    def get(self, case_id: int) -> Dict[str, Any]:
+        case = self.repository.get(case_id)
+        if case is None:
+            raise CaseNotFound(f"Case {case_id} not found")
+        return case
+
+    def create(self, case: Dict[str, Any], actor: str = "system") -> Dict[str, Any]:
+        with self._lock:
+            case_id = self.repository.add(dict(case, status=case.get("status", NEW)))
+        self._log(case_id, "CASE_CREATED", {"actor": actor})
+        created = self.get(case_id)
+        if self.alert_index.ready and created["status"] in OPEN_STATUSES:
+            self.alert_index.get().add(case_id, self._fingerprint(created))
+        return created
+
+    # -------------------------------
+    # Alert intake
+    # -------------------------------
+    def _fingerprint(self, alert: Dict[str, Any]):
+        """
+        Alert fingerprint; transactions and linked accounts come from the
+        alert itself, or from the context sources for a stored case.
+        """
+        from backend.cases.dedup import fingerprint
+
+        transactions, linked = alert.get("transactions"), alert.get("linked_accounts")
+        if (transactions is None or linked is None) and alert.get("case_id") is not None:
+            data = self.context_builder.load(alert, "profile", "transactions")
+            transactions = data["transactions"] if transactions is None else transactions
+            linked = data["profile"].get("linked_accounts", []) if linked is None else linked
+        return fingerprint(alert, linked or (), transactions or ())
+
+    def _build_alert_index(self):
+        from backend.cases.dedup import AlertIndex
+
+        index = AlertIndex()
+        for status in sorted(OPEN_STATUSES):
+            offset = 0
+            while True:
+                page = self.repository.query(status=status, offset=offset, limit=500)
+                for case in page.items:
+                    index.add(case["case_id"], self._fingerprint(case))
+                offset += page.limit
+                if offset >= page.total:
+                    break
+        return index
+
+    def ingest_alert(self, alert: Dict[str, Any], actor: str = "intake") -> Dict[str, Any]:
+        """
+        Deduplicating intake for a new alert.
+
+        An alert for the same customer or a linked account with the same
+        typology as an open case is merged into that case: one audit entry
+        (and a risk score update if it is higher), no new row and no new
+        draft. An alert that closely resembles another open case opens a
+        new case in that case's cluster. Otherwise a new case is opened.
+
+        The index lives in this process, so matching runs under the
+        repository's intake lock on the alert's accounts (an advisory lock
+        per account in Postgres) and first picks up open cases on those
+        accounts that other processes filed. A merged alert's transactions
+        are folded into the case's fingerprint.
+        """
+        index = self.alert_index.get()
+        fp = self._fingerprint(alert)
+        fields = {k: v for k, v in alert.items() if k not in ("transactions", "linked_accounts")}
+        self._record_ledger(alert)
+
+        accounts = sorted(fp.accounts)
+        with self._intake_lock, self.repository.intake_lock(accounts):
+            for case in self.repository.open_cases_for_accounts(accounts):
+                if case["case_id"] not in index:
+                    index.add(case["case_id"], self._fingerprint(case))
+            decision = index.match(fp)
+            while decision.action == "merge":
+                case = self.get(decision.case_id)
+                if case["status"] in OPEN_STATUSES:
+                    break
+                # Closed by another process since it was indexed
+                index.remove(decision.case_id)
+                decision = index.match(fp)
+
+            if decision.action == "merge":
+                index.fold(decision.case_id, fp)
+                if alert["risk_score"] > case["risk_score"]:
+                    with self._lock:
+                        self.repository.update(decision.case_id, risk_score=alert["risk_score"])
+                if self.prefetcher is not None:
+                    self.prefetcher.invalidate(decision.case_id)
+                self.context_builder.invalidate(decision.case_id)
+                self._log(
+                    decision.case_id,
+                    "ALERT_MERGED",
+                    {
+                        "actor": actor,
+                        "customer_id": alert["customer_id"],
+                        "alert_reason": alert.get("alert_reason"),
+                        "risk_score": alert["risk_score"],
+                        "similarity": decision.similarity,
+                        "reason": decision.reason,
+                    },
+                )
+                return {"outcome": "merged", "case": self.get(decision.case_id), "decision": decision.to_dict()}
+
+            with self._lock:
+                case_id = self.repository.add(dict(fields, status=fields.get("status", NEW)))
+            index.add(case_id, fp, cluster_with=decision.case_id if decision.action == "cluster" else None)
+
+        self._log(case_id, "CASE_CREATED", {"actor": actor})
+        if decision.action == "cluster":
+            self._log(
+                case_id,
+                "CASE_CLUSTERED",
+                {"actor": actor, "cluster": index.cluster_of(case_id), "similarity": decision.similarity, "reason": decision.reason},
+            )
+        outcome = "clustered" if decision.action == "cluster" else "created"
+        return {"outcome": outcome, "case": self.get(case_id), "decision": decision.to_dict()}
+
+    def _record_ledger(self, alert: Dict[str, Any]):
+        """
+        Store the alert's customer and transactions (customer_360 follows by
+        trigger). When the alert brought transactions the ledger had not
+        seen, the customer's refreshed totals and the alert's risk score are
+        added to the peer sketches (PEER_METRICS), so percentiles track the
+        customers actually filed.
+        """
+        customer_id = alert["customer_id"]
+        transactions = [
+            dict(tx, tx_id=tx.get("tx_id") or _tx_id(customer_id, tx)) for tx in alert.get("transactions") or []
+        ]
+        profile = {k: alert[k] for k in ("region", "tier", "customer_type") if alert.get(k) is not None}
+        if self.ledger is not None:
+            stored = self.ledger.upsert_customer({
+                "customer_id": customer_id,
+                "customer_name": alert.get("customer_name"),
+                "linked_accounts": alert.get("linked_accounts") or [],
+            })
+            profile = stored or profile
+            new_ids = set(self.ledger.insert_transactions(customer_id, transactions))
+            if not new_ids or self.peer_stats is None:
+                return
+            exposure = self.ledger.customer_exposure(customer_id)
+        else:
+            profile = profile or DEMO_PROFILES.get(customer_id, {})
+            if self.peer_stats is None:
+                return
+            exposure = self._record_local(customer_id, transactions)
+            if exposure is None:
+                return
+
+        from backend.stats.peers import peer_metrics
+
+        resolve(self.peer_stats).observe_customer(profile, peer_metrics(alert, exposure))
+        self.flush_peer_stats(min_interval=60.0)
+
+    def _record_local(self, customer_id: str, transactions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Add new alert transactions to the local customer totals; None if nothing was new."""
+        with self._lock:
+            totals = self._local_exposure.get(customer_id)
+            if totals is None:
+                amounts = [float(tx["amount"]) for tx in DEMO_TRANSACTIONS.get(customer_id, [])]
+                totals = self._local_exposure[customer_id] = {
+                    "tx_ids": set(),
+                    "transaction_count": len(amounts),
+                    "total_amount": sum(amounts),
+                    "highest_single_transfer": max(amounts, default=0.0),
+                }
+            new = [tx for tx in transactions if tx["tx_id"] not in totals["tx_ids"]]
+            if not new:
+                return None
+            for tx in new:
+                totals["tx_ids"].add(tx["tx_id"])
+                totals["transaction_count"] += 1
+                totals["total_amount"] += float(tx["amount"])
+                totals["highest_single_transfer"] = max(totals["highest_single_transfer"], float(tx["amount"]))
+            return {k: v for k, v in totals.items() if k != "tx_ids"}
+
+    def flush_peer_stats(self, min_interval: float = 0.0) -> bool:
+        """Merge new peer observations into ``peer_stats_path``; see PeerStatsService.flush."""
+        if not self.peer_stats_path or self.peer_stats is None:
+            return False
+        if isinstance(self.peer_stats, Deferred) and not self.peer_stats.ready:
+            return False
+        return resolve(self.peer_stats).flush(self.peer_stats_path, min_interval=min_interval)
+
+    def case_cluster(self, case_id: int) -> List[int]:
+        """Open cases clustered with ``case_id`` at intake (including itself)."""
+        self.get(case_id)
+        return self.alert_index.get().cluster_of(case_id)
+
+    def update(
+        self,
+        case_id: int,
+        changes: Dict[str, Any],
+        actor: str = "system",
+        expected_version: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        self.get(case_id)
+        with self._lock:
+            self.repository.update(case_id, expected_version=expected_version, **changes)
+        if self.prefetcher is not None:
+            self.prefetcher.invalidate(case_id)
+        self.context_builder.invalidate(case_id)
+        self._log(case_id, "CASE_UPDATED", {"actor": actor, "changes": changes})
+        return self.get(case_id)
+
+    # -------------------------------
+    # Workflow
+    # -------------------------------
+    def transition(
+        self,
+        case_id: int,
+        status: str,
+        actor: str = "system",
+        expected_version: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Apply a state-machine transition. Raises InvalidTransition for illegal
+        moves and StaleCaseVersion if ``expected_version`` is out of date.
+        The repository writes the STATUS_CHANGED audit entry with the update.
+        """
+        self.get(case_id)
+        with self._lock:
+            case = self.repository.transition(
+                case_id,
+                status,
+                expected_version=expected_version,
+                details={"actor": actor},
+            )
+        if self.prefetcher is not None:
+            self.prefetcher.forget(case_id)
+        if self.alert_index.ready:
+            index = self.alert_index.get()
+            if status not in OPEN_STATUSES:
+                index.remove(case_id)
+            elif case_id not in index:
+                # Reopened for review
+                index.add(case_id, self._fingerprint(self.get(case_id)))
+        return case
+
+    def build_context(self, case_id: int):
+        return self.context_builder.build(self.get(case_id))
+
+    def get_context(self, case_id: int) -> Dict[str, Any]:
+        """Serialized case context snapshot (shared with the SAR prompt)."""
+        return self.build_context(case_id).to_dict()
+
+    def get_attributions(self, case_id: int) -> Optional[Dict[str, Any]]:
+        """Precomputed SHAP attributions (see backend.explainability.attributions)."""
+        self.get(case_id)
+        return self.explain_engine.attributions_for(case_id)
+
+    def draft_sar(self, case_id: int, actor: str = "system", expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generate a SAR narrative, store it and move the case to SAR_DRAFTED.
+
+        Status and ``expected_version`` are checked before the LLM runs.
+        The draft is saved before the transition and deleted again if the
+        transition fails, so a SAR_DRAFTED case always has its draft.
+        """
+        case = self.get(case_id)
+        read_version = case.get("version")
+        if expected_version is not None and read_version != expected_version:
+            raise StaleCaseVersion(f"Case {case_id} is at version {read_version}, expected {expected_version}")
+        check_transition(case["status"], SAR_DRAFTED)
+        context = self.context_builder.build(case)
+        sar_input = context.to_sar_input()
+
+        with self.foreground.active():
+            result = self.llm.generate(sar_input, allow_review=False)
+        narrative = result.narrative
+        model_name = getattr(self.llm, "model_name", "unknown")
+
+        # Only publish the draft if the case is unchanged since we read it;
+        # otherwise StaleCaseVersion lets the job retry on fresh data.
+        with self._lock:
+            draft_id = self.repository.save_draft(case_id, narrative, model_name)
+            try:
+                self.transition(case_id, SAR_DRAFTED, actor=actor, expected_version=read_version)
+            except Exception:
+                self.repository.delete_draft(case_id, draft_id)
+                raise
+
+        trace = self.explain_engine.capture_trace(
+            case_id=case_id,
+            model_name=model_name,
+            input_signals=context.to_signals(),
+            retrieved_context=result.retrieved_context,
+            sar_input=asdict(sar_input),
+            output={
+                "draft_id": draft_id,
+                "narrative_sha256": _sha256(narrative),
+                "source": result.source,
+                "similarity": result.similarity,
+                "template": result.template,
+                "guardrail_violations": result.violations,
+                "guardrail_retries": result.retries,
+            },
+        )
+        self._log(
+            case_id,
+            "SAR_DRAFTED",
+            {
+                "actor": actor,
+                "draft_id": draft_id,
+                "model_name": model_name,
+                "source": result.source,
+                "similarity": result.similarity,
+                "template": result.template,
+                "guardrail_violations": len(result.violations),
+                "guardrail_retries": result.retries,
+                "trace_version": trace.version,
+            },
+        )
+        return self.latest_draft(case_id)
+
+    def verify_audit(self, case_id: int, full: bool = False) -> Optional[Dict[str, Any]]:
+        """Hash-chain verification of the case's audit history (Postgres mode only)."""
+        self.get(case_id)
+        if self.audit is None:
+            return None
+        from backend.audit.chain import AuditChain
+
+        return AuditChain(self.audit).verify_case(case_id, full=full).to_dict()
+
+    def audit_history(self, case_id: int) -> List[Dict[str, Any]]:
+        """Chained audit entries of a case, oldest first (Postgres mode only)."""
+        self.get(case_id)
+        if self.audit is None:
+            return []
+        return self.audit.audit_entries(case_id)
+
+    # -------------------------------
+    # Memory
+    # -------------------------------
+    def memory_usage(self) -> Dict[str, Any]:
+        """Budget, spill file and per-store sizes of this process ({} without a budget)."""
+        return self.memory.usage() if self.memory is not None else {}
+
+    # -------------------------------
+    # Traces
+    # -------------------------------
+    def list_traces(self, case_id: int):
+        self.get(case_id)
+        return self.explain_engine.get_traces_for_case(case_id)
+
+    def diff_traces(self, case_id: int, from_version: int, to_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """What changed between two drafts of a case (latest when ``to_version`` is None)."""
+        self.get(case_id)
+        return self.explain_engine.diff(case_id, from_version, to_version)
+
+    def replay_trace(self, case_id: int, version: Optional[int] = None, actor: str = "system") -> Optional[Dict[str, Any]]:
+        """
+        Re-run SARLLM on a stored trace's exact inputs, exemplars and
+        template version.
+
+        An exact narrative-cache hit reproduces the original text; otherwise
+        the model is re-sampled and ``matches_original`` reports the outcome.
+        Nothing is saved as a draft and the case status is untouched.
+        """
+        from backend.llm.model import SARInput
+
+        self.get(case_id)
+        trace = self.explain_engine.get_trace(case_id, version)
+        if trace is None or trace.sar_input is None:
+            return None
+
+        with self.foreground.active():
+            result = self.llm.generate(
+                SARInput(**trace.sar_input),
+                exemplars=trace.retrieved_context,
+                template=trace.output.get("template") or None,
+            )
+        narrative_sha256 = _sha256(result.narrative)
+        replay = {
+            "case_id": case_id,
+            "trace_id": trace.trace_id,
+            "version": trace.version,
+            "source": result.source,
+            "narrative": result.narrative,
+            "narrative_sha256": narrative_sha256,
+            "guardrail_violations": result.violations,
+            "matches_original": narrative_sha256 == trace.output.get("narrative_sha256"),
+        }
+        self._log(
+            case_id,
+            "TRACE_REPLAYED",
+            {
+                "actor": actor,
+                "trace_id": trace.trace_id,
+                "version": trace.version,
+                "source": result.source,
+                "matches_original": replay["matches_original"],
+            },
+        )
+        return replay
+
+    def latest_draft(self, case_id: int) -> Optional[Dict[str, Any]]:
+        self.get(case_id)
+        return self.repository.latest_draft(case_id)
+
+    # -------------------------------
+    # Async drafting
+    # -------------------------------
+    def enqueue_draft(self, case_id: int, actor: str = "system") -> Dict[str, Any]:
+        """
+        Queue a SAR draft and return the job immediately.
+
+        A case the prefetcher already drafted is a narrative-cache hit, so
+        it is drafted inline and returned as a finished job instead.
+        """
+        case = self.get(case_id)
+        if self.prefetcher is not None and self.prefetcher.ready(case):
+            active = self.jobs.latest_for_case(case_id)
+            if active is None or not active.is_active:
+                try:
+                    draft = self.draft_sar(case_id, actor=actor)
+                except (InvalidTransition, StaleCaseVersion):
+                    pass  # changed since the check; take the queue
+                else:
+                    job = self.jobs.record_done(
+                        case_id, {"actor": actor, "prefetched": True}, {"draft_id": draft["draft_id"]}
+                    )
+                    return job.to_dict()
+        job = self.jobs.enqueue(case_id, {"actor": actor})
+        self._log(case_id, "SAR_DRAFT_QUEUED", {"actor": actor, "job_id": job.job_id})
+        return job.to_dict()
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def latest_job(self, case_id: int) -> Optional[Dict[str, Any]]:
+        job = self.jobs.latest_for_case(case_id)
+        return job.to_dict() if job else None
+
+
+def _load_attributions():
+    from backend.explainability.attributions import AttributionStore
+
+    return AttributionStore.load_if_exists(os.getenv("SAR_ATTRIBUTIONS", ".attributions.json"))
+
+
+def _load_peer_stats(demo: bool = True):
+    """
+    Persisted peer sketches (SAR_PEER_STATS, which intake in every process
+    merges its new customers into). Without them local mode gets a
+    synthetic demo population; Postgres mode starts empty and fills from
+    intake, so real cases are never compared with made-up peers.
+    """
+    from backend.stats.peers import PeerStatsService, demo_peer_stats
+
+    path = os.getenv("SAR_PEER_STATS")
+    if path and os.path.exists(path):
+        return PeerStatsService.load(path)
+    if not demo:
+        logger.warning("No peer statistics at SAR_PEER_STATS; peer deviation is unavailable until intake fills them")
+        return PeerStatsService()
+    return demo_peer_stats(DEMO_PROFILES)
+
+
+def build_default_service(start_workers: bool = True) -> CaseService:
+    """
+    Postgres-backed service when POSTGRES_URL is set, otherwise the
+    in-process demo store.
+
+    In Postgres mode drafting runs in separate worker processes
+    (``python -m backend.jobs.worker``). The demo store only exists in this
+    process, so local mode starts in-process worker threads instead, plus a
+    prefetcher for the SAR_PREFETCH_TOP_N highest-risk cases (0 disables
+    it; the first pass runs after SAR_PREFETCH_DELAY_S seconds, default
+    15), and warms the Ollama model in the background. Those workers own
+    the local job file and trace log: jobs a previous process left QUEUED
+    or RUNNING are failed at startup and its trace log is moved aside,
+    because its demo store is gone.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    # Numeric stores load on first use so the first page renders without them
+    attributions = Deferred(_load_attributions)
+    budget = default_budget()
+    if os.getenv("POSTGRES_URL"):
+        from backend.db.postgres import PostgresClient
+        from backend.jobs.queue import PostgresJobQueue
+
+        peer_stats = Deferred(lambda: _load_peer_stats(demo=False))
+        client = PostgresClient()
+        client.init_tables()
+        jobs = PostgresJobQueue(client)
+        jobs.init_table()
+        explain_engine = ExplainabilityEngine(attributions=attributions, store=client)
+        return CaseService(
+            PostgresCaseRepository(client),
+            audit=client,
+            jobs=jobs,
+            explain_engine=explain_engine,
+            context_builder=CaseContextBuilder(postgres_sources(client, peer_stats=peer_stats), budget=budget),
+            ledger=client,
+            memory=budget,
+            peer_stats=peer_stats,
+            peer_stats_path=os.getenv("SAR_PEER_STATS"),
+        )
+
+    peer_stats = Deferred(_load_peer_stats)
+    context_builder = CaseContextBuilder(demo_sources(peer_stats=peer_stats), budget=budget)
+
+    from backend.explainability.trace import JSONLTraceStore
+    from backend.jobs.queue import SQLiteJobQueue
+    from backend.jobs.worker import start_worker_threads
+
+    explain_engine = ExplainabilityEngine(
+        attributions=attributions,
+        # The process running the workers owns the demo store, so it starts a
+        # fresh log; other local processes (the replay CLI) read that log
+        store=JSONLTraceStore(os.getenv("SAR_TRACE_LOG", ".sar_traces.jsonl"), reset=start_workers),
+        budget=budget,
+    )
+
+    jobs = SQLiteJobQueue(os.getenv("SAR_JOB_DB", ".sar_jobs.sqlite3"))
+    jobs.init_table()
+    service = CaseService(
+        InMemoryCaseRepository(DEMO_CASES, budget=budget),
+        jobs=jobs,
+        explain_engine=explain_engine,
+        context_builder=context_builder,
+        memory=budget,
+        peer_stats=peer_stats,
+        peer_stats_path=os.getenv("SAR_PEER_STATS"),
+    )
+    if start_workers:
+        from backend.llm.endpoints import default_pool
+
+        # Jobs left by a previous process point at its (now reset) demo store
+        abandoned = jobs.abandon_active("Abandoned: the local case store was reset on restart")
+        if abandoned:
+            logger.info("Failed %d job(s) left by a previous local process", abandoned)
+        default_pool().start()
+        start_worker_threads(service, jobs, count=int(os.getenv("SAR_LOCAL_WORKERS", "1")))
+        start_prefetcher(
+            service,
+            top_n=int(os.getenv("SAR_PREFETCH_TOP_N", "5")),
+            start_delay=float(os.getenv("SAR_PREFETCH_DELAY_S", "15")),
+        )
+    return service
@@ -0,0 +1,52 @@
+"""
+Case workflow state machine for SAR AI Copilot.
+
+Responsibilities:
+- Define the case statuses and which transitions between them are legal
+- Provide the errors raised for illegal or conflicting transitions
+
+Repositories enforce these rules atomically together with a version check
+(optimistic locking), so concurrent analysts and workers cannot overwrite
+each other's changes.
+"""
+
+from typing import Dict, FrozenSet, List
+
+NEW = "NEW"
+UNDER_REVIEW = "UNDER_REVIEW"
+SAR_DRAFTED = "SAR_DRAFTED"
+CLOSED_FALSE_POSITIVE = "CLOSED_FALSE_POSITIVE"
+
+# Statuses new alerts may still be merged into
+OPEN_STATUSES: FrozenSet[str] = frozenset({NEW, UNDER_REVIEW, SAR_DRAFTED})
+
+ALLOWED_TRANSITIONS: Dict[str, FrozenSet[str]] = {
+    NEW: frozenset({UNDER_REVIEW, SAR_DRAFTED, CLOSED_FALSE_POSITIVE}),
+    UNDER_REVIEW: frozenset({SAR_DRAFTED, CLOSED_FALSE_POSITIVE}),
+    # Re-drafting keeps the case in SAR_DRAFTED
+    SAR_DRAFTED: frozenset({SAR_DRAFTED, UNDER_REVIEW, CLOSED_FALSE_POSITIVE}),
+    # Closed cases can only be reopened for review
+    CLOSED_FALSE_POSITIVE: frozenset({UNDER_REVIEW}),
+}
+
+
+class InvalidTransition(ValueError):
+    """The case's current status does not allow the requested transition."""
+
+
+class StaleCaseVersion(RuntimeError):
+    """The case changed since the caller read it (optimistic lock failure)."""
+
+
+def allowed_sources(target: str) -> List[str]:
+    """Statuses from which ``target`` may be reached."""
+    if target not in ALLOWED_TRANSITIONS:
+        raise InvalidTransition(f"Unknown case status: {target}")
+    return sorted(src for src, targets in ALLOWED_TRANSITIONS.items() if target in targets)
+
+
+def check_transition(current: str, target: str):
+    if target not in ALLOWED_TRANSITIONS:
+        raise InvalidTransition(f"Unknown case status: {target}")
+    if target not in ALLOWED_TRANSITIONS.get(current, frozenset()):
+        raise InvalidTransition(f"Cannot move case from {current} to {target}")
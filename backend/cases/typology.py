@@ -0,0 +1,24 @@
+"""
+AML typology tagging for SAR AI Copilot cases.
+
+Keyword rules that map an alert reason / transaction summary onto a coarse
+typology. Used to bucket exemplar SARs and to group related alerts.
+"""
+
+from typing import Dict, Tuple
+
+TYPOLOGY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "structuring": ("structuring", "sub-threshold", "below reporting", "below compliance", "threshold"),
+    "layering": ("layered", "layering", "shell", "rapid movement"),
+    "cross_border": ("cross-border", "offshore", "jurisdiction"),
+    "income_mismatch": ("income", "revenue", "declared", "inconsistent"),
+}
+
+
+def infer_typology(*texts: str) -> str:
+    """Return the first typology whose keywords appear, else "other"."""
+    blob = " ".join(t for t in texts if t).lower()
+    for typology, keywords in TYPOLOGY_KEYWORDS.items():
+        if any(k in blob for k in keywords):
+            return typology
+    return "other"
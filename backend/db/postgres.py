@@ -5,29 +5,34 @@ PostgreSQL helper module for SAR AI Copilot.
 
 Responsibilities:
 - Create and manage DB connections
-- Initialize core tables (cases, audit_logs)
+- Initialize core tables (cases, audit_logs, case_stats, sar_drafts, sar_traces)
+- Keep the customer ledger (customers, transactions) and its trigger-maintained
+  customer_360 summary, and serve a case's detail page in one query
+- Hash-chain audit_logs per case and store Merkle checkpoints
 - Provide simple insert/query helpers for the rest of the app
 
 This file is intentionally lightweight and hackathon-safe.
 """
 
+import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from dotenv import load_dotenv
+from psycopg2.extras import RealDictCursor, Json, execute_values
 
-# Load environment variables from .env
-load_dotenv()
 
-DATABASE_URL = os.getenv("POSTGRES_URL")
+def _dumps(value: Any) -> str:
+    # Audit details may carry datetimes or Decimals from query results
+    return json.dumps(value, default=str)
 
 
 class PostgresClient:
     def __init__(self, db_url: Optional[str] = None):
-        self.db_url = db_url or DATABASE_URL
+        # Read at construction, not import: callers load .env first
+        self.db_url = db_url or os.getenv("POSTGRES_URL")
         if not self.db_url:
             raise ValueError("POSTGRES_URL is not set in environment variables")
 
@@ -53,6 +58,111 @@ class PostgresClient:
                     """
                 )
 
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS sar_drafts (
+                        id SERIAL PRIMARY KEY,
+                        case_id INTEGER REFERENCES cases (id),
+                        narrative TEXT,
+                        model_name TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_sar_drafts_case
+                        ON sar_drafts (case_id, id DESC);
+                    """
+                )
+
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS sar_traces (
+                        trace_id TEXT PRIMARY KEY,
+                        case_id INTEGER NOT NULL,
+                        version INTEGER NOT NULL,
+                        body JSONB NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE (case_id, version)
+                    );
+                    """
+                )
+
+                # Columns added after the first schema; kept additive so
+                # existing databases upgrade in place.
+                cur.execute(
+                    """
+                    ALTER TABLE cases
+                        ADD COLUMN IF NOT EXISTS customer_name TEXT,
+                        ADD COLUMN IF NOT EXISTS alert_reason TEXT,
+                        ADD COLUMN IF NOT EXISTS transaction_summary TEXT,
+                        ADD COLUMN IF NOT EXISTS jurisdiction TEXT,
+                        ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1,
+                        ADD COLUMN IF NOT EXISTS risk_band TEXT GENERATED ALWAYS AS (
+                            CASE
+                                WHEN risk_score >= 80 THEN 'High'
+                                WHEN risk_score >= 70 THEN 'Medium'
+                                ELSE 'Low'
+                            END
+                        ) STORED;
+                    """
+                )
+
+                cur.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_cases_status_band
+                        ON cases (status, risk_band, id);
+                    CREATE INDEX IF NOT EXISTS idx_cases_band
+                        ON cases (risk_band, id);
+                    CREATE INDEX IF NOT EXISTS idx_cases_risk_score
+                        ON cases (risk_score, id);
+                    CREATE INDEX IF NOT EXISTS idx_cases_customer_name
+                        ON cases USING GIN (to_tsvector('simple', COALESCE(customer_name, '')));
+                    """
+                )
+
+                # Dashboard counters, maintained by trigger so the dashboard
+                # never has to scan the cases table.
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS case_stats (
+                        status TEXT NOT NULL,
+                        risk_band TEXT NOT NULL,
+                        case_count BIGINT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (status, risk_band)
+                    );
+
+                    CREATE OR REPLACE FUNCTION bump_case_stats() RETURNS TRIGGER AS $$
+                    BEGIN
+                        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                            UPDATE case_stats SET case_count = case_count - 1
+                            WHERE status = COALESCE(OLD.status, '') AND risk_band = OLD.risk_band;
+                        END IF;
+                        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                            INSERT INTO case_stats (status, risk_band, case_count)
+                            VALUES (COALESCE(NEW.status, ''), NEW.risk_band, 1)
+                            ON CONFLICT (status, risk_band)
+                            DO UPDATE SET case_count = case_stats.case_count + 1;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+
+                    DROP TRIGGER IF EXISTS trg_case_stats ON cases;
+                    CREATE TRIGGER trg_case_stats
+                        AFTER INSERT OR DELETE OR UPDATE OF status, risk_score ON cases
+                        FOR EACH ROW EXECUTE FUNCTION bump_case_stats();
+                    """
+                )
+
+                # Backfill counters once for databases created before case_stats
+                cur.execute(
+                    """
+                    INSERT INTO case_stats (status, risk_band, case_count)
+                    SELECT COALESCE(status, ''), risk_band, COUNT(*)
+                    FROM cases
+                    WHERE NOT EXISTS (SELECT 1 FROM case_stats)
+                    GROUP BY 1, 2;
+                    """
+                )
+
                 cur.execute(
                     """
                     CREATE TABLE IF NOT EXISTS audit_logs (
@@ -62,21 +172,247 @@ class PostgresClient:
                         details JSONB,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     );
+                    ALTER TABLE audit_logs
+                        ADD COLUMN IF NOT EXISTS seq INTEGER,
+                        ADD COLUMN IF NOT EXISTS prev_hash TEXT,
+                        ADD COLUMN IF NOT EXISTS entry_hash TEXT;
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_logs_chain
+                        ON audit_logs (COALESCE(case_id, 0), seq);
+                    CREATE INDEX IF NOT EXISTS idx_audit_logs_created
+                        ON audit_logs (created_at, id);
+                    """
+                )
+
+                # Per-case hash chain, stamped by trigger so every writer
+                # (log_action, log_actions, transition_case's CTE) is covered.
+                # The payload layout must match backend.audit.chain.entry_payload.
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS audit_chain_heads (
+                        case_id INTEGER PRIMARY KEY,
+                        seq INTEGER NOT NULL,
+                        head_hash TEXT NOT NULL
+                    );
+
+                    CREATE TABLE IF NOT EXISTS audit_checkpoints (
+                        id SERIAL PRIMARY KEY,
+                        scope TEXT NOT NULL,
+                        scope_key TEXT NOT NULL,
+                        first_ref BIGINT NOT NULL,
+                        last_ref BIGINT NOT NULL,
+                        leaf_count INTEGER NOT NULL,
+                        merkle_root TEXT NOT NULL,
+                        head_hash TEXT,
+                        prev_root TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_audit_checkpoints_scope
+                        ON audit_checkpoints (scope, scope_key, last_ref DESC);
+
+                    CREATE OR REPLACE FUNCTION chain_audit_log() RETURNS TRIGGER AS $$
+                    DECLARE
+                        head audit_chain_heads%ROWTYPE;
+                    BEGIN
+                        INSERT INTO audit_chain_heads (case_id, seq, head_hash)
+                        VALUES (COALESCE(NEW.case_id, 0), 0, repeat('0', 64))
+                        ON CONFLICT (case_id) DO NOTHING;
+
+                        SELECT * INTO head FROM audit_chain_heads
+                        WHERE case_id = COALESCE(NEW.case_id, 0)
+                        FOR UPDATE;
+
+                        NEW.seq := head.seq + 1;
+                        NEW.prev_hash := head.head_hash;
+                        NEW.entry_hash := encode(sha256(convert_to(concat_ws('|',
+                            NEW.prev_hash,
+                            COALESCE(NEW.case_id::TEXT, ''),
+                            NEW.seq::TEXT,
+                            COALESCE(NEW.action, ''),
+                            COALESCE(NEW.details::TEXT, ''),
+                            COALESCE(to_char(NEW.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'), '')
+                        ), 'UTF8')), 'hex');
+
+                        UPDATE audit_chain_heads SET seq = NEW.seq, head_hash = NEW.entry_hash
+                        WHERE case_id = COALESCE(NEW.case_id, 0);
+                        RETURN NEW;
+                    END;
+                    $$ LANGUAGE plpgsql;
+
+                    CREATE OR REPLACE FUNCTION reject_audit_change() RETURNS TRIGGER AS $$
+                    BEGIN
+                        RAISE EXCEPTION '% is append-only', TG_TABLE_NAME;
+                    END;
+                    $$ LANGUAGE plpgsql;
+
+                    DROP TRIGGER IF EXISTS trg_audit_chain ON audit_logs;
+                    CREATE TRIGGER trg_audit_chain
+                        BEFORE INSERT ON audit_logs
+                        FOR EACH ROW EXECUTE FUNCTION chain_audit_log();
+
+                    DROP TRIGGER IF EXISTS trg_audit_append_only ON audit_logs;
+                    CREATE TRIGGER trg_audit_append_only
+                        BEFORE UPDATE OR DELETE ON audit_logs
+                        FOR EACH ROW EXECUTE FUNCTION reject_audit_change();
+
+                    -- Incremental verification trusts checkpoints, so they
+                    -- are append-only too
+                    DROP TRIGGER IF EXISTS trg_audit_checkpoints_append_only ON audit_checkpoints;
+                    CREATE TRIGGER trg_audit_checkpoints_append_only
+                        BEFORE UPDATE OR DELETE ON audit_checkpoints
+                        FOR EACH ROW EXECUTE FUNCTION reject_audit_change();
+                    """
+                )
+
+                # Customer ledger behind the case detail view
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS customers (
+                        customer_id TEXT PRIMARY KEY,
+                        customer_name TEXT,
+                        customer_type TEXT,
+                        region TEXT,
+                        tier INTEGER,
+                        home_country TEXT,
+                        declared_annual_income NUMERIC,
+                        pep BOOLEAN NOT NULL DEFAULT FALSE,
+                        sanctions_hit BOOLEAN NOT NULL DEFAULT FALSE,
+                        adverse_media BOOLEAN NOT NULL DEFAULT FALSE,
+                        linked_accounts TEXT[] NOT NULL DEFAULT '{}',
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+
+                    CREATE TABLE IF NOT EXISTS transactions (
+                        tx_id TEXT PRIMARY KEY,
+                        customer_id TEXT NOT NULL,
+                        source TEXT NOT NULL,
+                        target TEXT NOT NULL,
+                        amount NUMERIC NOT NULL,
+                        country TEXT,
+                        channel TEXT,
+                        flagged BOOLEAN NOT NULL DEFAULT FALSE,
+                        occurred_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_transactions_customer
+                        ON transactions (customer_id, occurred_at DESC);
+                    CREATE INDEX IF NOT EXISTS idx_cases_customer
+                        ON cases (customer_id);
+                    CREATE INDEX IF NOT EXISTS idx_customers_linked
+                        ON customers USING GIN (linked_accounts);
+                    """
+                )
+
+                # Customer 360 summary: one row per customer, updated in place
+                # by trigger on every ledger insert so a case open never
+                # aggregates transactions. Updates and deletes (rare) cannot
+                # be applied incrementally (MAX, DISTINCT) and recompute the
+                # customer instead. The sub-threshold band matches
+                # backend.cases.context.exposure_from_transactions.
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS customer_360 (
+                        customer_id TEXT PRIMARY KEY,
+                        transaction_count BIGINT NOT NULL DEFAULT 0,
+                        total_amount NUMERIC NOT NULL DEFAULT 0,
+                        highest_single_transfer NUMERIC NOT NULL DEFAULT 0,
+                        sub_threshold_count BIGINT NOT NULL DEFAULT 0,
+                        flagged_count BIGINT NOT NULL DEFAULT 0,
+                        countries TEXT[] NOT NULL DEFAULT '{}',
+                        first_tx_at TIMESTAMP,
+                        last_tx_at TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+
+                    CREATE OR REPLACE FUNCTION refresh_customer_360(cid TEXT) RETURNS VOID AS $$
+                    BEGIN
+                        DELETE FROM customer_360 WHERE customer_id = cid;
+                        INSERT INTO customer_360 (
+                            customer_id, transaction_count, total_amount, highest_single_transfer,
+                            sub_threshold_count, flagged_count, countries, first_tx_at, last_tx_at
+                        )
+                        SELECT customer_id, COUNT(*), SUM(amount), MAX(amount),
+                               COUNT(*) FILTER (WHERE amount >= 9000 AND amount < 10000),
+                               COUNT(*) FILTER (WHERE flagged),
+                               COALESCE(ARRAY_AGG(DISTINCT country) FILTER (WHERE country IS NOT NULL), '{}'),
+                               MIN(occurred_at), MAX(occurred_at)
+                        FROM transactions
+                        WHERE customer_id = cid
+                        GROUP BY customer_id;
+                    END;
+                    $$ LANGUAGE plpgsql;
+
+                    CREATE OR REPLACE FUNCTION bump_customer_360() RETURNS TRIGGER AS $$
+                    BEGIN
+                        IF TG_OP = 'INSERT' THEN
+                            INSERT INTO customer_360 AS s (
+                                customer_id, transaction_count, total_amount, highest_single_transfer,
+                                sub_threshold_count, flagged_count, countries, first_tx_at, last_tx_at
+                            )
+                            VALUES (
+                                NEW.customer_id, 1, NEW.amount, NEW.amount,
+                                CASE WHEN NEW.amount >= 9000 AND NEW.amount < 10000 THEN 1 ELSE 0 END,
+                                CASE WHEN NEW.flagged THEN 1 ELSE 0 END,
+                                CASE WHEN NEW.country IS NULL THEN '{}'::TEXT[] ELSE ARRAY[NEW.country] END,
+                                NEW.occurred_at, NEW.occurred_at
+                            )
+                            ON CONFLICT (customer_id) DO UPDATE SET
+                                transaction_count = s.transaction_count + 1,
+                                total_amount = s.total_amount + EXCLUDED.total_amount,
+                                highest_single_transfer = GREATEST(s.highest_single_transfer, EXCLUDED.highest_single_transfer),
+                                sub_threshold_count = s.sub_threshold_count + EXCLUDED.sub_threshold_count,
+                                flagged_count = s.flagged_count + EXCLUDED.flagged_count,
+                                countries = CASE WHEN EXCLUDED.countries <@ s.countries
+                                                 THEN s.countries ELSE s.countries || EXCLUDED.countries END,
+                                first_tx_at = LEAST(s.first_tx_at, EXCLUDED.first_tx_at),
+                                last_tx_at = GREATEST(s.last_tx_at, EXCLUDED.last_tx_at),
+                                updated_at = NOW();
+                            RETURN NULL;
+                        END IF;
+                        PERFORM refresh_customer_360(OLD.customer_id);
+                        IF TG_OP = 'UPDATE' AND NEW.customer_id <> OLD.customer_id THEN
+                            PERFORM refresh_customer_360(NEW.customer_id);
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+
+                    DROP TRIGGER IF EXISTS trg_customer_360 ON transactions;
+                    CREATE TRIGGER trg_customer_360
+                        AFTER INSERT OR UPDATE OR DELETE ON transactions
+                        FOR EACH ROW EXECUTE FUNCTION bump_customer_360();
+                    """
+                )
+
+                # Backfill the summary once for ledgers loaded before customer_360
+                cur.execute(
+                    """
+                    SELECT refresh_customer_360(customer_id)
+                    FROM (SELECT DISTINCT customer_id FROM transactions) t
+                    WHERE NOT EXISTS (SELECT 1 FROM customer_360);
                     """
                 )
             conn.commit()
 
-    def create_case(self, customer_id: str, risk_score: float, status: str = "draft") -> int:
+    def create_case(
+        self,
+        customer_id: str,
+        risk_score: float,
+        status: str = "draft",
+        customer_name: Optional[str] = None,
+        alert_reason: Optional[str] = None,
+        transaction_summary: Optional[str] = None,
+        jurisdiction: Optional[str] = None,
+    ) -> int:
         """Insert a new SAR case and return its ID."""
         with self.connect() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    INSERT INTO cases (customer_id, risk_score, status)
-                    VALUES (%s, %s, %s)
+                    INSERT INTO cases
+                        (customer_id, risk_score, status, customer_name, alert_reason, transaction_summary, jurisdiction)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
                     RETURNING id;
                     """,
-                    (customer_id, risk_score, status),
+                    (customer_id, risk_score, status, customer_name, alert_reason, transaction_summary, jurisdiction),
                 )
                 case_id = cur.fetchone()["id"]
             conn.commit()
@@ -91,6 +427,666 @@ class PostgresClient:
                     INSERT INTO audit_logs (case_id, action, details)
                     VALUES (%s, %s, %s);
                     """,
-                    (case_id, action, details),
+                    (case_id, action, Json(details, dumps=_dumps)),
+                )
+            conn.commit()
+
+    def log_actions(self, entries: List[Tuple[int, str, Dict[str, Any]]]):
+        """Insert many audit entries in one statement; chaining is done per row by trigger."""
+        if not entries:
+            return
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    "INSERT INTO audit_logs (case_id, action, details) VALUES %s",
+                    [(case_id, action, Json(details, dumps=_dumps)) for case_id, action, details in entries],
+                    page_size=500,
+                )
+            conn.commit()
+
+    # -------------------------------
+    # Audit chain
+    # -------------------------------
+    _AUDIT_ENTRY_COLUMNS = """
+        id, case_id, seq, action, prev_hash, entry_hash,
+        details::TEXT AS details_text,
+        to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS created_at_text
+    """
+
+    def audit_entries(self, case_id: int, from_seq: int = 1, to_seq: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Chained entries of one case, in chain order, with the exact hashed text."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT {self._AUDIT_ENTRY_COLUMNS}
+                    FROM audit_logs
+                    WHERE COALESCE(case_id, 0) = %s AND seq >= %s
+                      AND (%s::INTEGER IS NULL OR seq <= %s)
+                    ORDER BY seq;
+                    """,
+                    (case_id, from_seq, to_seq, to_seq),
+                )
+                return cur.fetchall()
+
+    def audit_entries_for_day(self, day: str) -> List[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT {self._AUDIT_ENTRY_COLUMNS}
+                    FROM audit_logs
+                    WHERE created_at >= %s::DATE AND created_at < %s::DATE + 1
+                      AND seq IS NOT NULL
+                    ORDER BY id;
+                    """,
+                    (day, day),
+                )
+                return cur.fetchall()
+
+    def audit_entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT {self._AUDIT_ENTRY_COLUMNS} FROM audit_logs WHERE id = %s;",
+                    (entry_id,),
+                )
+                return cur.fetchone()
+
+    def audit_hashes(self, case_id: int, from_seq: int, to_seq: int) -> List[str]:
+        """Only the stored entry hashes of a range; used for Merkle proofs."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT entry_hash FROM audit_logs
+                    WHERE COALESCE(case_id, 0) = %s AND seq BETWEEN %s AND %s
+                    ORDER BY seq;
+                    """,
+                    (case_id, from_seq, to_seq),
+                )
+                return [row["entry_hash"] for row in cur.fetchall()]
+
+    def audit_head(self, case_id: int) -> Optional[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT case_id, seq, head_hash FROM audit_chain_heads WHERE case_id = %s;",
+                    (case_id,),
+                )
+                return cur.fetchone()
+
+    def audit_cases_behind_checkpoint(self) -> List[int]:
+        """Cases whose chain has grown past their latest checkpoint."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT h.case_id
+                    FROM audit_chain_heads h
+                    LEFT JOIN LATERAL (
+                        SELECT last_ref FROM audit_checkpoints c
+                        WHERE c.scope = 'case' AND c.scope_key = h.case_id::TEXT
+                        ORDER BY last_ref DESC LIMIT 1
+                    ) cp ON TRUE
+                    WHERE h.seq > COALESCE(cp.last_ref, 0)
+                    ORDER BY h.case_id;
+                    """
+                )
+                return [row["case_id"] for row in cur.fetchall()]
+
+    def audit_checkpoints(self, scope: str, scope_key: str) -> List[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT * FROM audit_checkpoints
+                    WHERE scope = %s AND scope_key = %s
+                    ORDER BY last_ref;
+                    """,
+                    (scope, scope_key),
+                )
+                return cur.fetchall()
+
+    def save_audit_checkpoint(self, checkpoint: Dict[str, Any]) -> int:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO audit_checkpoints
+                        (scope, scope_key, first_ref, last_ref, leaf_count, merkle_root, head_hash, prev_root)
+                    VALUES (%(scope)s, %(scope_key)s, %(first_ref)s, %(last_ref)s, %(leaf_count)s,
+                            %(merkle_root)s, %(head_hash)s, %(prev_root)s)
+                    RETURNING id;
+                    """,
+                    checkpoint,
+                )
+                checkpoint_id = cur.fetchone()["id"]
+            conn.commit()
+        return checkpoint_id
+
+    def case_counts(self) -> List[Dict[str, Any]]:
+        """Return the trigger-maintained (status, risk_band, case_count) rows."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT status, risk_band, case_count FROM case_stats WHERE case_count > 0;")
+                return cur.fetchall()
+
+    def list_cases(
+        self,
+        status: Optional[str] = None,
+        risk_band: Optional[str] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 25,
+        sort_by: str = "case_id",
+        descending: bool = False,
+        count_cap: int = 10000,
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Return one page of cases, the total number of matches and whether
+        that total was capped.
+
+        Filtering and pagination happen in Postgres; only the requested
+        page crosses the wire. Without a search the total comes from the
+        trigger-maintained case_stats rows; a name search counts at most
+        ``count_cap`` matches instead of every one.
+        """
+        clauses = []
+        params: List[Any] = []
+        if status:
+            clauses.append("status = %s")
+            params.append(status)
+        if risk_band:
+            clauses.append("risk_band = %s")
+            params.append(risk_band)
+        if search:
+            term = search.strip().lstrip("#")
+            # Word-prefix match on the name, served by the GIN index
+            tokens = ["".join(ch for ch in tok if ch.isalnum()) for tok in term.lower().split()]
+            tsquery = " & ".join(f"{tok}:*" for tok in tokens if tok)
+            name_clause = "to_tsvector('simple', COALESCE(customer_name, '')) @@ to_tsquery('simple', %s)"
+            if term.isdigit():
+                clauses.append(f"(id = %s OR {name_clause})")
+                params.extend([int(term), tsquery])
+            elif tsquery:
+                clauses.append(name_clause)
+                params.append(tsquery)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # Whitelisted so the ORDER BY can be interpolated safely
+        sort_columns = {
+            "case_id": "id",
+            "risk_score": "risk_score",
+            "customer_name": "lower(customer_name)",
+            "status": "status",
+        }
+        direction = "DESC" if descending else "ASC"
+        order_by = f"{sort_columns[sort_by]} {direction}, id {direction}"
+
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT id AS case_id, customer_id, customer_name, risk_score, risk_band,
+                           status, alert_reason, transaction_summary, jurisdiction, version, created_at
+                    FROM cases
+                    {where}
+                    ORDER BY {order_by}
+                    LIMIT %s OFFSET %s;
+                    """,
+                    (*params, limit, offset),
                 )
-            conn.commit()
\ No newline at end of file
+                rows = cur.fetchall()
+
+                if search:
+                    cur.execute(
+                        f"SELECT COUNT(*) AS n FROM (SELECT 1 FROM cases {where} LIMIT %s) matches;",
+                        (*params, count_cap + 1),
+                    )
+                    matches = cur.fetchone()["n"]
+                    return rows, min(matches, count_cap), matches > count_cap
+                cur.execute(
+                    """
+                    SELECT COALESCE(SUM(case_count), 0) AS n FROM case_stats
+                    WHERE (%s::TEXT IS NULL OR status = %s) AND (%s::TEXT IS NULL OR risk_band = %s);
+                    """,
+                    (status, status, risk_band, risk_band),
+                )
+                return rows, int(cur.fetchone()["n"]), False
+
+    def get_case(self, case_id: int) -> Optional[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT id AS case_id, customer_id, customer_name, risk_score, risk_band,
+                           status, alert_reason, transaction_summary, jurisdiction, version, created_at
+                    FROM cases
+                    WHERE id = %s;
+                    """,
+                    (case_id,),
+                )
+                return cur.fetchone()
+
+    def update_case(self, case_id: int, fields: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
+        """
+        Update editable case columns (risk_score, narrative fields) and bump
+        the version. Returns False if ``expected_version`` no longer matches.
+        Status changes go through transition_case.
+        """
+        allowed = {"risk_score", "customer_name", "alert_reason", "transaction_summary", "jurisdiction"}
+        changes = {k: v for k, v in fields.items() if k in allowed}
+        if not changes:
+            return True
+        assignments = ", ".join(f"{column} = %s" for column in changes)
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    UPDATE cases SET {assignments}, version = version + 1
+                    WHERE id = %s AND (%s::INTEGER IS NULL OR version = %s);
+                    """,
+                    (*changes.values(), case_id, expected_version, expected_version),
+                )
+                updated = cur.rowcount == 1
+            conn.commit()
+        return updated
+
+    def transition_case(
+        self,
+        case_id: int,
+        to_status: str,
+        allowed_from: List[str],
+        expected_version: Optional[int] = None,
+        action: str = "STATUS_CHANGED",
+        details: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Move a case to ``to_status`` and write its audit entry in one statement.
+
+        The update only applies if the current status is in ``allowed_from``
+        and (when given) the version still matches; otherwise nothing is
+        written and None is returned. No row locks are held across calls.
+        """
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH prev AS (
+                        SELECT id, status FROM cases WHERE id = %s
+                    ),
+                    updated AS (
+                        UPDATE cases c
+                        SET status = %s, version = c.version + 1
+                        FROM prev
+                        WHERE c.id = prev.id
+                          AND c.status = ANY(%s)
+                          AND (%s::INTEGER IS NULL OR c.version = %s)
+                        RETURNING c.*, prev.status AS from_status
+                    ),
+                    logged AS (
+                        INSERT INTO audit_logs (case_id, action, details)
+                        SELECT id, %s,
+                               jsonb_build_object('from', from_status, 'to', status, 'version', version) || %s::JSONB
+                        FROM updated
+                        RETURNING id
+                    )
+                    SELECT id AS case_id, customer_id, customer_name, risk_score, risk_band,
+                           status, alert_reason, transaction_summary, jurisdiction, version, created_at, from_status
+                    FROM updated;
+                    """,
+                    (
+                        case_id,
+                        to_status,
+                        list(allowed_from),
+                        expected_version,
+                        expected_version,
+                        action,
+                        _dumps(details or {}),
+                    ),
+                )
+                row = cur.fetchone()
+            conn.commit()
+        return row
+
+    def save_sar_draft(self, case_id: int, narrative: str, model_name: str) -> int:
+        """Store a generated SAR narrative and return the draft ID."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO sar_drafts (case_id, narrative, model_name)
+                    VALUES (%s, %s, %s)
+                    RETURNING id;
+                    """,
+                    (case_id, narrative, model_name),
+                )
+                draft_id = cur.fetchone()["id"]
+            conn.commit()
+        return draft_id
+
+    def delete_sar_draft(self, draft_id: int):
+        """Remove a draft whose case could not be moved to SAR_DRAFTED."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM sar_drafts WHERE id = %s;", (draft_id,))
+            conn.commit()
+
+    def latest_sar_draft(self, case_id: int) -> Optional[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT id AS draft_id, case_id, narrative, model_name, created_at
+                    FROM sar_drafts
+                    WHERE case_id = %s
+                    ORDER BY id DESC
+                    LIMIT 1;
+                    """,
+                    (case_id,),
+                )
+                return cur.fetchone()
+
+    def append_trace(self, trace: Dict[str, Any]) -> int:
+        """Store a reasoning trace as the case's next version; returns the version."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                # Concurrent appends for one case would read the same MAX(version);
+                # serialize them per case until this transaction commits
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext('sar_traces'), %s);", (trace["case_id"],))
+                cur.execute(
+                    """
+                    INSERT INTO sar_traces (trace_id, case_id, version, body)
+                    SELECT %s, %s, COALESCE(MAX(version), 0) + 1, %s
+                    FROM sar_traces
+                    WHERE case_id = %s
+                    RETURNING version;
+                    """,
+                    (trace["trace_id"], trace["case_id"], Json(trace, dumps=_dumps), trace["case_id"]),
+                )
+                version = cur.fetchone()["version"]
+            conn.commit()
+        return version
+
+    def traces_for_case(self, case_id: int) -> List[Dict[str, Any]]:
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT body || jsonb_build_object('version', version) AS body
+                    FROM sar_traces
+                    WHERE case_id = %s
+                    ORDER BY version;
+                    """,
+                    (case_id,),
+                )
+                return [row["body"] for row in cur.fetchall()]
+
+    # -------------------------------
+    # Customer ledger
+    # -------------------------------
+    _CUSTOMER_COLUMNS = (
+        "customer_name", "customer_type", "region", "tier", "home_country",
+        "declared_annual_income", "pep", "sanctions_hit", "adverse_media",
+    )
+
+    def upsert_customer(self, customer: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insert or update a customer. Fields left out (or None) keep their
+        stored value; linked accounts are merged, never dropped. Returns
+        the stored peer segment (region, tier, customer_type).
+        """
+        columns = [c for c in self._CUSTOMER_COLUMNS if customer.get(c) is not None]
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns)
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    INSERT INTO customers AS cu (customer_id, linked_accounts{"".join(f", {c}" for c in columns)})
+                    VALUES (%s, %s{", %s" * len(columns)})
+                    ON CONFLICT (customer_id) DO UPDATE SET
+                        {updates + "," if updates else ""}
+                        linked_accounts = ARRAY(
+                            SELECT DISTINCT unnest(cu.linked_accounts || EXCLUDED.linked_accounts) ORDER BY 1
+                        ),
+                        updated_at = NOW()
+                    RETURNING region, tier, customer_type;
+                    """,
+                    (customer["customer_id"], list(customer.get("linked_accounts") or []), *(customer[c] for c in columns)),
+                )
+                segment = cur.fetchone()
+            conn.commit()
+        return {k: v for k, v in segment.items() if v is not None}
+
+    def insert_transactions(self, customer_id: str, transactions: List[Dict[str, Any]]) -> List[str]:
+        """
+        Append ledger rows for ``customer_id``; rows whose tx_id is already
+        stored are skipped, so replaying an alert does not double count.
+        Returns the tx_ids of the new rows (customer_360 is updated by trigger).
+        """
+        if not transactions:
+            return []
+        rows = [
+            (
+                tx["tx_id"], customer_id, tx["source"], tx["target"], tx["amount"],
+                tx.get("country"), tx.get("channel"), bool(tx.get("flagged")),
+                tx.get("timestamp") or datetime.utcnow(),
+            )
+            for tx in transactions
+        ]
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                inserted = execute_values(
+                    cur,
+                    """
+                    INSERT INTO transactions
+                        (tx_id, customer_id, source, target, amount, country, channel, flagged, occurred_at)
+                    VALUES %s
+                    ON CONFLICT (tx_id) DO NOTHING
+                    RETURNING tx_id
+                    """,
+                    rows,
+                    page_size=500,
+                    fetch=True,
+                )
+            conn.commit()
+        return [row["tx_id"] for row in inserted]
+
+    def customer_exposure(self, customer_id: str) -> Dict[str, Any]:
+        """The customer's customer_360 totals (zeros before its first transaction)."""
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT transaction_count, total_amount, highest_single_transfer,
+                           sub_threshold_count, flagged_count
+                    FROM customer_360
+                    WHERE customer_id = %s;
+                    """,
+                    (customer_id,),
+                )
+                row = cur.fetchone()
+        return dict(row) if row else {
+            "transaction_count": 0, "total_amount": 0, "highest_single_transfer": 0,
+            "sub_threshold_count": 0, "flagged_count": 0,
+        }
+
+    def open_cases_for_accounts(self, accounts: List[str], statuses: List[str]) -> List[Dict[str, Any]]:
+        """
+        Cases in ``statuses`` held by one of ``accounts`` or by a customer
+        that lists one of them as a linked account.
+        """
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT id AS case_id, customer_id, customer_name, risk_score, risk_band,
+                           status, alert_reason, transaction_summary, jurisdiction, version, created_at
+                    FROM cases
+                    WHERE status = ANY(%s)
+                      AND customer_id IN (
+                          SELECT unnest(%s::TEXT[])
+                          UNION
+                          SELECT customer_id FROM customers WHERE linked_accounts && %s::TEXT[]
+                      )
+                    ORDER BY id;
+                    """,
+                    (list(statuses), list(accounts), list(accounts)),
+                )
+                return cur.fetchall()
+
+    @contextmanager
+    def intake_lock(self, accounts: List[str]):
+        """
+        Hold a session advisory lock per account for the duration of the
+        block, so alerts touching the same customer or linked account are
+        matched and filed one at a time across processes. Locks are taken
+        in sorted order to avoid deadlocks and released with the connection.
+        """
+        conn = self.connect()
+        try:
+            with conn.cursor() as cur:
+                for account in sorted(set(accounts)):
+                    cur.execute("SELECT pg_advisory_lock(hashtext(%s));", (f"alert-intake:{account}",))
+            conn.commit()
+            yield
+        finally:
+            conn.close()
+
+    def case_detail(self, case_id: int, max_transactions: int = 500) -> Optional[Dict[str, Any]]:
+        """
+        Everything the case detail page shows, in one statement: the case,
+        the customer profile and screening flags, the customer_360 exposure
+        summary, the latest draft and the customer's most recent
+        transactions. Every part is a primary-key or index lookup.
+        """
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT c.id AS case_id, c.customer_id, c.customer_name, c.risk_score, c.risk_band,
+                           c.status, c.alert_reason, c.transaction_summary, c.jurisdiction, c.version, c.created_at,
+                           to_jsonb(cu) AS customer,
+                           to_jsonb(s) AS summary,
+                           (SELECT COUNT(*) FROM unnest(s.countries) AS country
+                            WHERE country IS DISTINCT FROM cu.home_country) AS offshore_jurisdictions,
+                           d.draft AS latest_draft,
+                           COALESCE(t.transactions, '[]'::JSONB) AS transactions,
+                           NOW()::TIMESTAMP AS as_of
+                    FROM cases c
+                    LEFT JOIN customers cu ON cu.customer_id = c.customer_id
+                    LEFT JOIN customer_360 s ON s.customer_id = c.customer_id
+                    LEFT JOIN LATERAL (
+                        SELECT jsonb_build_object(
+                                   'draft_id', id, 'case_id', case_id, 'narrative', narrative,
+                                   'model_name', model_name, 'created_at', created_at
+                               ) AS draft
+                        FROM sar_drafts
+                        WHERE case_id = c.id
+                        ORDER BY id DESC
+                        LIMIT 1
+                    ) d ON TRUE
+                    LEFT JOIN LATERAL (
+                        SELECT jsonb_agg(to_jsonb(r) ORDER BY r.occurred_at, r.tx_id) AS transactions
+                        FROM (
+                            SELECT tx_id, source, target, amount, country, channel, flagged, occurred_at
+                            FROM transactions
+                            WHERE customer_id = c.customer_id
+                            ORDER BY occurred_at DESC
+                            LIMIT %s
+                        ) r
+                    ) t ON TRUE
+                    WHERE c.id = %s;
+                    """,
+                    (max_transactions, case_id),
+                )
+                row = cur.fetchone()
+        if row is None:
+            return None
+
+        customer = row.pop("customer") or {}
+        summary = row.pop("summary") or {}
+        offshore = row.pop("offshore_jurisdictions") or 0
+        latest_draft = row.pop("latest_draft")
+        transactions = row.pop("transactions")
+        as_of = row.pop("as_of")
+        for tx in transactions:
+            tx["timestamp"] = datetime.fromisoformat(tx.pop("occurred_at"))
+
+        first, last = summary.get("first_tx_at"), summary.get("last_tx_at")
+        window_days = 0
+        if first and last:
+            window_days = max(1, (datetime.fromisoformat(last) - datetime.fromisoformat(first)).days + 1)
+        return {
+            "case": row,
+            "profile": {
+                k: customer.get(k)
+                for k in ("region", "tier", "customer_type", "declared_annual_income", "home_country",
+                          "pep", "sanctions_hit", "linked_accounts")
+                if customer.get(k) is not None
+            },
+            "screening": {
+                "pep": bool(customer.get("pep")),
+                "sanctions_hit": bool(customer.get("sanctions_hit")),
+                "adverse_media": bool(customer.get("adverse_media")),
+                "jurisdictions": sorted(summary.get("countries") or []),
+            },
+            "exposure": {
+                "transaction_count": summary.get("transaction_count", 0),
+                "total_amount": summary.get("total_amount", 0),
+                "highest_single_transfer": summary.get("highest_single_transfer", 0),
+                "offshore_jurisdictions": offshore,
+                "sub_threshold_count": summary.get("sub_threshold_count", 0),
+                "flagged_count": summary.get("flagged_count", 0),
+                "monitoring_window_days": window_days,
+            },
+            "transactions": transactions,
+            "latest_draft": latest_draft,
+            "as_of": as_of,
+        }
+
+
+def seed_demo(client: PostgresClient) -> Dict[str, int]:
+    """Load the demo customers and ledger (and the demo cases into an empty table)."""
+    from datetime import timedelta
+
+    from backend.cases.demo import DEMO_AS_OF, DEMO_CASES, DEMO_PROFILES, DEMO_TRANSACTIONS
+
+    as_of = datetime.fromisoformat(DEMO_AS_OF)
+    names = {c["customer_id"]: c.get("customer_name") for c in DEMO_CASES}
+    inserted = 0
+    for customer_id, profile in DEMO_PROFILES.items():
+        client.upsert_customer(dict(profile, customer_id=customer_id, customer_name=names.get(customer_id)))
+        txs = []
+        for tx in DEMO_TRANSACTIONS.get(customer_id, []):
+            row = dict(tx)
+            row["timestamp"] = as_of + timedelta(days=row.pop("day"))
+            txs.append(row)
+        inserted += len(client.insert_transactions(customer_id, txs))
+
+    cases = 0
+    if not sum(row["case_count"] for row in client.case_counts()):
+        for case in DEMO_CASES:
+            client.create_case(**{k: v for k, v in case.items() if k != "case_id"})
+            cases += 1
+    return {"customers": len(DEMO_PROFILES), "transactions": inserted, "cases": cases}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create the SAR AI Copilot schema in POSTGRES_URL")
+    parser.add_argument("--seed-demo", action="store_true", help="Also load the demo customers, ledger and cases")
+    args = parser.parse_args()
+
+    client = PostgresClient()
+    client.init_tables()
+    if args.seed_demo:
+        print(json.dumps(seed_demo(client)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+"""
+Offline evaluation harness for SAR drafts.
+
+Runs a fixture set of cases through the full SARLLM drafting path
+(template selection, guardrails, section retries) in parallel, against
+the mock model or a local Ollama model, and scores every draft on:
+
+- section completeness
+- factual consistency: the SARInput's risk score and headline amounts
+  stated, and stated correctly (checked independently of the guardrails
+  the drafting path already retries against)
+- coverage of the input's transaction amounts
+- length
+- forbidden (accusatory) phrase rate
+- latency and tokens/sec
+
+Each run is stored under .eval_runs/<run_id>/ (run.json + results.jsonl)
+so runs can be compared side by side:
+
+    python -m backend.eval.harness fixtures --out eval_fixtures.jsonl --repeat 20
+    python -m backend.eval.harness run --label baseline --fixtures eval_fixtures.jsonl
+    python -m backend.eval.harness run --label new-prompt --template-dir prompts/ --fixtures eval_fixtures.jsonl
+    python -m backend.eval.harness compare baseline new-prompt
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.llm.guardrails import check_narrative
+
+RUNS_DIR = ".eval_runs"
+
+# +1: higher is better, -1: lower is better; other metrics are informational
+QUALITY_METRICS = {
+    "section_completeness": 1,
+    "factual_consistency": 1,
+    "forbidden_per_1k_words": -1,
+    "error_rate": -1,
+}
+SUMMARY_METRICS = (
+    "section_completeness",
+    "factual_consistency",
+    "amount_coverage",
+    "forbidden_per_1k_words",
+    "words",
+    "retries",
+    "latency_s",
+    "tokens_per_s",
+)
+
+
+@dataclass
+class Fixture:
+    fixture_id: str
+    sar_input: Dict[str, Any]
+
+
+def demo_fixtures(repeat: int = 1) -> List[Fixture]:
+    """SAR inputs for the demo cases, built through the real context loaders."""
+    from backend.cases.context import CaseContextBuilder, demo_sources
+    from backend.cases.demo import DEMO_CASES
+
+    builder = CaseContextBuilder(demo_sources())
+    inputs = [(case["case_id"], asdict(builder.build(case).to_sar_input())) for case in DEMO_CASES]
+    # Round-trip through JSON so fixtures built here and loaded from a file are identical
+    inputs = [(case_id, json.loads(json.dumps(sar_input, default=str))) for case_id, sar_input in inputs]
+    return [
+        Fixture(f"case-{case_id}" + (f"-{i}" if repeat > 1 else ""), sar_input)
+        for i in range(repeat)
+        for case_id, sar_input in inputs
+    ]
+
+
+def save_fixtures(fixtures: List[Fixture], path: str):
+    with open(path, "w") as f:
+        for fixture in fixtures:
+            f.write(json.dumps(asdict(fixture), default=str) + "\n")
+
+
+def load_fixtures(path: str) -> List[Fixture]:
+    with open(path) as f:
+        return [Fixture(**json.loads(line)) for line in f if line.strip()]
+
+
+# -------------------------------
+# Scoring
+# -------------------------------
+_NUMBER_RE = re.compile(
+    r"(?<![\w.])(?P<value>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"(?:\s*(?P<scale>thousand|million|billion|k|m|mn|bn)\b)?",
+    re.IGNORECASE,
+)
+_SCALES = {"thousand": 1e3, "k": 1e3, "million": 1e6, "m": 1e6, "mn": 1e6, "billion": 1e9, "bn": 1e9}
+_STATED_RISK_RE = re.compile(r"\brisk\s+score\D{0,20}?(?P<value>\d+(?:\.\d+)?)", re.IGNORECASE)
+
+# Headline amounts every SAR narrative is expected to state
+KEY_AMOUNTS = ("total_amount", "highest_single_transfer")
+
+
+def _numbers(text: str) -> List[float]:
+    values = []
+    for m in _NUMBER_RE.finditer(text):
+        value = float(m.group("value").replace(",", ""))
+        values.append(value * _SCALES.get((m.group("scale") or "").lower(), 1.0))
+    return values
+
+
+def _mentions(values: List[float], expected: float, rel_tol: float = 0.01) -> bool:
+    # 1% absorbs rounding such as "$1.23 million" for 1,234,567
+    return any(abs(v - expected) <= max(0.01, rel_tol * abs(expected)) for v in values)
+
+
+def expected_facts(sar_input) -> Dict[str, Any]:
+    """Figures taken straight from the SARInput, independent of the guardrails."""
+    profile = sar_input.customer_profile or {}
+    summary = sar_input.transaction_summary or {}
+    exposure = summary.get("exposure") or {}
+    risk = profile.get("risk_score")
+    amounts = {k: float(exposure[k]) for k in KEY_AMOUNTS if exposure.get(k)}
+    transactions = sorted({float(e["amount"]) for e in summary.get("timeline") or [] if e.get("amount")})
+    return {
+        "risk_score": float(risk) if risk is not None else None,
+        "amounts": amounts,
+        "transaction_amounts": transactions,
+    }
+
+
+def score_facts(narrative: str, sar_input) -> Dict[str, Any]:
+    """
+    Share of the key facts (risk score, headline amounts) the narrative
+    states correctly, and share of transaction amounts it mentions. A
+    risk score counts only if every stated risk score matches the input.
+    """
+    facts = expected_facts(sar_input)
+    numbers = _numbers(narrative)
+    checks = {}
+    if facts["risk_score"] is not None:
+        stated = [float(m.group("value")) for m in _STATED_RISK_RE.finditer(narrative)]
+        checks["risk_score"] = bool(stated) and all(abs(v - facts["risk_score"]) < 0.5 + 1e-9 for v in stated)
+    for name, value in facts["amounts"].items():
+        checks[name] = _mentions(numbers, value)
+    transactions = facts["transaction_amounts"]
+    covered = sum(_mentions(numbers, value) for value in transactions)
+    return {
+        "factual_consistency": sum(checks.values()) / len(checks) if checks else 1.0,
+        "facts_missing": sorted(name for name, ok in checks.items() if not ok),
+        "amount_coverage": covered / len(transactions) if transactions else 1.0,
+    }
+
+
+def score_draft(narrative: str, sar_input, sections, heading_re) -> Dict[str, Any]:
+    violations = check_narrative(narrative, sar_input, sections, heading_re)
+    kinds = [v.kind for v in violations]
+    words = len(narrative.split())
+    incomplete = kinds.count("missing_section") + kinds.count("empty_section")
+    return {
+        "section_completeness": 1 - incomplete / len(sections) if sections else 1.0,
+        **score_facts(narrative, sar_input),
+        "words": words,
+        "forbidden_phrases": kinds.count("accusatory"),
+        "forbidden_per_1k_words": 1000 * kinds.count("accusatory") / words if words else 0.0,
+        "violations": [v.to_dict() for v in violations],
+    }
+
+
+def evaluate_fixture(llm, fixture: Fixture, template: Optional[str] = None) -> Dict[str, Any]:
+    from backend.llm.model import SARInput
+
+    sar_input = SARInput(**fixture.sar_input)
+    row: Dict[str, Any] = {"fixture_id": fixture.fixture_id}
+    start = time.perf_counter()
+    try:
+        result = llm.generate(sar_input, exemplars="None available.", template=template)
+    except Exception as exc:
+        row.update(error=f"{type(exc).__name__}: {exc}", latency_s=time.perf_counter() - start)
+        return row
+    latency = time.perf_counter() - start
+
+    compiled = llm.template_for(sar_input, result.template)
+    # Whitespace tokens; comparable across runs, not the model tokenizer's count
+    tokens = len(result.narrative.split())
+    row.update(
+        template=result.template,
+        source=result.source,
+        retries=result.retries,
+        latency_s=latency,
+        tokens=tokens,
+        tokens_per_s=tokens / latency if latency > 0 else 0.0,
+        narrative=result.narrative,
+        **score_draft(result.narrative, sar_input, compiled.sections, compiled.heading_re),
+    )
+    return row
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(results: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    ok = [r for r in results if "error" not in r]
+    summary: Dict[str, Any] = {
+        "drafts": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "wall_s": wall_s,
+        "drafts_per_s": len(results) / wall_s if wall_s > 0 else 0.0,
+    }
+    for metric in SUMMARY_METRICS:
+        values = [r[metric] for r in ok]
+        summary[metric] = statistics.fmean(values) if values else None
+    latencies = [r["latency_s"] for r in ok]
+    if latencies:
+        summary["latency_p50_s"] = _percentile(latencies, 0.50)
+        summary["latency_p95_s"] = _percentile(latencies, 0.95)
+    return summary
+
+
+def run_eval(llm, fixtures: List[Fixture], workers: int = 4, template: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda fixture: evaluate_fixture(llm, fixture, template), fixtures))
+    return results, summarize(results, time.perf_counter() - start)
+
+
+# -------------------------------
+# Run storage
+# -------------------------------
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def save_run(meta: Dict[str, Any], results: List[Dict[str, Any]], summary: Dict[str, Any], runs_dir: str = RUNS_DIR) -> str:
+    run_dir = os.path.join(runs_dir, meta["run_id"])
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, "run.json"), "w") as f:
+        json.dump(dict(meta, summary=summary), f, indent=2)
+    with open(os.path.join(run_dir, "results.jsonl"), "w") as f:
+        for row in results:
+            f.write(json.dumps(row, default=str) + "\n")
+    return run_dir
+
+
+def find_run(ref: str, runs_dir: str = RUNS_DIR) -> str:
+    """A run directory, run id, or label (latest run with that label)."""
+    if os.path.isdir(ref):
+        return ref
+    if os.path.isdir(os.path.join(runs_dir, ref)):
+        return os.path.join(runs_dir, ref)
+    labelled = sorted(d for d in os.listdir(runs_dir) if d.endswith(f"-{ref}")) if os.path.isdir(runs_dir) else []
+    if not labelled:
+        raise FileNotFoundError(f"No eval run '{ref}' in {runs_dir}")
+    return os.path.join(runs_dir, labelled[-1])
+
+
+def load_run(ref: str, runs_dir: str = RUNS_DIR) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    run_dir = find_run(ref, runs_dir)
+    with open(os.path.join(run_dir, "run.json")) as f:
+        meta = json.load(f)
+    with open(os.path.join(run_dir, "results.jsonl")) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    return meta, results
+
+
+def compare_runs(
+    a: Tuple[Dict[str, Any], List[Dict[str, Any]]],
+    b: Tuple[Dict[str, Any], List[Dict[str, Any]]],
+    tolerance: float = 0.01,
+) -> Dict[str, Any]:
+    """
+    Summary metrics side by side, quality regressions of B against A
+    beyond ``tolerance``, and the fixtures whose quality dropped. Any rise
+    in the error count is a regression, as is an error rate more than
+    ``tolerance`` higher; a fixture that drafted in A and errors in B is
+    listed with its error.
+    """
+    (meta_a, results_a), (meta_b, results_b) = a, b
+    summary_a, summary_b = _with_error_rate(meta_a["summary"]), _with_error_rate(meta_b["summary"])
+    rows, regressions = [], []
+    for metric in SUMMARY_METRICS + ("drafts_per_s", "latency_p95_s", "errors", "error_rate"):
+        va, vb = summary_a.get(metric), summary_b.get(metric)
+        delta = vb - va if va is not None and vb is not None else None
+        direction = QUALITY_METRICS.get(metric)
+        if metric == "errors":
+            regressed = bool(delta is not None and delta > 0)
+        else:
+            regressed = bool(direction and delta is not None and direction * delta < -tolerance)
+        rows.append({"metric": metric, "a": va, "b": vb, "delta": delta, "regressed": regressed})
+        if regressed:
+            regressions.append(metric)
+
+    by_id = {r["fixture_id"]: r for r in results_a if "error" not in r}
+    worse = []
+    for row in results_b:
+        base = by_id.get(row["fixture_id"])
+        if base is None:
+            continue
+        if "error" in row:
+            worse.append({"fixture_id": row["fixture_id"], "drops": {}, "error": row["error"]})
+            continue
+        drops = {
+            m: row[m] - base[m] for m, direction in QUALITY_METRICS.items()
+            if m in row and m in base and direction * (row[m] - base[m]) < -tolerance
+        }
+        if drops:
+            worse.append({"fixture_id": row["fixture_id"], "drops": drops})
+
+    return {
+        "a": meta_a["run_id"],
+        "b": meta_b["run_id"],
+        "metrics": rows,
+        "regressions": regressions,
+        "fixtures_worse": worse,
+    }
+
+
+def _with_error_rate(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs stored before error_rate was recorded derive it from the counts."""
+    if summary.get("error_rate") is None and summary.get("drafts"):
+        summary = dict(summary, error_rate=summary.get("errors", 0) / summary["drafts"])
+    return summary
+
+
+def _build_llm(args):
+    from backend.llm.model import SARLLM
+    from backend.llm.registry import TemplateRegistry, default_registry
+
+    if args.model == "mock":
+        from backend.eval.mock import MockSARChatModel
+
+        chat_model = MockSARChatModel(token_delay=args.token_delay, flaw_rate=args.flaw_rate)
+    else:
+        from backend.llm.endpoints import EndpointPool
+
+        pool = EndpointPool.from_env(args.ollama_model)
+        if args.ollama_url:
+            pool = EndpointPool(args.ollama_url, model=args.ollama_model, keep_alive=pool.keep_alive)
+        # Load the model before the clock starts so the first fixture is not an outlier
+        pool.warm_up()
+        chat_model = pool.chat_model(temperature=0.2)
+    templates = TemplateRegistry(args.template_dir) if args.template_dir else default_registry()
+    # No narrative cache and no exemplar retrieval: every fixture is drafted fresh
+    llm = SARLLM(llm=chat_model, templates=templates, max_section_retries=args.max_retries)
+    llm.model_name = "mock" if args.model == "mock" else args.ollama_model
+    return llm
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.4g}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate SAR drafting quality and speed on a fixture set")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fixtures_cmd = commands.add_parser("fixtures", help="Write the demo fixture set to a file")
+    fixtures_cmd.add_argument("--out", default="eval_fixtures.jsonl")
+    fixtures_cmd.add_argument("--repeat", type=int, default=1)
+
+    run_cmd = commands.add_parser("run", help="Draft every fixture and store a scored run")
+    run_cmd.add_argument("--fixtures", help="Fixture JSONL (defaults to the demo cases)")
+    run_cmd.add_argument("--repeat", type=int, default=1, help="Repeat the demo cases (no --fixtures)")
+    run_cmd.add_argument("--label", default="run")
+    run_cmd.add_argument("--model", choices=("mock", "ollama"), default="mock")
+    run_cmd.add_argument("--ollama-model", default="mistral")
+    run_cmd.add_argument("--ollama-url", action="append", help="Ollama instance (repeatable; default SAR_OLLAMA_URLS)")
+    run_cmd.add_argument("--token-delay", type=float, default=0.0, help="Mock model seconds per token")
+    run_cmd.add_argument("--flaw-rate", type=float, default=0.0, help="Mock model share of flawed drafts")
+    run_cmd.add_argument("--template-dir", help="Evaluate an alternative template directory")
+    run_cmd.add_argument("--template", help="Pin one template (id@vN) instead of selecting by jurisdiction")
+    run_cmd.add_argument("--max-retries", type=int, default=2, help="Guardrail retries per section")
+    run_cmd.add_argument("--workers", type=int, default=4)
+    run_cmd.add_argument("--runs-dir", default=RUNS_DIR)
+
+    compare_cmd = commands.add_parser("compare", help="Compare two stored runs (id, label or directory)")
+    compare_cmd.add_argument("a")
+    compare_cmd.add_argument("b")
+    compare_cmd.add_argument("--tolerance", type=float, default=0.01)
+    compare_cmd.add_argument("--runs-dir", default=RUNS_DIR)
+    compare_cmd.add_argument("--fail-on-regression", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "fixtures":
+        fixtures = demo_fixtures(args.repeat)
+        save_fixtures(fixtures, args.out)
+        print(f"Wrote {len(fixtures)} fixtures to {args.out}")
+        return
+
+    if args.command == "run":
+        fixtures = load_fixtures(args.fixtures) if args.fixtures else demo_fixtures(args.repeat)
+        llm = _build_llm(args)
+        results, summary = run_eval(llm, fixtures, workers=args.workers, template=args.template)
+        created_at = datetime.utcnow()
+        meta = {
+            "run_id": f"{created_at:%Y%m%dT%H%M%S}-{args.label}",
+            "label": args.label,
+            "created_at": created_at.isoformat(),
+            "git_commit": _git_commit(),
+            "model": llm.model_name,
+            "template_dir": args.template_dir,
+            "template": args.template,
+            "max_section_retries": args.max_retries,
+            "fixtures": args.fixtures or f"demo x{args.repeat}",
+            "workers": args.workers,
+        }
+        run_dir = save_run(meta, results, summary, args.runs_dir)
+        print(f"Stored {len(results)} drafts in {run_dir}")
+        for key, value in summary.items():
+            print(f"  {key:<24} {_fmt(value)}")
+        return
+
+    report = compare_runs(
+        load_run(args.a, args.runs_dir), load_run(args.b, args.runs_dir), tolerance=args.tolerance
+    )
+    print(f"{'metric':<24} {report['a']:>28} {report['b']:>28} {'delta':>10}")
+    for row in report["metrics"]:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['metric']:<24} {_fmt(row['a']):>28} {_fmt(row['b']):>28} {_fmt(row['delta']):>10}{flag}")
+    if report["fixtures_worse"]:
+        print(f"\n{len(report['fixtures_worse'])} fixtures scored worse in {report['b']}:")
+        for item in report["fixtures_worse"][:20]:
+            detail = item.get("error") or ", ".join(f"{m} {d:+.3f}" for m, d in item["drops"].items())
+            print(f"  {item['fixture_id']}: {detail}")
+    if args.fail_on_regression and report["regressions"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
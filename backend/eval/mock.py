@@ -0,0 +1,93 @@
+"""
+Deterministic mock chat model for offline SAR evaluation.
+
+Drafts a structurally valid SAR from the figures in the prompt, streams
+it token by token (optionally with a per-token delay to mimic a local
+model's speed) and follows the guardrail continuation prompt, so the
+whole SARLLM drafting path can run without Ollama.
+"""
+
+import hashlib
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import SimpleChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+
+from backend.llm.sections import SAR_SECTIONS
+
+_SECTION_LINE_RE = re.compile(r"^\s*\d+\.\s+([A-Z][A-Z /&'-]+?)\s*$", re.MULTILINE)
+_CONTINUE_RE = re.compile(r"Write the (?P<section>.+?) section (?P<scope>only|and every section after it)")
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _field(text: str, name: str) -> Optional[str]:
+    m = re.search(rf"'{name}': '?([^',}}]+)", text)
+    return m.group(1) if m else None
+
+
+def _money(value: Optional[str]) -> str:
+    return f"${float(value):,.2f}" if value else "the reported amounts"
+
+
+def draft_text(system: str, human: str, flaw_rate: float = 0.0) -> str:
+    """The mock SAR draft for one system / human prompt pair."""
+    sections = tuple(_SECTION_LINE_RE.findall(system)) or SAR_SECTIONS
+
+    m = _CONTINUE_RE.search(human)
+    if m and m.group("section") in sections:
+        start = sections.index(m.group("section"))
+        wanted = sections[start:start + 1] if m.group("scope") == "only" else sections[start:]
+        flawed = False
+    else:
+        wanted = sections
+        roll = int(hashlib.sha256(human.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+        flawed = roll < flaw_rate
+
+    name = _field(human, "customer_name") or "The customer"
+    risk = _field(human, "risk_score") or "an elevated"
+    total = _money(_field(human, "total_amount"))
+    largest = _money(_field(human, "highest_single_transfer"))
+    count = _field(human, "transaction_count") or "multiple"
+    bodies = [
+        f"{name} was flagged with a risk score of {risk}. The alert covers {count} transactions "
+        f"totalling {total} within the monitoring window.",
+        f"The observed activity of {name} is not consistent with the declared profile and expected turnover.",
+        f"Activity comprised {count} transactions totalling {total}; the highest single transfer was {largest}. "
+        f"Velocity and beneficiary patterns warrant further review.",
+        "- Rapid movement of funds\n- Transfers inconsistent with the customer profile",
+        "The pattern is consistent with layering typologies and is assessed as high risk.",
+        "Filing a SAR is recommended, together with enhanced monitoring of the relationship.",
+    ]
+    if flawed:
+        bodies[0] = f"{name} is clearly guilty of laundering {_money('999999')}."
+
+    parts = []
+    for title in wanted:
+        i = sections.index(title)
+        parts.append(f"{i + 1}. {title}\n{bodies[min(i, len(bodies) - 1)]}\n")
+    return "\n".join(parts)
+
+
+class MockSARChatModel(SimpleChatModel):
+    token_delay: float = 0.0
+    # Fraction of drafts that open with a guardrail violation, to exercise retries
+    flaw_rate: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock-sar"
+
+    def _call(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> str:
+        return self._draft(messages)
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for token in _TOKEN_RE.findall(self._draft(messages)):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    def _draft(self, messages: List[BaseMessage]) -> str:
+        return draft_text(str(messages[0].content), str(messages[-1].content), self.flaw_rate)
@@ -0,0 +1,239 @@
+"""
+Local mock of the Ollama HTTP API for SAR AI Copilot.
+
+Serves the subset SARLLM and the endpoint pool use (``/api/chat``,
+``/api/generate``, ``/api/ps``, ``/api/tags``) with the drafts of the
+mock chat model (backend.eval.mock). It mimics the costs that matter
+for serving:
+- loading a model takes ``load_seconds``, and the model is unloaded
+  again once its ``keep_alive`` has expired
+- ``parallel`` requests run at a time (one GPU / NUMA node); the rest wait
+- tokens are streamed ``token_delay`` seconds apart
+
+Run one or more instances and point SAR_OLLAMA_URLS at them:
+
+    python -m backend.eval.mock_ollama --port 11501 --load-seconds 3
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Union
+
+from backend.eval.mock import draft_text
+
+_DURATION_RE = re.compile(r"^(-?\d+(?:\.\d+)?)(ms|s|m|h)?$")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def keep_alive_seconds(value: Union[str, int, float, None], default: float = 300.0) -> float:
+    """Ollama keep_alive ("30m", "10s", 600, -1) in seconds; negative keeps the model forever."""
+    if value is None:
+        return default
+    m = _DURATION_RE.match(str(value).strip())
+    if m is None:
+        raise ValueError(f"Invalid keep_alive: {value!r}")
+    seconds = float(m.group(1)) * _UNITS[m.group(2)]
+    return float("inf") if seconds < 0 else seconds
+
+
+class MockOllama:
+    def __init__(self, load_seconds: float = 2.0, token_delay: float = 0.01, parallel: int = 1, flaw_rate: float = 0.0):
+        self.load_seconds = load_seconds
+        self.token_delay = token_delay
+        self.flaw_rate = flaw_rate
+        self._slots = threading.Semaphore(parallel)
+        self._load_lock = threading.Lock()
+        # model -> monotonic time it is unloaded at
+        self._expires: Dict[str, float] = {}
+        self.stats = {"requests": 0, "loads": 0}
+
+    def is_loaded(self, model: str) -> bool:
+        return self._expires.get(model, 0.0) > time.monotonic()
+
+    def ensure_loaded(self, model: str) -> float:
+        """
+        Load ``model`` if it is not resident; returns the load time paid.
+        The model stays loaded until the request ends and calls ``touch``.
+        """
+        with self._load_lock:
+            paid = 0.0
+            if not self.is_loaded(model):
+                time.sleep(self.load_seconds)
+                self.stats["loads"] += 1
+                paid = self.load_seconds
+            self._expires[model] = float("inf")
+            return paid
+
+    def touch(self, model: str, keep_alive):
+        self._expires[model] = time.monotonic() + keep_alive_seconds(keep_alive)
+
+    def loaded(self):
+        now = time.monotonic()
+        return [
+            {
+                "name": model,
+                "model": model,
+                "expires_at": (datetime.utcnow() + timedelta(seconds=min(expires - now, 10 ** 8))).isoformat() + "Z",
+            }
+            for model, expires in self._expires.items() if expires > now
+        ]
+
+    def draft(self, body: Dict[str, Any]) -> str:
+        if "messages" in body:
+            messages = body["messages"]
+            system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+            return draft_text(system, messages[-1]["content"] if messages else "", self.flaw_rate)
+        return draft_text(body.get("system", ""), body.get("prompt", ""), self.flaw_rate)
+
+
+def _handler(mock: MockOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, payload: Dict[str, Any], status: int = 200):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/api/ps":
+                self._json({"models": mock.loaded()})
+            elif self.path == "/api/tags":
+                self._json({"models": [{"name": m["name"]} for m in mock.loaded()]})
+            elif self.path == "/":
+                self._json({"status": "Ollama is running"})
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            if self.path not in ("/api/chat", "/api/generate"):
+                self._json({"error": "not found"}, 404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            model = body.get("model", "mock")
+            chat = self.path == "/api/chat"
+            mock.stats["requests"] += 1
+
+            if not chat and not body.get("prompt"):
+                # Load-only request, as sent by a warm-up
+                load = mock.ensure_loaded(model)
+                mock.touch(model, body.get("keep_alive"))
+                self._json({"model": model, "response": "", "done": True, "done_reason": "load", "load_duration": int(load * 1e9)})
+                return
+
+            started = time.perf_counter()
+            with mock._slots:
+                load = mock.ensure_loaded(model)
+                tokens = _TOKEN_RE.findall(mock.draft(body))
+                if body.get("stream", True):
+                    self._stream(model, chat, tokens, load, started)
+                else:
+                    time.sleep(mock.token_delay * len(tokens))
+                    self._json(self._final(model, chat, "".join(tokens), tokens, load, started))
+            mock.touch(model, body.get("keep_alive"))
+
+        def _final(self, model, chat, text, tokens, load, started):
+            final = {
+                "model": model,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": 0,
+                "eval_count": len(tokens),
+            }
+            if chat:
+                final["message"] = {"role": "assistant", "content": text}
+            else:
+                final["response"] = text
+            return final
+
+        def _stream(self, model, chat, tokens, load, started):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def send(payload):
+                line = json.dumps(payload).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+
+            try:
+                for token in tokens:
+                    if mock.token_delay:
+                        time.sleep(mock.token_delay)
+                    chunk = {"model": model, "created_at": datetime.utcnow().isoformat() + "Z", "done": False}
+                    if chat:
+                        chunk["message"] = {"role": "assistant", "content": token}
+                    else:
+                        chunk["response"] = token
+                    send(chunk)
+                send(self._final(model, chat, "", tokens, load, started))
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client closed the stream (e.g. a guardrail retry)
+
+    return Handler
+
+
+class MockOllamaServer:
+    """A MockOllama served over HTTP from a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **kwargs):
+        self.mock = MockOllama(**kwargs)
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self.mock))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockOllamaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Ollama API backed by the mock SAR model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--load-seconds", type=float, default=2.0)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--flaw-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockOllamaServer(
+        args.host, args.port,
+        load_seconds=args.load_seconds, token_delay=args.token_delay, parallel=args.parallel, flaw_rate=args.flaw_rate,
+    )
+    print(f"Mock Ollama listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
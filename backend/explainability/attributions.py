@@ -0,0 +1,272 @@
+"""
+Precomputed SHAP feature attributions for case risk scores.
+
+Responsibilities:
+- Turn case context snapshots into a fixed feature vector
+- Load the tree-based risk model behind the risk score, or train it on a
+  labelled set of historical cases kept apart from the cases it explains
+- Compute SHAP attributions for all open cases offline, in vectorized
+  batches, and keep only a compact top-k per case
+- Serve those records in O(1) to the UI and ExplainabilityEngine traces
+
+Run offline with a trained model, or train one from labelled history
+(JSONL of case context snapshots, see load_training_set):
+    python -m backend.explainability.attributions --model risk_model.joblib
+    python -m backend.explainability.attributions --train-data history.jsonl --save-model risk_model.joblib
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+FEATURES = (
+    "total_amount",
+    "highest_single_transfer",
+    "transaction_count",
+    "offshore_jurisdictions",
+    "sub_threshold_count",
+    "monitoring_window_days",
+    "customer_tier",
+    "declared_annual_income",
+    "pep",
+    "max_flow_hops",
+    "cycle_count",
+    "fan_pattern_count",
+)
+
+FEATURE_LABELS = {
+    "total_amount": "Total transacted amount",
+    "highest_single_transfer": "Largest single transfer",
+    "transaction_count": "Transaction count",
+    "offshore_jurisdictions": "Offshore jurisdictions",
+    "sub_threshold_count": "Sub-threshold deposits",
+    "monitoring_window_days": "Activity window (days)",
+    "customer_tier": "Customer tier",
+    "declared_annual_income": "Declared income",
+    "pep": "PEP status",
+    "max_flow_hops": "Layering depth (hops)",
+    "cycle_count": "Round-trip cycles",
+    "fan_pattern_count": "Fan-in / fan-out bursts",
+}
+
+
+def features_from_context(context: Dict[str, Any]) -> Dict[str, float]:
+    """Feature vector for one serialized CaseContext snapshot."""
+    exposure = context.get("exposure") or {}
+    profile = context.get("profile") or {}
+    flows = context.get("flows") or {}
+    return {
+        "total_amount": float(exposure.get("total_amount", 0)),
+        "highest_single_transfer": float(exposure.get("highest_single_transfer", 0)),
+        "transaction_count": float(exposure.get("transaction_count", 0)),
+        "offshore_jurisdictions": float(exposure.get("offshore_jurisdictions", 0)),
+        "sub_threshold_count": float(exposure.get("sub_threshold_count", 0)),
+        "monitoring_window_days": float(exposure.get("monitoring_window_days", 0)),
+        "customer_tier": float(profile.get("tier", 0)),
+        "declared_annual_income": float(profile.get("declared_annual_income", 0)),
+        "pep": float(bool(profile.get("pep"))),
+        "max_flow_hops": float(max((p["hops"] for p in flows.get("paths", [])), default=0)),
+        "cycle_count": float(len(flows.get("cycles", []))),
+        "fan_pattern_count": float(len(flows.get("fan_in", [])) + len(flows.get("fan_out", []))),
+    }
+
+
+def feature_matrix(contexts: List[Dict[str, Any]]) -> np.ndarray:
+    rows = [features_from_context(c) for c in contexts]
+    return np.array([[row[f] for f in FEATURES] for row in rows], dtype=np.float64)
+
+
+# Fewest labelled historical cases a risk model is trained on
+MIN_TRAINING_ROWS = 50
+
+
+class InsufficientTrainingData(ValueError):
+    """Too few labelled historical cases to fit a risk model."""
+
+
+def load_training_set(path: str) -> Tuple[List[int], np.ndarray, np.ndarray]:
+    """
+    Labelled historical cases: one serialized CaseContext snapshot per
+    line, labelled by its ``label`` (the analyst-confirmed risk score) or
+    else the case's final ``risk_score``. Returns case ids, X and y.
+    """
+    contexts = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                contexts.append(json.loads(line))
+    labels = [c.get("label", c["case"].get("risk_score")) for c in contexts]
+    contexts = [c for c, label in zip(contexts, labels) if label is not None]
+    y = np.array([label for label in labels if label is not None], dtype=np.float64)
+    return [c["case"].get("case_id") for c in contexts], feature_matrix(contexts), y
+
+
+class RiskModel:
+    """Gradient-boosted trees over FEATURES, fitted to analyst-confirmed risk scores."""
+
+    def __init__(self, model=None, version: Optional[str] = None):
+        self.model = model
+        self.version = version
+
+    @classmethod
+    def train(cls, X: np.ndarray, y: np.ndarray, min_rows: int = MIN_TRAINING_ROWS) -> "RiskModel":
+        """Fit on labelled historical cases; never on the open cases being explained."""
+        if len(X) < min_rows:
+            raise InsufficientTrainingData(
+                f"Need at least {min_rows} labelled historical cases to train the risk model, got {len(X)}"
+            )
+        from sklearn.ensemble import GradientBoostingRegressor
+
+        model = GradientBoostingRegressor(n_estimators=200, max_depth=3, learning_rate=0.05, random_state=7)
+        model.fit(X, y)
+        return cls(model, version=f"trained-{datetime.now(timezone.utc).isoformat()}-n{len(X)}")
+
+    def save(self, path: str):
+        import joblib
+
+        joblib.dump(self.model, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RiskModel":
+        import joblib
+
+        mtime = datetime.fromtimestamp(os.stat(path).st_mtime, timezone.utc).isoformat()
+        return cls(joblib.load(path), version=f"{os.path.basename(path)}@{mtime}")
+
+    def explain(self, X: np.ndarray, batch_size: int = 4096) -> tuple:
+        """SHAP values for every row, computed in vectorized batches."""
+        import shap
+
+        explainer = shap.TreeExplainer(self.model)
+        values = np.vstack([
+            explainer.shap_values(X[start:start + batch_size])
+            for start in range(0, len(X), batch_size)
+        ]) if len(X) else np.zeros((0, len(FEATURES)))
+        base_value = float(np.ravel(explainer.expected_value)[0])
+        return base_value, values
+
+
+def top_k_attributions(
+    case_ids: List[int],
+    X: np.ndarray,
+    shap_values: np.ndarray,
+    base_value: float,
+    model_version: str,
+    k: int = 5,
+) -> Dict[int, Dict[str, Any]]:
+    """Keep only the k largest |SHAP| features per case."""
+    k = min(k, shap_values.shape[1]) if shap_values.size else 0
+    # argpartition picks the top-k without sorting every feature
+    top = np.argpartition(-np.abs(shap_values), k - 1, axis=1)[:, :k] if k else np.zeros((len(X), 0), int)
+    records = {}
+    for row, case_id in enumerate(case_ids):
+        idx = sorted(top[row], key=lambda j: -abs(shap_values[row, j]))
+        records[case_id] = {
+            "base_value": round(base_value, 3),
+            "prediction": round(base_value + float(shap_values[row].sum()), 3),
+            "model_version": model_version,
+            "top_features": [
+                {
+                    "feature": FEATURES[j],
+                    "label": FEATURE_LABELS[FEATURES[j]],
+                    "value": float(X[row, j]),
+                    "shap": round(float(shap_values[row, j]), 4),
+                }
+                for j in idx
+            ],
+        }
+    return records
+
+
+class AttributionStore:
+    """Case id -> compact attribution record, persisted as one JSON file."""
+
+    def __init__(self, records: Optional[Dict[int, Dict[str, Any]]] = None, generated_at: Optional[str] = None):
+        self.records = records or {}
+        self.generated_at = generated_at
+
+    def get(self, case_id: int) -> Optional[Dict[str, Any]]:
+        return self.records.get(case_id)
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"generated_at": self.generated_at, "records": self.records}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "AttributionStore":
+        with open(path) as f:
+            data = json.load(f)
+        return cls({int(k): v for k, v in data["records"].items()}, data.get("generated_at"))
+
+    @classmethod
+    def load_if_exists(cls, path: str) -> Optional["AttributionStore"]:
+        return cls.load(path) if os.path.exists(path) else None
+
+
+def compute_store(
+    contexts: List[Dict[str, Any]],
+    model: RiskModel,
+    k: int = 5,
+    batch_size: int = 4096,
+) -> AttributionStore:
+    """Explain every case snapshot with a trained ``model`` in one pass."""
+    X = feature_matrix(contexts)
+    case_ids = [c["case"]["case_id"] for c in contexts]
+    base_value, values = model.explain(X, batch_size=batch_size)
+    generated_at = datetime.now(timezone.utc).isoformat()
+    records = top_k_attributions(case_ids, X, values, base_value, model_version=model.version or generated_at, k=k)
+    return AttributionStore(records, generated_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute SHAP attributions for open cases")
+    parser.add_argument("--out", default=".attributions.json")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--model", help="Trained joblib risk model")
+    source.add_argument("--train-data", help="Labelled historical cases (JSONL) to train the model on")
+    parser.add_argument("--save-model", help="Where to write the model trained from --train-data")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from backend.cases.service import build_default_service
+
+    service = build_default_service(start_workers=False)
+
+    contexts = []
+    for status in ("NEW", "UNDER_REVIEW", "SAR_DRAFTED"):
+        offset = 0
+        while True:
+            page = service.query(status=status, offset=offset, limit=args.page_size)
+            contexts.extend(service.context_builder.build(case).to_dict() for case in page.items)
+            offset += args.page_size
+            if offset >= page.total:
+                break
+
+    if args.model:
+        model = RiskModel.load(args.model)
+    else:
+        case_ids, X, y = load_training_set(args.train_data)
+        # Cases being explained must not be part of the model's training data
+        scored = {c["case"]["case_id"] for c in contexts}
+        keep = np.array([case_id not in scored for case_id in case_ids], dtype=bool)
+        if not keep.all():
+            print(f"Skipping {int((~keep).sum())} training rows for cases that are being explained")
+        try:
+            model = RiskModel.train(X[keep], y[keep])
+        except InsufficientTrainingData as exc:
+            parser.error(str(exc))
+        if args.save_model:
+            model.save(args.save_model)
+
+    store = compute_store(contexts, model=model, k=args.top_k)
+    store.save(args.out)
+    print(f"Wrote attributions for {len(store.records)} cases to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Trace inspection and replay CLI for SAR AI Copilot.
+
+Answers "why did this SAR change?" from stored reasoning traces:
+
+    python -m backend.explainability.replay list --case 3
+    python -m backend.explainability.replay diff --case 3 --from 1 --to 2
+    python -m backend.explainability.replay replay --case 3 --version 1
+
+Replays reuse the trace's exact SAR input, exemplars and template version.
+The CLI runs in its own process with an empty narrative cache, so a replay
+here always re-samples the model and ``matches_original`` reports whether
+the text came out the same; replaying through the API
+(POST /cases/{id}/traces/{version}/replay) can hit the serving process's cache.
+
+In local mode the CLI reads the trace log of the running app (SAR_TRACE_LOG)
+and replays against a fresh demo store.
+"""
+
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, diff and replay SAR reasoning traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = commands.add_parser("list", help="List trace versions for a case")
+    list_cmd.add_argument("--case", type=int, required=True)
+
+    diff_cmd = commands.add_parser("diff", help="Structural diff between two trace versions")
+    diff_cmd.add_argument("--case", type=int, required=True)
+    diff_cmd.add_argument("--from", dest="from_version", type=int, required=True)
+    diff_cmd.add_argument("--to", dest="to_version", type=int, help="Defaults to the latest version")
+
+    replay_cmd = commands.add_parser("replay", help="Re-run SARLLM on a trace's stored inputs")
+    replay_cmd.add_argument("--case", type=int, required=True)
+    replay_cmd.add_argument("--version", type=int, help="Defaults to the latest version")
+    replay_cmd.add_argument("--show-narrative", action="store_true")
+
+    args = parser.parse_args()
+
+    from backend.cases.service import build_default_service
+
+    service = build_default_service(start_workers=False)
+
+    if args.command == "list":
+        for trace in service.list_traces(args.case):
+            output = trace.get("output") or {}
+            print(
+                f"v{trace['version']}  {trace['created_at']}  {trace['model_name']}  "
+                f"source={output.get('source')}  draft={output.get('draft_id')}"
+            )
+        return
+
+    if args.command == "diff":
+        diff = service.diff_traces(args.case, args.from_version, args.to_version)
+        if diff is None:
+            raise SystemExit(f"Trace versions not found for case {args.case}")
+        print(json.dumps(diff, indent=2, default=str))
+        return
+
+    replay = service.replay_trace(args.case, args.version, actor="cli")
+    if replay is None:
+        raise SystemExit(f"No replayable trace for case {args.case}")
+    if not args.show_narrative:
+        replay = {k: v for k, v in replay.items() if k != "narrative"}
+    print(json.dumps(replay, indent=2))
+
+
+if __name__ == "__main__":
+    main()
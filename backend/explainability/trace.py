@@ -7,18 +7,35 @@ Responsibilities:
 - Capture AI decision context
 - Log reasoning traces for auditability
 - Provide human-readable explanations for regulators and analysts
+- Version traces per case and diff any two of them structurally
 
 This module bridges AI output with compliance expectations.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+import hashlib
+import json
+import mmap
+import os
+import threading
 import uuid
 
+from backend.lazy import resolve
+from backend.memory import MemoryBudget, SpillableStore
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class ReasoningTrace:
     """
     Represents a single explainability trace for a SAR case.
+
+    ``sar_input`` and ``retrieved_context`` are the exact prompt inputs, so
+    the draft can be replayed later; ``output`` identifies what was produced.
     """
 
     def __init__(
@@ -27,14 +44,38 @@ class ReasoningTrace:
         model_name: str,
         input_signals: Dict[str, Any],
         retrieved_context: str,
+        feature_attributions: Optional[Dict[str, Any]] = None,
+        sar_input: Optional[Dict[str, Any]] = None,
+        output: Optional[Dict[str, Any]] = None,
     ):
         self.trace_id = str(uuid.uuid4())
         self.case_id = case_id
+        self.version: Optional[int] = None
         self.model_name = model_name
         self.input_signals = input_signals
         self.retrieved_context = retrieved_context
+        self.feature_attributions = feature_attributions
+        self.sar_input = sar_input
+        self.output = output or {}
         self.created_at = datetime.utcnow()
 
+    def sections(self) -> Dict[str, Any]:
+        """
+        Top-level units compared by diff_traces; each input signal is its
+        own section so unchanged signals are skipped by digest.
+        """
+        sections = {f"input_signals.{k}": v for k, v in (self.input_signals or {}).items()}
+        sections.update({
+            "model_name": self.model_name,
+            "retrieved_context": self.retrieved_context,
+            "sar_input": self.sar_input,
+            "feature_attributions": self.feature_attributions,
+        })
+        return sections
+
+    def digests(self) -> Dict[str, str]:
+        return {name: _digest(value) for name, value in self.sections().items()}
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert trace to a serializable dictionary.
@@ -42,20 +83,167 @@ class ReasoningTrace:
         return {
             "trace_id": self.trace_id,
             "case_id": self.case_id,
+            "version": self.version,
             "model_name": self.model_name,
             "input_signals": self.input_signals,
             "retrieved_context": self.retrieved_context,
+            "feature_attributions": self.feature_attributions,
+            "sar_input": self.sar_input,
+            "output": self.output,
+            "digests": self.digests(),
             "created_at": self.created_at.isoformat(),
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReasoningTrace":
+        trace = cls(
+            case_id=data["case_id"],
+            model_name=data["model_name"],
+            input_signals=data.get("input_signals") or {},
+            retrieved_context=data.get("retrieved_context", ""),
+            feature_attributions=data.get("feature_attributions"),
+            sar_input=data.get("sar_input"),
+            output=data.get("output"),
+        )
+        trace.trace_id = data["trace_id"]
+        trace.version = data.get("version")
+        trace.created_at = datetime.fromisoformat(data["created_at"])
+        return trace
+
+
+def structural_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Leaf-level changes between two JSON-like values, as
+    ``{"path", "op": "added" | "removed" | "changed", "old", "new"}``.
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in sorted(set(old) | set(new), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in old:
+                changes.append({"path": child, "op": "added", "old": None, "new": new[key]})
+            elif key not in new:
+                changes.append({"path": child, "op": "removed", "old": old[key], "new": None})
+            else:
+                changes.extend(structural_diff(old[key], new[key], child))
+        return changes
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        changes = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            changes.extend(structural_diff(a, b, f"{path}[{i}]"))
+        return changes
+    return [{"path": path, "op": "changed", "old": old, "new": new}]
+
+
+def diff_traces(old: ReasoningTrace, new: ReasoningTrace) -> Dict[str, Any]:
+    """
+    Structural diff of two traces of the same case.
+
+    Sections whose digests match are skipped without being walked.
+    """
+    old_digests, new_digests = old.digests(), new.digests()
+    old_sections, new_sections = old.sections(), new.sections()
+    changed = sorted(
+        name for name in set(old_digests) | set(new_digests)
+        if old_digests.get(name) != new_digests.get(name)
+    )
+    changes = []
+    for name in changed:
+        changes.extend(structural_diff(old_sections.get(name), new_sections.get(name), name))
+    return {
+        "case_id": new.case_id,
+        "from_version": old.version,
+        "to_version": new.version,
+        "changed_sections": changed,
+        "changes": changes,
+        "output_changed": old.output.get("narrative_sha256") != new.output.get("narrative_sha256"),
+    }
+
+
+class JSONLTraceStore:
+    """
+    Append-only trace log for local mode, indexed by case on load.
+
+    Only each trace's (offset, length) in the log is kept in memory; traces
+    are read back through an mmap of the file when a case asks for them.
+
+    The log belongs to one case store. ``reset=True`` (a fresh in-memory
+    store) moves an existing log aside to ``<path>.prev`` so its versions
+    are not mixed with traces of the new store's cases.
+    """
+
+    def __init__(self, path: str, reset: bool = False):
+        self.path = path
+        self._by_case: Dict[int, List[Tuple[int, int]]] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        if reset and os.path.exists(path):
+            os.replace(path, f"{path}.prev")
+        if os.path.exists(path):
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        self._by_case.setdefault(data["case_id"], []).append((offset, len(line)))
+                    offset += len(line)
+
+    def append_trace(self, trace: Dict[str, Any]) -> int:
+        with self._lock:
+            case_traces = self._by_case.setdefault(trace["case_id"], [])
+            trace = dict(trace, version=len(case_traces) + 1)
+            line = (json.dumps(trace, default=str) + "\n").encode("utf-8")
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+            case_traces.append((offset, len(line)))
+            return trace["version"]
+
+    def traces_for_case(self, case_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = list(self._by_case.get(case_id, []))
+            if not spans:
+                return []
+            end = max(offset + length for offset, length in spans)
+            if self._map is None or len(self._map) < end:
+                # The log grew since it was mapped
+                if self._map is not None:
+                    self._map.close()
+                with open(self.path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return [json.loads(self._map[offset:offset + length]) for offset, length in spans]
+
 
 class ExplainabilityEngine:
     """
     Central explainability engine for SAR AI Copilot.
+
+    With a ``store`` (JSONLTraceStore or PostgresClient) traces survive
+    restarts and are shared with worker processes; otherwise they live in
+    ``traces`` for the life of the process, spilled to disk under the
+    memory ``budget``.
     """
 
-    def __init__(self):
-        self.traces: List[ReasoningTrace] = []
+    def __init__(self, attributions=None, store=None, budget: Optional[MemoryBudget] = None):
+        # (case_id, version) -> ReasoningTrace, used without a store
+        self.traces = SpillableStore("traces", budget)
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Precomputed AttributionStore (or a Deferred loading one); SHAP is
+        # never computed on request
+        self.attributions = attributions
+        self.store = store
+
+    def attributions_for(self, case_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Top-k SHAP attributions for a case, if the offline job covered it.
+        """
+        attributions = resolve(self.attributions)
+        if attributions is None:
+            return None
+        return attributions.get(case_id)
 
     def capture_trace(
         self,
@@ -63,25 +251,57 @@ class ExplainabilityEngine:
         model_name: str,
         input_signals: Dict[str, Any],
         retrieved_context: str,
+        sar_input: Optional[Dict[str, Any]] = None,
+        output: Optional[Dict[str, Any]] = None,
     ) -> ReasoningTrace:
         """
-        Capture and store a reasoning trace.
+        Capture and store a reasoning trace as the case's next version.
         """
         trace = ReasoningTrace(
             case_id=case_id,
             model_name=model_name,
             input_signals=input_signals,
             retrieved_context=retrieved_context,
+            feature_attributions=self.attributions_for(case_id),
+            sar_input=sar_input,
+            output=output,
         )
-        self.traces.append(trace)
+        with self._lock:
+            if self.store is not None:
+                trace.version = self.store.append_trace(trace.to_dict())
+            else:
+                trace.version = self._versions.get(case_id, 0) + 1
+                self._versions[case_id] = trace.version
+                self.traces.put((case_id, trace.version), trace)
         return trace
 
+    def _case_traces(self, case_id: int) -> List[ReasoningTrace]:
+        if self.store is not None:
+            return [ReasoningTrace.from_dict(t) for t in self.store.traces_for_case(case_id)]
+        with self._lock:
+            versions = self._versions.get(case_id, 0)
+        return [self.traces.get((case_id, version)) for version in range(1, versions + 1)]
+
     def get_traces_for_case(self, case_id: int) -> List[Dict[str, Any]]:
         """
-        Retrieve all traces associated with a SAR case.
+        Retrieve all traces associated with a SAR case, oldest first.
+        """
+        return [trace.to_dict() for trace in self._case_traces(case_id)]
+
+    def get_trace(self, case_id: int, version: Optional[int] = None) -> Optional[ReasoningTrace]:
         """
-        return [
-            trace.to_dict()
-            for trace in self.traces
-            if trace.case_id == case_id
-        ]
\ No newline at end of file
+        One trace of a case by version; the latest when ``version`` is None.
+        """
+        traces = self._case_traces(case_id)
+        if not traces:
+            return None
+        if version is None:
+            return traces[-1]
+        return next((t for t in traces if t.version == version), None)
+
+    def diff(self, case_id: int, from_version: int, to_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        old = self.get_trace(case_id, from_version)
+        new = self.get_trace(case_id, to_version)
+        if old is None or new is None:
+            return None
+        return diff_traces(old, new)
@@ -0,0 +1,471 @@
+"""
+Transaction graph engine for SAR AI Copilot.
+
+Responsibilities:
+- Hold account-to-account transfers in a compact CSR adjacency layout
+- Trace bounded-depth, time-respecting fund flows (layering)
+- Detect fan-in / fan-out bursts and cycles around a suspect account
+- Cache traced results per case for the detail view and SAR prompt
+
+networkx is only imported when a caller explicitly asks for a networkx view.
+"""
+
+import hashlib
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from backend.memory import approx_size
+
+
+@dataclass(frozen=True)
+class Transfer:
+    source: str
+    target: str
+    amount: float
+    timestamp: datetime
+    tx_id: Optional[str] = None
+
+
+@dataclass
+class FlowPath:
+    """A time-ordered chain of transfers starting at one account."""
+
+    transfers: List[Transfer]
+
+    @property
+    def accounts(self) -> List[str]:
+        return [self.transfers[0].source] + [t.target for t in self.transfers]
+
+    @property
+    def hops(self) -> int:
+        return len(self.transfers)
+
+    @property
+    def bottleneck_amount(self) -> float:
+        # Funds that could have moved end-to-end along the path
+        return min(t.amount for t in self.transfers)
+
+    @property
+    def duration(self) -> timedelta:
+        return self.transfers[-1].timestamp - self.transfers[0].timestamp
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "accounts": self.accounts,
+            "hops": self.hops,
+            "bottleneck_amount": self.bottleneck_amount,
+            "duration_hours": round(self.duration.total_seconds() / 3600, 2),
+            "tx_ids": [t.tx_id for t in self.transfers],
+        }
+
+
+@dataclass
+class FanPattern:
+    """Many distinct counterparties hitting one account inside a window."""
+
+    account: str
+    direction: str  # "in" or "out"
+    counterparties: List[str]
+    total_amount: float
+    window_start: datetime
+    window_end: datetime
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "account": self.account,
+            "direction": self.direction,
+            "counterparties": self.counterparties,
+            "counterparty_count": len(self.counterparties),
+            "total_amount": self.total_amount,
+            "window_start": self.window_start.isoformat(),
+            "window_end": self.window_end.isoformat(),
+        }
+
+
+class _CSR:
+    """
+    Compressed sparse row adjacency.
+
+    Edges of node ``i`` live in ``[offsets[i], offsets[i + 1])`` and are
+    sorted by timestamp so time-respecting lookups can bisect.
+    """
+
+    def __init__(self, node_count: int, edges: List[Tuple[int, int, float, int]]):
+        # edges: (owner, neighbour, timestamp, transfer index)
+        edges.sort(key=lambda e: (e[0], e[2]))
+
+        self.offsets = array("l", [0] * (node_count + 1))
+        for owner, _, _, _ in edges:
+            self.offsets[owner + 1] += 1
+        for i in range(node_count):
+            self.offsets[i + 1] += self.offsets[i]
+
+        self.neighbours = array("l", (e[1] for e in edges))
+        self.timestamps = array("d", (e[2] for e in edges))
+        self.transfer_idx = array("l", (e[3] for e in edges))
+
+    def span(self, node: int) -> Tuple[int, int]:
+        return self.offsets[node], self.offsets[node + 1]
+
+    def first_at_or_after(self, node: int, ts: float) -> int:
+        lo, hi = self.span(node)
+        return bisect_left(self.timestamps, ts, lo, hi)
+
+
+class TransactionGraph:
+    """
+    Directed multigraph of transfers between accounts.
+
+    Built once per case (or per ingestion batch) and then queried read-only.
+    """
+
+    def __init__(self, transfers: Iterable[Transfer]):
+        self.transfers: List[Transfer] = list(transfers)
+
+        self.node_index: Dict[str, int] = {}
+        self.nodes: List[str] = []
+        for t in self.transfers:
+            for account in (t.source, t.target):
+                if account not in self.node_index:
+                    self.node_index[account] = len(self.nodes)
+                    self.nodes.append(account)
+
+        out_edges = []
+        in_edges = []
+        for i, t in enumerate(self.transfers):
+            src = self.node_index[t.source]
+            dst = self.node_index[t.target]
+            ts = t.timestamp.timestamp()
+            out_edges.append((src, dst, ts, i))
+            in_edges.append((dst, src, ts, i))
+
+        self._out = _CSR(len(self.nodes), out_edges)
+        self._in = _CSR(len(self.nodes), in_edges)
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Content hash of the transfers, used to invalidate cached case results.
+
+        Every transfer is hashed and the digests are summed, so the result
+        does not depend on transfer order but does change when any transfer
+        is added, removed or edited (a count plus latest timestamp missed
+        backdated and corrected transfers).
+        """
+        if self._fingerprint is None:
+            total = 0
+            for t in self.transfers:
+                row = f"{t.source}|{t.target}|{t.amount!r}|{t.timestamp.isoformat()}|{t.tx_id}"
+                total += int.from_bytes(hashlib.blake2b(row.encode("utf-8"), digest_size=16).digest(), "little")
+            self._fingerprint = f"{len(self.transfers)}:{total % (1 << 128):032x}"
+        return self._fingerprint
+
+    # -------------------------------
+    # Path search
+    # -------------------------------
+    def trace_paths(
+        self,
+        account: str,
+        max_depth: int = 4,
+        window: timedelta = timedelta(hours=48),
+        min_amount: float = 0.0,
+        min_hops: int = 2,
+        limit: int = 50,
+    ) -> List[FlowPath]:
+        """
+        Enumerate outgoing flows from ``account`` where every hop happens at
+        or after the previous one and the whole chain fits inside ``window``.
+        """
+        if account not in self.node_index:
+            return []
+
+        start = self.node_index[account]
+        window_s = window.total_seconds()
+        results: List[FlowPath] = []
+
+        # Iterative DFS; each frame is (node, earliest ts, path transfer ids, visited)
+        lo, hi = self._out.span(start)
+        stack = []
+        for e in range(lo, hi):
+            t_idx = self._out.transfer_idx[e]
+            if self.transfers[t_idx].amount < min_amount:
+                continue
+            ts = self._out.timestamps[e]
+            stack.append((self._out.neighbours[e], ts, ts, [t_idx], {start, self._out.neighbours[e]}))
+
+        while stack and len(results) < limit:
+            node, first_ts, last_ts, path, visited = stack.pop()
+
+            if len(path) >= min_hops:
+                results.append(FlowPath([self.transfers[i] for i in path]))
+            if len(path) >= max_depth:
+                continue
+
+            e = self._out.first_at_or_after(node, last_ts)
+            _, hi = self._out.span(node)
+            while e < hi:
+                ts = self._out.timestamps[e]
+                if ts - first_ts > window_s:
+                    break
+                nxt = self._out.neighbours[e]
+                t_idx = self._out.transfer_idx[e]
+                if nxt not in visited and self.transfers[t_idx].amount >= min_amount:
+                    stack.append((nxt, first_ts, ts, path + [t_idx], visited | {nxt}))
+                e += 1
+
+        return results
+
+    def find_cycles(
+        self,
+        account: str,
+        max_depth: int = 5,
+        window: timedelta = timedelta(days=7),
+        limit: int = 20,
+    ) -> List[FlowPath]:
+        """
+        Time-respecting cycles that leave ``account`` and return to it.
+        """
+        if account not in self.node_index:
+            return []
+
+        start = self.node_index[account]
+        window_s = window.total_seconds()
+        cycles: List[FlowPath] = []
+
+        stack = []
+        lo, hi = self._out.span(start)
+        for e in range(lo, hi):
+            nxt = self._out.neighbours[e]
+            if nxt == start:
+                continue
+            ts = self._out.timestamps[e]
+            stack.append((nxt, ts, ts, [self._out.transfer_idx[e]], {nxt}))
+
+        while stack and len(cycles) < limit:
+            node, first_ts, last_ts, path, visited = stack.pop()
+
+            e = self._out.first_at_or_after(node, last_ts)
+            _, hi = self._out.span(node)
+            while e < hi:
+                ts = self._out.timestamps[e]
+                if ts - first_ts > window_s:
+                    break
+                nxt = self._out.neighbours[e]
+                t_idx = self._out.transfer_idx[e]
+                if nxt == start:
+                    cycles.append(FlowPath([self.transfers[i] for i in path + [t_idx]]))
+                elif nxt not in visited and len(path) + 1 < max_depth:
+                    stack.append((nxt, first_ts, ts, path + [t_idx], visited | {nxt}))
+                e += 1
+
+        return cycles[:limit]
+
+    # -------------------------------
+    # Fan-in / fan-out
+    # -------------------------------
+    def fan_out(self, account: str, window: timedelta = timedelta(hours=24), min_counterparties: int = 5) -> List[FanPattern]:
+        return self._fan(account, self._out, "out", window, min_counterparties)
+
+    def fan_in(self, account: str, window: timedelta = timedelta(hours=24), min_counterparties: int = 5) -> List[FanPattern]:
+        return self._fan(account, self._in, "in", window, min_counterparties)
+
+    def _fan(self, account: str, csr: _CSR, direction: str, window: timedelta, min_counterparties: int) -> List[FanPattern]:
+        """
+        Sliding window over the account's time-sorted edges, reporting the
+        maximal windows with at least ``min_counterparties`` distinct peers.
+        """
+        if account not in self.node_index:
+            return []
+
+        node = self.node_index[account]
+        lo, hi = csr.span(node)
+        window_s = window.total_seconds()
+
+        patterns: List[FanPattern] = []
+        counts: Dict[int, int] = {}
+        left = lo
+        last_reported_end = -1
+
+        for right in range(lo, hi):
+            peer = csr.neighbours[right]
+            counts[peer] = counts.get(peer, 0) + 1
+
+            while csr.timestamps[right] - csr.timestamps[left] > window_s:
+                old = csr.neighbours[left]
+                counts[old] -= 1
+                if counts[old] == 0:
+                    del counts[old]
+                left += 1
+
+            # Report once the window stops growing, to avoid overlapping duplicates
+            extends = right + 1 < hi and csr.timestamps[right + 1] - csr.timestamps[left] <= window_s
+            if len(counts) >= min_counterparties and not extends and left > last_reported_end:
+                edge_transfers = [self.transfers[csr.transfer_idx[e]] for e in range(left, right + 1)]
+                patterns.append(
+                    FanPattern(
+                        account=account,
+                        direction=direction,
+                        counterparties=sorted(self.nodes[p] for p in counts),
+                        total_amount=sum(t.amount for t in edge_transfers),
+                        window_start=edge_transfers[0].timestamp,
+                        window_end=edge_transfers[-1].timestamp,
+                    )
+                )
+                last_reported_end = right
+
+        return patterns
+
+    def to_networkx(self):
+        """Return a networkx MultiDiGraph view (for ad-hoc analysis only)."""
+        import networkx as nx
+
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self.nodes)
+        for t in self.transfers:
+            graph.add_edge(t.source, t.target, amount=t.amount, timestamp=t.timestamp, tx_id=t.tx_id)
+        return graph
+
+
+@dataclass
+class CaseFlowAnalysis:
+    """Traced flows for one case, ready for the UI and the SAR prompt."""
+
+    case_id: int
+    account: str
+    paths: List[FlowPath] = field(default_factory=list)
+    cycles: List[FlowPath] = field(default_factory=list)
+    fan_in: List[FanPattern] = field(default_factory=list)
+    fan_out: List[FanPattern] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "case_id": self.case_id,
+            "account": self.account,
+            "paths": [p.to_dict() for p in self.paths],
+            "cycles": [c.to_dict() for c in self.cycles],
+            "fan_in": [f.to_dict() for f in self.fan_in],
+            "fan_out": [f.to_dict() for f in self.fan_out],
+        }
+
+    def to_prompt_summary(self, max_paths: int = 3) -> str:
+        """Short plain-text summary suitable for the SAR transaction summary."""
+        lines = []
+        longest = sorted(self.paths, key=lambda p: (-p.hops, -p.bottleneck_amount))[:max_paths]
+        for p in longest:
+            lines.append(
+                f"{p.hops}-hop flow {' -> '.join(p.accounts)} "
+                f"(min {p.bottleneck_amount:,.0f} over {p.duration.total_seconds() / 3600:.1f}h)"
+            )
+        for c in self.cycles[:max_paths]:
+            lines.append(f"Round-trip cycle {' -> '.join(c.accounts)}")
+        for f in self.fan_in + self.fan_out:
+            lines.append(
+                f"Fan-{f.direction}: {len(f.counterparties)} counterparties, "
+                f"total {f.total_amount:,.0f} between {f.window_start:%Y-%m-%d %H:%M} and {f.window_end:%Y-%m-%d %H:%M}"
+            )
+        return "\n".join(lines)
+
+
+class GraphTraceCache:
+    """
+    Per-case cache of flow analyses.
+
+    Entries are keyed by case and reused only for the same account, search
+    parameters (``max_depth``, ``window``) and graph fingerprint. At most
+    ``max_entries`` cases are kept, least recently used first out; under a
+    memory budget (``register``) analyses are evicted like any other
+    rebuildable cache.
+    """
+
+    name = "flow_cache"
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        # case_id -> (key, analysis, size)
+        self._entries: "OrderedDict[int, Tuple[Tuple[Any, ...], CaseFlowAnalysis, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._budgets: List[Any] = []
+
+    def register(self, budget):
+        """Track this cache under ``budget`` (once per budget)."""
+        with self._lock:
+            if any(b is budget for b in self._budgets):
+                return
+            self._budgets.append(budget)
+        budget.register(self)
+
+    def analyze_case(
+        self,
+        case_id: int,
+        account: str,
+        graph: TransactionGraph,
+        max_depth: int = 4,
+        window: timedelta = timedelta(hours=48),
+    ) -> CaseFlowAnalysis:
+        key = (account, max_depth, window, graph.fingerprint)
+        with self._lock:
+            cached = self._entries.get(case_id)
+            if cached and cached[0] == key:
+                self._entries.move_to_end(case_id)
+                self.stats["hits"] += 1
+                return cached[1]
+            self.stats["misses"] += 1
+
+        analysis = CaseFlowAnalysis(
+            case_id=case_id,
+            account=account,
+            paths=graph.trace_paths(account, max_depth=max_depth, window=window),
+            cycles=graph.find_cycles(account, max_depth=max_depth + 1),
+            fan_in=graph.fan_in(account),
+            fan_out=graph.fan_out(account),
+        )
+        size = approx_size(analysis)
+        with self._lock:
+            self._remove(case_id)
+            self._entries[case_id] = (key, analysis, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        for budget in self._budgets:
+            budget.check()
+        return analysis
+
+    def get(self, case_id: int) -> Optional[CaseFlowAnalysis]:
+        cached = self._entries.get(case_id)
+        return cached[1] if cached else None
+
+    def invalidate(self, case_id: int):
+        with self._lock:
+            self._remove(case_id)
+
+    def _remove(self, case_id: int):
+        cached = self._entries.pop(case_id, None)
+        if cached is not None:
+            self._bytes -= cached[2]
+
+    # -------------------------------
+    # Memory budget
+    # -------------------------------
+    def memory_usage(self) -> int:
+        return self._bytes
+
+    def shed(self, nbytes: int) -> int:
+        """Evict least recently used analyses; they are re-traced on demand."""
+        start = self._bytes
+        with self._lock:
+            while self._entries and start - self._bytes < nbytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        return start - self._bytes
+
+    def usage(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hot_bytes": self._bytes, **self.stats}
@@ -0,0 +1,209 @@
+"""
+Speculative SAR drafting.
+
+Responsibilities:
+- Track interactive LLM calls so background work can get out of their way
+- Draft the highest-risk undrafted cases while the model is otherwise idle,
+  storing the narratives in the SARLLM narrative cache
+- Drop prefetched narratives when the case changes
+
+Prefetched drafts are never saved or published: they only warm the
+narrative cache, so "Generate SAR" on such a case is an exact cache hit
+and finishes without calling the model. The cache lives in the process
+that drafted the narrative, so the prefetcher runs next to the draft
+workers (local mode threads, or ``python -m backend.jobs.worker --prefetch 5``).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.cases.state import NEW, UNDER_REVIEW
+
+logger = logging.getLogger(__name__)
+
+
+class ForegroundGate:
+    """Count of interactive LLM calls in flight; background drafting yields to them."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._active = 0
+        # Start as if an interactive call just finished, so background work
+        # also waits out the grace period after startup
+        self._last_finished = time.monotonic()
+
+    @contextmanager
+    def active(self):
+        with self._cond:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._last_finished = time.monotonic()
+                self._cond.notify_all()
+
+    def busy(self) -> bool:
+        return self._active > 0
+
+    def wait_idle(self, grace: float, stop: threading.Event) -> bool:
+        """
+        Block until no interactive call has run for ``grace`` seconds.
+        Returns False if ``stop`` is set first.
+        """
+        with self._cond:
+            while not stop.is_set():
+                if self._active:
+                    self._cond.wait(0.5)
+                    continue
+                remaining = self._last_finished + grace - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(min(remaining, 0.5))
+            return False
+
+
+class SARPrefetcher:
+    """
+    Background drafting of the ``top_n`` highest-risk open cases without a draft.
+
+    A pass waits for the model to be idle before each case and aborts the
+    running generation as soon as an interactive draft starts; the case is
+    picked up again on a later pass. The first pass starts ``start_delay``
+    seconds after ``start``, so loading the LLM stack does not compete with
+    the first dashboard render.
+    """
+
+    def __init__(
+        self,
+        service,
+        top_n: int = 5,
+        band: Optional[str] = "High",
+        interval: float = 30.0,
+        idle_grace: float = 2.0,
+        start_delay: float = 15.0,
+    ):
+        self.service = service
+        self.top_n = top_n
+        self.band = band
+        self.interval = interval
+        self.idle_grace = idle_grace
+        self.start_delay = start_delay
+        # case_id -> (case version drafted at, SARInput drafted from)
+        self._prefetched: Dict[int, Tuple[Optional[int], Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.stats = {"drafted": 0, "aborted": 0, "invalidated": 0, "failed": 0}
+
+    def candidates(self) -> List[Dict[str, Any]]:
+        cases = []
+        for status in (NEW, UNDER_REVIEW):
+            page = self.service.query(status=status, band=self.band, sort_by="risk_score", descending=True, limit=self.top_n)
+            cases.extend(page.items)
+        cases.sort(key=lambda c: c["risk_score"], reverse=True)
+        return [c for c in cases if not self._drafted_or_queued(c["case_id"])][:self.top_n]
+
+    def _drafted_or_queued(self, case_id: int) -> bool:
+        if self.service.repository.latest_draft(case_id) is not None:
+            return True
+        job = self.service.jobs.latest_for_case(case_id) if self.service.jobs is not None else None
+        return job is not None and job.is_active
+
+    def ready(self, case: Dict[str, Any]) -> bool:
+        """Whether drafting ``case`` now would be served from the narrative cache."""
+        with self._lock:
+            held = self._prefetched.get(case["case_id"])
+        if held is None or held[0] != case.get("version"):
+            return False
+        # Context sources (transactions, screening) can change without a case version bump
+        sar_input = self.service.context_builder.build(case).to_sar_input()
+        return self.service.llm.is_cached(sar_input)
+
+    def invalidate(self, case_id: int):
+        """The case's data changed: evict its prefetched narrative and draft it again."""
+        with self._lock:
+            held = self._prefetched.pop(case_id, None)
+        if held is None:
+            return
+        cache = getattr(self.service.llm, "cache", None)
+        if cache is not None:
+            cache.invalidate(held[1])
+        self.stats["invalidated"] += 1
+        self._wake.set()
+
+    def forget(self, case_id: int):
+        """Stop tracking a case that left the candidate set (the cached narrative stays)."""
+        with self._lock:
+            self._prefetched.pop(case_id, None)
+
+    def _prefetch(self, case: Dict[str, Any]) -> bool:
+        from backend.llm.model import GenerationAborted
+
+        case_id, version = case["case_id"], case.get("version")
+        with self._lock:
+            held = self._prefetched.get(case_id)
+        if held is not None and held[0] == version:
+            return False
+
+        llm = self.service.llm
+        sar_input = self.service.context_builder.build(case).to_sar_input()
+        if not llm.is_cached(sar_input):
+            try:
+                llm.generate(sar_input, should_abort=self.service.foreground.busy)
+            except GenerationAborted:
+                self.stats["aborted"] += 1
+                return False
+            except Exception:
+                logger.exception("Prefetching SAR for case %s failed", case_id)
+                self.stats["failed"] += 1
+                return False
+            self.stats["drafted"] += 1
+
+        if self.service.get(case_id).get("version") != version:
+            # Changed while drafting; the next pass drafts the new data
+            llm.cache.invalidate(sar_input)
+            return False
+        with self._lock:
+            self._prefetched[case_id] = (version, sar_input)
+        return True
+
+    def run_once(self) -> int:
+        """One pass over the current candidates; returns the number of cases prefetched."""
+        prefetched = 0
+        for case in self.candidates():
+            if not self.service.foreground.wait_idle(self.idle_grace, self._stop):
+                break
+            prefetched += self._prefetch(case)
+        return prefetched
+
+    def run_forever(self):
+        if self._stop.wait(self.start_delay):
+            return
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("SAR prefetch pass failed")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self) -> "SARPrefetcher":
+        threading.Thread(target=self.run_forever, name="sar-prefetcher", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+def start_prefetcher(service, top_n: int, **kwargs) -> Optional[SARPrefetcher]:
+    """Attach a background prefetcher to ``service``; ``top_n`` <= 0 disables it."""
+    if top_n <= 0:
+        return None
+    service.prefetcher = SARPrefetcher(service, top_n=top_n, **kwargs).start()
+    return service.prefetcher
@@ -0,0 +1,420 @@
+"""
+Durable job queue for SAR drafting.
+
+Responsibilities:
+- Persist drafting jobs so they survive page reloads and process restarts
+- Let any number of workers claim jobs without double-processing
+- Report job status and results for UI polling
+
+Two backends share one interface:
+- PostgresJobQueue: ``FOR UPDATE SKIP LOCKED`` claims, for shared deployments
+- SQLiteJobQueue: single-file queue for local / demo mode
+"""
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+@dataclass
+class Job:
+    job_id: int
+    case_id: int
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _as_json(value) -> Optional[Dict[str, Any]]:
+    if value is None or isinstance(value, dict):
+        return value
+    return json.loads(value)
+
+
+def _row_to_job(row) -> Optional[Job]:
+    if row is None:
+        return None
+    row = dict(row)
+    return Job(
+        job_id=row["id"],
+        case_id=row["case_id"],
+        status=row["status"],
+        payload=_as_json(row["payload"]) or {},
+        result=_as_json(row["result"]),
+        error=row["error"],
+        attempts=row["attempts"],
+        worker_id=row["worker_id"],
+        created_at=str(row["created_at"]) if row["created_at"] else None,
+        updated_at=str(row["updated_at"]) if row["updated_at"] else None,
+    )
+
+
+class PostgresJobQueue:
+    """
+    Job queue stored in the ``sar_jobs`` table.
+
+    Claims use ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent workers
+    never block on, or double-claim, the same row. Jobs whose lease expires
+    (worker crashed) become claimable again.
+    """
+
+    def __init__(self, client, lease_seconds: int = 600, max_attempts: int = 3):
+        self.client = client
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def init_table(self):
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS sar_jobs (
+                        id SERIAL PRIMARY KEY,
+                        case_id INTEGER,
+                        status TEXT NOT NULL DEFAULT 'QUEUED',
+                        payload JSONB,
+                        result JSONB,
+                        error TEXT,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        worker_id TEXT,
+                        lease_expires_at TIMESTAMP,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_sar_jobs_claim
+                        ON sar_jobs (status, id);
+                    CREATE INDEX IF NOT EXISTS idx_sar_jobs_case
+                        ON sar_jobs (case_id, id DESC);
+                    """
+                )
+            conn.commit()
+
+    def enqueue(self, case_id: int, payload: Dict[str, Any]) -> Job:
+        """Queue a draft job, reusing the case's active job if one exists."""
+        from psycopg2.extras import Json
+
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                # Serialize enqueues per case so a double-click yields one job
+                cur.execute("SELECT pg_advisory_xact_lock(%s);", (case_id,))
+                cur.execute(
+                    """
+                    SELECT * FROM sar_jobs
+                    WHERE case_id = %s AND status IN ('QUEUED', 'RUNNING')
+                    ORDER BY id DESC LIMIT 1;
+                    """,
+                    (case_id,),
+                )
+                row = cur.fetchone()
+                if row is None:
+                    cur.execute(
+                        """
+                        INSERT INTO sar_jobs (case_id, payload)
+                        VALUES (%s, %s)
+                        RETURNING *;
+                        """,
+                        (case_id, Json(payload)),
+                    )
+                    row = cur.fetchone()
+            conn.commit()
+        return _row_to_job(row)
+
+    def record_done(self, case_id: int, payload: Dict[str, Any], result: Dict[str, Any]) -> Job:
+        """Record a job that already finished in the caller (e.g. a prefetched draft)."""
+        from psycopg2.extras import Json
+
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO sar_jobs (case_id, status, payload, result)
+                    VALUES (%s, 'DONE', %s, %s)
+                    RETURNING *;
+                    """,
+                    (case_id, Json(payload), Json(result, dumps=lambda v: json.dumps(v, default=str))),
+                )
+                row = cur.fetchone()
+            conn.commit()
+        return _row_to_job(row)
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE sar_jobs
+                    SET status = 'RUNNING',
+                        worker_id = %s,
+                        attempts = attempts + 1,
+                        lease_expires_at = NOW() + make_interval(secs => %s),
+                        updated_at = NOW()
+                    WHERE id = (
+                        SELECT id FROM sar_jobs
+                        WHERE status = 'QUEUED'
+                           OR (status = 'RUNNING' AND lease_expires_at < NOW())
+                        ORDER BY id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT 1
+                    )
+                    RETURNING *;
+                    """,
+                    (worker_id, self.lease_seconds),
+                )
+                row = cur.fetchone()
+            conn.commit()
+        return _row_to_job(row)
+
+    def complete(self, job_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Mark the job DONE; False if ``worker_id`` no longer holds its lease."""
+        from psycopg2.extras import Json
+
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE sar_jobs
+                    SET status = 'DONE', result = %s, error = NULL, updated_at = NOW()
+                    WHERE id = %s AND worker_id = %s AND status = 'RUNNING';
+                    """,
+                    (Json(result, dumps=lambda v: json.dumps(v, default=str)), job_id, worker_id),
+                )
+                updated = cur.rowcount > 0
+            conn.commit()
+        return updated
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry: bool = True) -> bool:
+        """
+        Requeue the job until it runs out of attempts, then mark it FAILED.
+
+        Returns False if ``worker_id`` no longer holds the job's lease.
+        """
+        max_attempts = self.max_attempts if retry else 0
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE sar_jobs
+                    SET status = CASE WHEN attempts >= %s THEN 'FAILED' ELSE 'QUEUED' END,
+                        error = %s,
+                        updated_at = NOW()
+                    WHERE id = %s AND worker_id = %s AND status = 'RUNNING';
+                    """,
+                    (max_attempts, error, job_id, worker_id),
+                )
+                updated = cur.rowcount > 0
+            conn.commit()
+        return updated
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM sar_jobs WHERE id = %s;", (job_id,))
+                return _row_to_job(cur.fetchone())
+
+    def latest_for_case(self, case_id: int) -> Optional[Job]:
+        with self.client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT * FROM sar_jobs WHERE case_id = %s ORDER BY id DESC LIMIT 1;",
+                    (case_id,),
+                )
+                return _row_to_job(cur.fetchone())
+
+
+class SQLiteJobQueue:
+    """
+    Same interface as PostgresJobQueue over a local SQLite file.
+
+    SQLite serializes writers, so ``BEGIN IMMEDIATE`` around the claim is
+    enough to keep two workers from taking the same job.
+    """
+
+    def __init__(self, path: str = ".sar_jobs.sqlite3", lease_seconds: int = 600, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shareable
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL;")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.utcnow().isoformat()
+
+    def init_table(self):
+        conn = self.connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sar_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                case_id INTEGER,
+                status TEXT NOT NULL DEFAULT 'QUEUED',
+                payload TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_expires_at TEXT,
+                created_at TEXT,
+                updated_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_sar_jobs_claim ON sar_jobs (status, id);
+            CREATE INDEX IF NOT EXISTS idx_sar_jobs_case ON sar_jobs (case_id, id DESC);
+            """
+        )
+
+    def enqueue(self, case_id: int, payload: Dict[str, Any]) -> Job:
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            row = conn.execute(
+                """
+                SELECT * FROM sar_jobs
+                WHERE case_id = ? AND status IN ('QUEUED', 'RUNNING')
+                ORDER BY id DESC LIMIT 1;
+                """,
+                (case_id,),
+            ).fetchone()
+            if row is None:
+                now = self._now()
+                cur = conn.execute(
+                    """
+                    INSERT INTO sar_jobs (case_id, status, payload, created_at, updated_at)
+                    VALUES (?, 'QUEUED', ?, ?, ?);
+                    """,
+                    (case_id, json.dumps(payload), now, now),
+                )
+                row = conn.execute("SELECT * FROM sar_jobs WHERE id = ?;", (cur.lastrowid,)).fetchone()
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+        return _row_to_job(row)
+
+    def record_done(self, case_id: int, payload: Dict[str, Any], result: Dict[str, Any]) -> Job:
+        conn = self.connect()
+        now = self._now()
+        cur = conn.execute(
+            """
+            INSERT INTO sar_jobs (case_id, status, payload, result, created_at, updated_at)
+            VALUES (?, 'DONE', ?, ?, ?, ?);
+            """,
+            (case_id, json.dumps(payload), json.dumps(result, default=str), now, now),
+        )
+        return _row_to_job(conn.execute("SELECT * FROM sar_jobs WHERE id = ?;", (cur.lastrowid,)).fetchone())
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        conn = self.connect()
+        now = self._now()
+        lease = (datetime.utcnow() + timedelta(seconds=self.lease_seconds)).isoformat()
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            row = conn.execute(
+                """
+                SELECT id FROM sar_jobs
+                WHERE status = 'QUEUED'
+                   OR (status = 'RUNNING' AND lease_expires_at < ?)
+                ORDER BY id LIMIT 1;
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT;")
+                return None
+            conn.execute(
+                """
+                UPDATE sar_jobs
+                SET status = 'RUNNING', worker_id = ?, attempts = attempts + 1,
+                    lease_expires_at = ?, updated_at = ?
+                WHERE id = ?;
+                """,
+                (worker_id, lease, now, row["id"]),
+            )
+            claimed = conn.execute("SELECT * FROM sar_jobs WHERE id = ?;", (row["id"],)).fetchone()
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+        return _row_to_job(claimed)
+
+    def complete(self, job_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        cur = self.connect().execute(
+            """
+            UPDATE sar_jobs SET status = 'DONE', result = ?, error = NULL, updated_at = ?
+            WHERE id = ? AND worker_id = ? AND status = 'RUNNING';
+            """,
+            (json.dumps(result, default=str), self._now(), job_id, worker_id),
+        )
+        return cur.rowcount > 0
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry: bool = True) -> bool:
+        cur = self.connect().execute(
+            """
+            UPDATE sar_jobs
+            SET status = CASE WHEN attempts >= ? THEN 'FAILED' ELSE 'QUEUED' END,
+                error = ?, updated_at = ?
+            WHERE id = ? AND worker_id = ? AND status = 'RUNNING';
+            """,
+            (self.max_attempts if retry else 0, error, self._now(), job_id, worker_id),
+        )
+        return cur.rowcount > 0
+
+    def abandon_active(self, reason: str) -> int:
+        """
+        Mark every QUEUED / RUNNING job FAILED; returns how many.
+
+        Local mode keeps cases in memory, so jobs left in the file by a
+        previous process refer to a store that no longer exists: a stale
+        RUNNING job would block enqueue for its case and a stale QUEUED one
+        would draft against the freshly reset demo data.
+        """
+        cur = self.connect().execute(
+            """
+            UPDATE sar_jobs
+            SET status = 'FAILED', error = ?, lease_expires_at = NULL, updated_at = ?
+            WHERE status IN ('QUEUED', 'RUNNING');
+            """,
+            (reason, self._now()),
+        )
+        return cur.rowcount
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return _row_to_job(self.connect().execute("SELECT * FROM sar_jobs WHERE id = ?;", (job_id,)).fetchone())
+
+    def latest_for_case(self, case_id: int) -> Optional[Job]:
+        return _row_to_job(
+            self.connect().execute(
+                "SELECT * FROM sar_jobs WHERE case_id = ? ORDER BY id DESC LIMIT 1;",
+                (case_id,),
+            ).fetchone()
+        )
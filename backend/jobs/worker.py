@@ -0,0 +1,123 @@
+"""
+SAR drafting workers.
+
+Responsibilities:
+- Claim queued drafting jobs and run them through the case service
+- Record results / failures back on the queue
+- Scale independently of UI sessions (threads locally, processes in prod)
+
+Run standalone (Postgres mode) with:
+    python -m backend.jobs.worker --processes 4
+
+``--prefetch N`` also drafts the N highest-risk undrafted cases while the
+first process is idle (see backend.jobs.prefetch). The narrative cache is
+per process, so only jobs claimed by that process get the instant hit.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from typing import Optional
+
+from backend.cases.state import InvalidTransition
+from backend.jobs.queue import Job
+
+logger = logging.getLogger(__name__)
+
+
+class DraftWorker:
+    def __init__(self, service, queue, worker_id: Optional[str] = None, poll_interval: float = 1.0):
+        self.service = service
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self) -> Optional[Job]:
+        """Claim and process a single job; return it, or None if idle."""
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return None
+
+        try:
+            draft = self.service.draft_sar(job.case_id, actor=job.payload.get("actor", "worker"))
+            recorded = self.queue.complete(job.job_id, self.worker_id, {"draft_id": draft["draft_id"] if draft else None})
+        except InvalidTransition as exc:
+            # e.g. the case was closed while queued; retrying cannot help
+            recorded = self.queue.fail(job.job_id, self.worker_id, f"{type(exc).__name__}: {exc}", retry=False)
+        except Exception as exc:
+            logger.exception("SAR job %s failed", job.job_id)
+            recorded = self.queue.fail(job.job_id, self.worker_id, f"{type(exc).__name__}: {exc}")
+        if not recorded:
+            # The lease expired and another worker re-claimed the job
+            logger.warning("SAR job %s: lease lost by %s, result not recorded", job.job_id, self.worker_id)
+        return job
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            if self.run_once() is None:
+                self._stop.wait(self.poll_interval)
+
+
+def start_worker_threads(service, queue, count: int = 1) -> list:
+    """Start in-process daemon workers (local / demo mode)."""
+    workers = []
+    for i in range(count):
+        worker = DraftWorker(service, queue)
+        thread = threading.Thread(target=worker.run_forever, name=f"sar-draft-worker-{i}", daemon=True)
+        thread.start()
+        workers.append(worker)
+    return workers
+
+
+def _process_main(poll_interval: float, prefetch: int = 0):
+    from backend.cases.service import build_default_service
+    from backend.jobs.prefetch import start_prefetcher
+    from backend.llm.endpoints import default_pool
+
+    service = build_default_service(start_workers=False)
+    # Load the model before the first job is claimed, and keep it loaded
+    default_pool().start()
+    start_prefetcher(service, top_n=prefetch)
+    DraftWorker(service, service.jobs, poll_interval=poll_interval).run_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SAR drafting workers")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--prefetch", type=int, default=0, help="Speculatively draft the N highest-risk undrafted cases")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.processes == 1:
+        _process_main(args.poll_interval, args.prefetch)
+        return
+
+    procs = [
+        multiprocessing.Process(
+            target=_process_main,
+            args=(args.poll_interval, args.prefetch if i == 0 else 0),
+            name=f"sar-worker-{i}",
+        )
+        for i in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
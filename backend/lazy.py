@@ -0,0 +1,37 @@
+"""
+Deferred initialization helpers for SAR AI Copilot.
+
+Heavy subsystems (LLM stack, PDF rendering, database, numeric models)
+are wrapped in a Deferred so importing or constructing the service stays
+cheap; the factory runs once, on first use.
+"""
+
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Deferred(Generic[T]):
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value: Any = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> T:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._value = self._factory()
+                    self._ready = True
+        return self._value
+
+
+def resolve(value):
+    """Unwrap a Deferred; plain values pass through."""
+    return value.get() if isinstance(value, Deferred) else value
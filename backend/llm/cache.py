@@ -0,0 +1,242 @@
+"""
+Narrative cache for SARLLM.
+
+Responsibilities:
+- Return stored narratives for byte-identical SAR inputs (exact layer)
+- Find narratives for near-identical inputs via embedding similarity
+  (semantic layer), so repetitive alert streams skip most LLM work
+
+A semantic hit is never returned as-is for a different case: SARLLM either
+uses it as a template for a short "edit" generation or hands it back
+flagged for analyst review.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, is_dataclass
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+from backend.memory import MemoryBudget, approx_size
+from backend.rag.embeddings import HashingEmbedder
+
+
+def canonical_input(sar_input) -> Dict[str, Any]:
+    data = asdict(sar_input) if is_dataclass(sar_input) else dict(sar_input)
+    return json.loads(json.dumps(data, sort_keys=True, default=str))
+
+
+def exact_key(sar_input) -> str:
+    payload = json.dumps(canonical_input(sar_input), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def semantic_text(sar_input) -> str:
+    """
+    Normalized text used for similarity.
+
+    Identity fields (customer id / name) are dropped: two customers with the
+    same alert pattern should match each other.
+    """
+    data = canonical_input(sar_input)
+    profile = {
+        k: v for k, v in data.get("customer_profile", {}).items()
+        if k not in ("customer_id", "customer_name")
+    }
+    parts = [
+        data.get("alert_reason", ""),
+        json.dumps(data.get("transaction_summary", {}), sort_keys=True),
+        json.dumps(profile, sort_keys=True),
+    ]
+    return "\n".join(parts)
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    sar_input: Dict[str, Any]
+    narrative: str
+    model_name: str
+
+
+@dataclass
+class CacheHit:
+    kind: str  # "exact" or "semantic"
+    similarity: float
+    entry: CacheEntry
+
+
+class SARNarrativeCache:
+    """
+    Exact + semantic narrative cache with a flat in-memory vector index.
+
+    The index is a float32 matrix of unit vectors, so a lookup is one
+    matrix-vector product over at most ``max_entries`` rows. The matrix
+    doubles as entries are added and is compacted when shedding leaves it
+    mostly empty. Its bytes count towards the memory ``budget`` together
+    with the narratives, and the oldest entries are evicted once both
+    outgrow their share.
+    """
+
+    # Rows allocated up front; the matrix never shrinks below this
+    MIN_ROWS = 64
+
+    name = "narrative_cache"
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 5000,
+        embedder: Optional[HashingEmbedder] = None,
+        budget: Optional[MemoryBudget] = None,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.embedder = embedder or HashingEmbedder()
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        rows = min(max_entries, self.MIN_ROWS)
+        self._vectors = np.zeros((rows, self.embedder.dim), dtype=np.float32)
+        self._slot_keys: List[Optional[str]] = [None] * rows
+        self._slot_of: Dict[str, int] = {}
+        self._free_slots = list(range(rows - 1, -1, -1))
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+        self.budget = budget
+        if budget is not None:
+            budget.register(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def contains(self, sar_input, model_name: Optional[str] = None) -> bool:
+        """Exact entry present (optionally under ``model_name``); not counted in ``stats``."""
+        with self._lock:
+            entry = self._entries.get(exact_key(sar_input))
+        return entry is not None and (model_name is None or entry.model_name == model_name)
+
+    def lookup(self, sar_input, allow_semantic: bool = True, model_name: Optional[str] = None) -> Optional[CacheHit]:
+        """
+        Exact entry, else the most similar one at or above the threshold.
+
+        With ``model_name`` only entries stored under that tag are hits, so
+        an entry from another model or template version neither counts as
+        a hit nor hides a usable entry ranked below it.
+        """
+        key = exact_key(sar_input)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (model_name is None or entry.model_name == model_name):
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return CacheHit("exact", 1.0, entry)
+
+        if allow_semantic and self._entries:
+            query = self.embedder.embed_one(semantic_text(sar_input))
+            with self._lock:
+                scores = self._vectors @ query
+                above = np.flatnonzero(scores >= self.similarity_threshold)
+                for slot in above[np.argsort(-scores[above], kind="stable")]:
+                    slot_key = self._slot_keys[slot]
+                    if slot_key is None:
+                        continue
+                    entry = self._entries[slot_key]
+                    if model_name is None or entry.model_name == model_name:
+                        self.stats["semantic_hits"] += 1
+                        return CacheHit("semantic", float(scores[slot]), entry)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, sar_input, narrative: str, model_name: str) -> CacheEntry:
+        key = exact_key(sar_input)
+        vector = self.embedder.embed_one(semantic_text(sar_input))
+        entry = CacheEntry(key=key, sar_input=canonical_input(sar_input), narrative=narrative, model_name=model_name)
+        size = approx_size(entry)
+
+        with self._lock:
+            if key in self._entries:
+                slot = self._slot_of[key]
+                self._bytes -= self._sizes[key]
+            else:
+                if not self._free_slots:
+                    if len(self._vectors) < self.max_entries:
+                        self._resize(min(self.max_entries, 2 * len(self._vectors)))
+                    else:
+                        self._evict_oldest()
+                slot = self._free_slots.pop()
+                self._slot_of[key] = slot
+                self._slot_keys[slot] = key
+            self._vectors[slot] = vector
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+        if self.budget is not None:
+            self.budget.check()
+        return entry
+
+    def invalidate(self, sar_input):
+        with self._lock:
+            self._remove(exact_key(sar_input))
+
+    def _evict_oldest(self):
+        oldest_key = next(iter(self._entries))
+        self._remove(oldest_key)
+        self.stats["evictions"] += 1
+
+    def _resize(self, rows: int):
+        """Reallocate the index with ``rows`` rows, packing live entries first."""
+        live = list(self._entries)
+        vectors = np.zeros((rows, self.embedder.dim), dtype=np.float32)
+        if live:
+            vectors[:len(live)] = self._vectors[[self._slot_of[key] for key in live]]
+        self._vectors = vectors
+        self._slot_keys = live + [None] * (rows - len(live))
+        self._slot_of = {key: slot for slot, key in enumerate(live)}
+        self._free_slots = list(range(rows - 1, len(live) - 1, -1))
+
+    def _remove(self, key: str):
+        if key not in self._entries:
+            return
+        del self._entries[key]
+        self._bytes -= self._sizes.pop(key)
+        slot = self._slot_of.pop(key)
+        self._slot_keys[slot] = None
+        self._vectors[slot] = 0.0
+        self._free_slots.append(slot)
+
+    # -------------------------------
+    # Memory budget
+    # -------------------------------
+    def memory_usage(self) -> int:
+        return self._bytes + self._vectors.nbytes
+
+    def shed(self, nbytes: int) -> int:
+        """
+        Evict least recently used narratives (they are regenerated on
+        demand), halving the index whenever it is at most a quarter full.
+        """
+        with self._lock:
+            start = self.memory_usage()
+            while self._entries and start - self.memory_usage() < nbytes:
+                self._evict_oldest()
+                rows = len(self._vectors)
+                if rows > self.MIN_ROWS and len(self._entries) <= rows // 4:
+                    self._resize(max(self.MIN_ROWS, rows // 2))
+            return start - self.memory_usage()
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hot_bytes": self._bytes,
+            "index_bytes": self._vectors.nbytes,
+            **self.stats,
+        }
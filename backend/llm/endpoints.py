@@ -0,0 +1,292 @@
+"""
+Ollama endpoint management for SAR AI Copilot.
+
+Responsibilities:
+- Warm the model on every configured Ollama instance at startup, so the
+  first draft does not pay the model load
+- Keep the model resident: every request carries ``keep_alive`` and the
+  health loop reloads the model wherever it was unloaded
+- Health-check instances (``/api/ps``) and take failing ones out of rotation
+- Route each request to the least-loaded healthy instance, e.g. one
+  Ollama per NUMA node or GPU
+
+Configured from the environment:
+- SAR_OLLAMA_URLS: comma-separated base URLs (default OLLAMA_HOST or
+  http://localhost:11434)
+- SAR_OLLAMA_MODEL: model name (default mistral)
+- SAR_OLLAMA_KEEP_ALIVE: how long an idle model stays loaded (default 30m;
+  -1 keeps it loaded)
+- SAR_OLLAMA_HEALTH_INTERVAL: seconds between health checks (default 30)
+
+This module only uses the standard library; the LangChain chat model
+that routes through a pool (backend.llm.pooled) is imported on demand.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "http://localhost:11434"
+DEFAULT_MODEL = "mistral"
+
+# Weight of the newest request in an endpoint's latency average
+_LATENCY_ALPHA = 0.2
+
+
+class OllamaEndpoint:
+    """One Ollama instance and its routing state."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.in_flight = 0
+        # Optimistic until the first health check says otherwise
+        self.healthy = True
+        self.loaded = False
+        self.latency: Optional[float] = None
+        self.served = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._clients: Dict[Any, Any] = {}
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(
+            self.url + path, data=data, method=method, headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=timeout or self.timeout) as resp:
+            payload = resp.read()
+        return json.loads(payload) if payload else {}
+
+    def loaded_models(self) -> List[str]:
+        return [m.get("name") or m.get("model") for m in self.request("GET", "/api/ps").get("models", [])]
+
+    def load(self, model: str, keep_alive: Union[str, int], timeout: float) -> float:
+        """Load ``model`` (a generate request without a prompt); returns the seconds it took."""
+        started = time.perf_counter()
+        self.request("POST", "/api/generate", {"model": model, "keep_alive": keep_alive}, timeout=timeout)
+        self.loaded = True
+        return time.perf_counter() - started
+
+    def chat_model(self, model: str, keep_alive: Union[str, int], **params):
+        """ChatOllama bound to this instance, built once per parameter set."""
+        key = (model, keep_alive, tuple(sorted(params.items())))
+        client = self._clients.get(key)
+        if client is None:
+            from langchain_community.chat_models import ChatOllama
+
+            client = self._clients[key] = ChatOllama(base_url=self.url, model=model, keep_alive=keep_alive, **params)
+        return client
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "loaded": self.loaded,
+            "in_flight": self.in_flight,
+            "served": self.served,
+            "failures": self.failures,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class EndpointPool:
+    """
+    Least-loaded routing over Ollama instances serving one model.
+
+    An instance is picked by fewest requests in flight, then lowest
+    average latency. Unhealthy instances are skipped while any healthy one
+    is left; if none is, every instance is tried so a restarted Ollama is
+    used again before the next health check.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        model: str = DEFAULT_MODEL,
+        keep_alive: Union[str, int] = "30m",
+        health_interval: float = 30.0,
+        load_timeout: float = 300.0,
+        keep_warm: bool = True,
+    ):
+        self.endpoints = [OllamaEndpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError("EndpointPool needs at least one Ollama URL")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.health_interval = health_interval
+        self.load_timeout = load_timeout
+        self.keep_warm = keep_warm
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Endpoints with a model load in flight (see warm_in_background)
+        self._warming: Set[int] = set()
+
+    @classmethod
+    def from_env(cls, model: Optional[str] = None) -> "EndpointPool":
+        urls = os.getenv("SAR_OLLAMA_URLS") or os.getenv("OLLAMA_HOST") or DEFAULT_URL
+        keep_alive: Union[str, int] = os.getenv("SAR_OLLAMA_KEEP_ALIVE", "30m")
+        if isinstance(keep_alive, str) and keep_alive.lstrip("-").isdigit():
+            keep_alive = int(keep_alive)
+        return cls(
+            [u if "://" in u else f"http://{u}" for u in (u.strip() for u in urls.split(",")) if u],
+            model=model or os.getenv("SAR_OLLAMA_MODEL", DEFAULT_MODEL),
+            keep_alive=keep_alive,
+            health_interval=float(os.getenv("SAR_OLLAMA_HEALTH_INTERVAL", "30")),
+        )
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    # -------------------------------
+    # Routing
+    # -------------------------------
+    def _choose(self, exclude: Iterable[OllamaEndpoint] = ()) -> OllamaEndpoint:
+        excluded = {id(ep) for ep in exclude}
+        candidates = [ep for ep in self.endpoints if id(ep) not in excluded] or self.endpoints
+        healthy = [ep for ep in candidates if ep.healthy] or candidates
+        return min(healthy, key=lambda ep: (ep.in_flight, ep.latency or 0.0, ep.served))
+
+    @contextmanager
+    def acquire(self, exclude: Iterable[OllamaEndpoint] = ()) -> Iterator[OllamaEndpoint]:
+        """Reserve the least-loaded instance for one request."""
+        with self._lock:
+            endpoint = self._choose(exclude)
+            endpoint.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield endpoint
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                endpoint.in_flight -= 1
+                endpoint.served += 1
+                endpoint.latency = elapsed if endpoint.latency is None else (
+                    _LATENCY_ALPHA * elapsed + (1 - _LATENCY_ALPHA) * endpoint.latency
+                )
+
+    def mark_failed(self, endpoint: OllamaEndpoint, exc: BaseException):
+        """Take an instance out of rotation until the next successful health check."""
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.healthy = False
+            endpoint.last_error = f"{type(exc).__name__}: {exc}"
+        logger.warning("Ollama at %s failed: %s", endpoint.url, endpoint.last_error)
+
+    def chat_model(self, **params):
+        """LangChain chat model that sends each request through this pool."""
+        from backend.llm.pooled import PooledChatOllama
+
+        return PooledChatOllama(pool=self, params=params)
+
+    # -------------------------------
+    # Warm-up and health
+    # -------------------------------
+    def _warm(self, endpoint: OllamaEndpoint) -> Optional[float]:
+        try:
+            seconds = endpoint.load(self.model, self.keep_alive, timeout=self.load_timeout)
+        except (OSError, urllib.error.URLError, ValueError) as exc:
+            self.mark_failed(endpoint, exc)
+            return None
+        endpoint.healthy = True
+        return seconds
+
+    def warm_in_background(self, endpoint: OllamaEndpoint) -> bool:
+        """
+        Load the model on ``endpoint`` in a daemon thread, so a cold
+        instance does not hold up health checks of the others. Returns
+        False if a load for it is already running.
+        """
+        with self._lock:
+            if id(endpoint) in self._warming:
+                return False
+            self._warming.add(id(endpoint))
+
+        def warm():
+            try:
+                self._warm(endpoint)
+            finally:
+                with self._lock:
+                    self._warming.discard(id(endpoint))
+
+        threading.Thread(target=warm, name=f"ollama-warm-{endpoint.url}", daemon=True).start()
+        return True
+
+    def warm_up(self) -> Dict[str, Optional[float]]:
+        """Load the model on every instance in parallel; seconds per URL (None if it failed)."""
+        results: Dict[str, Optional[float]] = {}
+
+        def warm(endpoint):
+            results[endpoint.url] = self._warm(endpoint)
+
+        threads = [threading.Thread(target=warm, args=(ep,), daemon=True) for ep in self.endpoints]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def check_health(self) -> List[Dict[str, Any]]:
+        """
+        Probe every instance (``/api/ps`` with the endpoint's short request
+        timeout) and, with ``keep_warm``, start reloading the model in the
+        background where it was unloaded.
+        """
+        for endpoint in self.endpoints:
+            try:
+                endpoint.loaded = any(
+                    name == self.model or name.split(":")[0] == self.model
+                    for name in endpoint.loaded_models() if name
+                )
+                endpoint.healthy = True
+            except (OSError, urllib.error.URLError, ValueError) as exc:
+                self.mark_failed(endpoint, exc)
+                continue
+            if self.keep_warm and not endpoint.loaded:
+                self.warm_in_background(endpoint)
+        return self.stats()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [ep.to_dict() for ep in self.endpoints]
+
+    def _run(self, warm_up: bool):
+        if warm_up:
+            loaded = self.warm_up()
+            logger.info("Ollama warm-up (%s): %s", self.model, loaded)
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def start(self, warm_up: bool = True) -> "EndpointPool":
+        """Warm up in the background, then health-check every ``health_interval`` seconds."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, args=(warm_up,), name="ollama-endpoints", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_default_pool: Optional[EndpointPool] = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> EndpointPool:
+    """Process-wide pool over SAR_OLLAMA_URLS."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = EndpointPool.from_env()
+        return _default_pool
@@ -0,0 +1,251 @@
+"""
+Draft-quality guardrails for SAR narratives.
+
+Responsibilities:
+- Flag accusatory phrasing the SAR system prompt forbids
+- Check that risk scores and currency amounts quoted in the narrative
+  match the SARInput they were drafted from
+- Detect missing and empty report sections
+
+NarrativeGuard is incremental: it is fed the streamed narrative chunk by
+chunk and scans each line once, as soon as the line is complete, so
+SARLLM can abort a bad section mid-stream and regenerate only from that
+section onward.
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Pattern, Sequence
+
+from backend.llm.sections import SAR_SECTIONS, SECTION_HEADING_RE
+
+PREAMBLE = "PREAMBLE"
+
+# One alternation per rule; the matching group name identifies the rule
+ACCUSATORY_PATTERNS = {
+    "guilt": r"\b(?:is|was|are|were)\s+(?:clearly\s+|definitely\s+|obviously\s+)?guilty\b",
+    "criminal_label": r"\b(?:is|was|are|were)\s+(?:an?\s+)?(?:criminal|fraudster|money\s+launderer|terrorist)s?\b",
+    "committed_offence": r"\bcommitted\s+(?:fraud|a\s+crime|money\s+laundering|tax\s+evasion|an?\s+offen[cs]e)\b",
+    "certainty": (
+        r"\b(?:clearly|definitely|undoubtedly|certainly|obviously)\s+"
+        r"(?:laundering|laundered|engaged\s+in|involved\s+in|committing|committed)\b"
+    ),
+    "direct_charge": (
+        r"\b(?:customer|subject|client|account\s+holder)\s+(?:is|was)\s+"
+        r"(?:laundering|defrauding|financing\s+terror\w*|evading)\b"
+    ),
+}
+ACCUSATORY_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in ACCUSATORY_PATTERNS.items()),
+    re.IGNORECASE,
+)
+
+_NUMBER = r"\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+NUMBER_RE = re.compile(_NUMBER)
+RISK_SCORE_RE = re.compile(
+    r"\brisk\s+score\s*(?:of|is|was|at|:|=)?\s*(?P<value>\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+AMOUNT_RE = re.compile(
+    r"(?:[$£€₹]|\b(?:USD|GBP|EUR|INR|Rs\.?))\s?(?P<value>" + _NUMBER + r")"
+    r"(?:\s*(?P<scale>thousand|million|billion|lakhs?|crores?|mn|bn|k|m)\b)?",
+    re.IGNORECASE,
+)
+SCALES = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mn": 1e6, "million": 1e6,
+    "bn": 1e9, "billion": 1e9,
+    "lakh": 1e5, "lakhs": 1e5,
+    "crore": 1e7, "crores": 1e7,
+}
+# Regulatory thresholds a narrative may cite without them being case data
+REPORTING_THRESHOLDS = (10_000.0,)
+# Rounding allowed when quoting an amount at full precision
+AMOUNT_TOLERANCE = 0.005
+
+GUIDANCE = {
+    "accusatory": "describe the observed activity objectively and do not assert guilt or criminal intent",
+    "risk_score": "quote the risk score exactly as given in the customer profile",
+    "amount": "only cite amounts that appear in the case data",
+    "empty_section": "write multiple detailed paragraphs under the heading",
+    "missing_section": "include the section with its heading",
+}
+
+
+@dataclass
+class Violation:
+    kind: str  # accusatory | risk_score | amount | empty_section | missing_section
+    section: str
+    message: str
+    excerpt: str = ""
+
+    def feedback(self) -> str:
+        """Instruction handed to the model when retrying the section."""
+        return f"A previous attempt at this section was rejected: {self.message}. When rewriting, {GUIDANCE[self.kind]}."
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _parse_number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def numeric_facts(sar_input) -> List[float]:
+    """Every number in the SARInput (values and numbers inside strings), sorted."""
+    facts = set(REPORTING_THRESHOLDS)
+
+    def walk(value):
+        if isinstance(value, bool):
+            return
+        if isinstance(value, (int, float)):
+            facts.add(float(value))
+        elif isinstance(value, str):
+            facts.update(_parse_number(n) for n in NUMBER_RE.findall(value))
+        elif isinstance(value, dict):
+            for v in value.values():
+                walk(v)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                walk(v)
+
+    walk(sar_input.customer_profile)
+    walk(sar_input.transaction_summary)
+    walk(sar_input.alert_reason)
+    return sorted(facts)
+
+
+def _decimals(text: str) -> int:
+    return len(text.partition(".")[2])
+
+
+class NarrativeGuard:
+    """
+    Line-incremental checker for one narrative.
+
+    ``feed`` returns the violations found in lines completed by the chunk;
+    ``flush`` checks the trailing partial line and the last section once
+    the stream ends. ``rewind`` drops a section and everything after it so
+    generation can resume from that heading.
+    """
+
+    def __init__(
+        self,
+        sar_input,
+        sections: Sequence[str] = SAR_SECTIONS,
+        heading_re: Optional[Pattern] = None,
+    ):
+        self.sections = tuple(s.upper() for s in sections)
+        self.heading_re = heading_re or SECTION_HEADING_RE
+        risk_score = sar_input.customer_profile.get("risk_score")
+        self.risk_score = float(risk_score) if risk_score is not None else None
+        self.facts = numeric_facts(sar_input)
+
+        self._lines: List[str] = []  # scanned lines
+        self._tail = ""  # current incomplete line
+        self.starts: Dict[str, int] = {}  # section -> line index of its heading
+        self.current = PREAMBLE
+        self._has_body = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._lines) + self._tail
+
+    def feed(self, chunk: str) -> List[Violation]:
+        self._tail += chunk
+        if "\n" not in chunk:
+            return []
+        cut = self._tail.rfind("\n") + 1
+        block, self._tail = self._tail[:cut], self._tail[cut:]
+        return self._scan(block)
+
+    def flush(self) -> List[Violation]:
+        block, self._tail = self._tail, ""
+        found = self._scan(block)
+        found.extend(self._close_section())
+        return found
+
+    def missing(self) -> List[str]:
+        return [s for s in self.sections if s not in self.starts]
+
+    def rewind(self, section: str) -> str:
+        """Forget ``section`` onward; returns the text that is kept."""
+        index = 0 if section == PREAMBLE else self.starts[section]
+        self._lines = self._lines[:index]
+        self._tail = ""
+        self.starts = {s: i for s, i in self.starts.items() if i < index}
+        self.current = max(self.starts, key=self.starts.get) if self.starts else PREAMBLE
+        self._has_body = True
+        return self.text
+
+    def _scan(self, block: str) -> List[Violation]:
+        found = []
+        for line in block.splitlines(keepends=True):
+            m = self.heading_re.match(line)
+            if m:
+                found.extend(self._close_section())
+                title = m.group("title").upper()
+                self.starts.setdefault(title, len(self._lines))
+                self.current, self._has_body = title, False
+            elif line.strip():
+                self._has_body = True
+                found.extend(self.check_line(line))
+            self._lines.append(line)
+        return found
+
+    def _close_section(self) -> List[Violation]:
+        if self.current == PREAMBLE or self._has_body:
+            return []
+        self._has_body = True  # report once
+        return [Violation("empty_section", self.current, f"section {self.current} has no content")]
+
+    # -------------------------------
+    # Line checks
+    # -------------------------------
+    def check_line(self, line: str) -> List[Violation]:
+        found = []
+        for m in ACCUSATORY_RE.finditer(line):
+            found.append(Violation(
+                "accusatory", self.current, f'accusatory phrasing "{m.group(0)}" ({m.lastgroup})', m.group(0)
+            ))
+
+        if self.risk_score is not None:
+            for m in RISK_SCORE_RE.finditer(line):
+                value = m.group("value")
+                if abs(float(value) - self.risk_score) >= 10 ** -_decimals(value):
+                    found.append(Violation(
+                        "risk_score", self.current,
+                        f"risk score {value} does not match the case risk score {self.risk_score:g}", m.group(0),
+                    ))
+
+        for m in AMOUNT_RE.finditer(line):
+            if not self._known_amount(m):
+                found.append(Violation(
+                    "amount", self.current, f"amount {m.group(0).strip()} does not appear in the case data", m.group(0)
+                ))
+        return found
+
+    def _known_amount(self, m) -> bool:
+        text, scale = m.group("value"), SCALES.get((m.group("scale") or "").lower(), 1.0)
+        value = _parse_number(text) * scale
+        # Half a unit of the quoted precision ("$1.2 million" covers 1.15M-1.25M)
+        tolerance = max(0.5 * 10 ** -_decimals(text) * scale, value * AMOUNT_TOLERANCE)
+        i = bisect_left(self.facts, value - tolerance)
+        return i < len(self.facts) and self.facts[i] <= value + tolerance
+
+
+def check_narrative(
+    narrative: str,
+    sar_input,
+    sections: Sequence[str] = SAR_SECTIONS,
+    heading_re: Optional[Pattern] = None,
+) -> List[Violation]:
+    """All violations in a complete narrative."""
+    guard = NarrativeGuard(sar_input, sections, heading_re)
+    found = guard.feed(narrative)
+    found.extend(guard.flush())
+    found.extend(
+        Violation("missing_section", section, f"section {section} is missing") for section in guard.missing()
+    )
+    return found
@@ -1,90 +1,250 @@
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
-from langchain_community.chat_models import ChatOllama
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from backend.llm.cache import SARNarrativeCache
+from backend.llm.endpoints import default_pool
+from backend.llm.guardrails import PREAMBLE, NarrativeGuard, Violation, check_narrative
+from backend.llm.registry import CompiledTemplate, TemplateRegistry, default_registry
+
+
+class GenerationAborted(RuntimeError):
+    """``should_abort`` asked generation to stop; nothing was cached."""
+
 
 @dataclass
 class SARInput:
     customer_profile: Dict[str, Any]
     transaction_summary: Dict[str, Any]
     alert_reason: str
+    # ISO country code of the filing jurisdiction; selects the SAR template
+    jurisdiction: Optional[str] = None
+
+
+@dataclass
+class SARResult:
+    narrative: str
+    # "llm" (fresh), "cache" (exact hit), "edit" (revised from a similar
+    # cached SAR) or "review" (similar cached SAR returned for analyst review)
+    source: str
+    similarity: float = 1.0
+    # Exemplar text placed in the prompt (empty for cache / review hits)
+    retrieved_context: str = ""
+    # Template key (id@vN) the narrative was drafted under
+    template: str = ""
+    # Guardrail violations left after retries, and sections regenerated
+    violations: List[Dict[str, Any]] = field(default_factory=list)
+    retries: int = 0
 
 
 class SARLLM:
-    def __init__(self):
-        # Local Ollama model (must be running via `ollama serve`)
-        self.llm = ChatOllama(
-            model="mistral",  # change to "llama3" if you downloaded that instead
-            temperature=0.2
+    def __init__(
+        self,
+        cache: Optional[SARNarrativeCache] = None,
+        semantic_mode: str = "edit",
+        llm=None,
+        rag=None,
+        templates: Optional[TemplateRegistry] = None,
+        max_section_retries: int = 2,
+    ):
+        # Local Ollama instance(s) serving SAR_OLLAMA_MODEL (e.g. "llama3");
+        # see backend.llm.endpoints for warm-up, keep-alive and routing
+        pool = default_pool()
+        self.model_name = pool.model
+        self.cache = cache
+        self.semantic_mode = semantic_mode
+        self.rag = rag
+        self.max_section_retries = max_section_retries
+
+        self.llm = llm or pool.chat_model(temperature=0.2)
+
+        # Prompts come from the jurisdiction template registry; chains are
+        # built once per compiled template and reused.
+        self.templates = templates or default_registry()
+        self._chains: Dict[Tuple[str, float], Tuple[Any, Any, Any]] = {}
+
+    def _exemplars(self, sar_input: SARInput) -> str:
+        if self.rag is None:
+            return "None available."
+        from backend.cases.repository import risk_band
+        from backend.cases.typology import infer_typology
+
+        summary = str(sar_input.transaction_summary)
+        exemplars = self.rag.retrieve_exemplars(
+            typology=infer_typology(sar_input.alert_reason, summary),
+            risk_band=risk_band(float(sar_input.customer_profile.get("risk_score", 0))),
+            query=f"{sar_input.alert_reason}\n{summary}",
         )
+        return exemplars or "None available."
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                """
-You are a senior AML compliance analyst drafting a professional Suspicious Activity Report (SAR) for regulatory submission.
-
-You must produce a detailed, regulator-ready report suitable for bank compliance teams.
-
-Rules:
-- Use formal, objective language
-- Do NOT make direct accusations
-- Base reasoning strictly on provided data
-- Expand analysis clearly and professionally
-- Each section must contain multiple detailed paragraphs
-
-The report must include:
-
-1. SITUATION
-   - Describe triggering events
-   - Include transaction timing and pattern observations
-   - Mention risk score
-
-2. CUSTOMER PROFILE ANALYSIS
-   - Compare observed behavior with expected behavior
-   - Discuss declared income/turnover mismatch if applicable
-
-3. TRANSACTION ANALYSIS
-   - Describe frequency, velocity, and beneficiary patterns
-   - Identify suspicious structuring if present
-
-4. RED FLAGS IDENTIFIED
-   - Bullet list of risk indicators
-
-5. ASSESSMENT
-   - Explain why the activity is inconsistent or high-risk
-   - Reference AML typologies (layering, structuring, etc.)
-
-6. RECOMMENDATION
-   - Justify SAR filing
-   - Suggest enhanced monitoring or escalation
-
-Write a comprehensive, professional-grade report.
-"""
-            ),
-            (
-                "human",
-                """
-Customer Profile:
-{customer_profile}
-
-Transaction Summary:
-{transaction_summary}
-
-Alert Reason:
-{alert_reason}
-"""
+    def _inputs(self, sar_input: SARInput, exemplars: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "customer_profile": sar_input.customer_profile,
+            "transaction_summary": sar_input.transaction_summary,
+            "alert_reason": sar_input.alert_reason,
+            "exemplars": exemplars if exemplars is not None else self._exemplars(sar_input),
+        }
+
+    def template_for(self, sar_input: SARInput, template: Optional[str] = None) -> CompiledTemplate:
+        if template:
+            return self.templates.resolve(template)
+        return self.templates.select(sar_input.jurisdiction)
+
+    def _cache_tag(self, compiled: CompiledTemplate) -> str:
+        # Cached narratives are only reused under the same model + template version
+        return f"{self.model_name}/{compiled.key}"
+
+    def is_cached(self, sar_input: SARInput) -> bool:
+        """Whether ``generate`` would return an exact cache hit for this input."""
+        if self.cache is None:
+            return False
+        return self.cache.contains(sar_input, self._cache_tag(self.template_for(sar_input)))
+
+    def _chains_for(self, template: CompiledTemplate) -> Tuple[Any, Any, Any]:
+        # A hot-reloaded template file has a new mtime, so it gets new chains
+        cache_key = (template.key, template.source_mtime)
+        chains = self._chains.get(cache_key)
+        if chains is None:
+            chains = self._chains[cache_key] = (
+                template.prompt | self.llm | StrOutputParser(),
+                template.edit_prompt | self.llm | StrOutputParser(),
+                template.continue_prompt | self.llm | StrOutputParser(),
+            )
+        return chains
+
+    def generate(
+        self,
+        sar_input: SARInput,
+        exemplars: Optional[str] = None,
+        template: Optional[str] = None,
+        should_abort: Optional[Callable[[], bool]] = None,
+        allow_review: bool = True,
+    ) -> SARResult:
+        """
+        ``exemplars`` and ``template`` (an ``id@vN`` key) pin the style
+        reference and prompt template, e.g. when replaying a trace;
+        otherwise they follow the exemplar index and the case jurisdiction.
+
+        ``should_abort`` is polled between streamed chunks; once it returns
+        True the stream is closed and GenerationAborted is raised.
+
+        In "review" mode a semantic hit is returned with the guardrail
+        violations it has against this input. ``allow_review=False`` (a
+        case draft is being written) uses it as an edit reference instead,
+        so another case's narrative never becomes this case's draft.
+        """
+        compiled = self.template_for(sar_input, template)
+        cache_tag = self._cache_tag(compiled)
+        hit = self.cache.lookup(sar_input, model_name=cache_tag) if self.cache is not None else None
+
+        if hit is not None and hit.kind == "exact":
+            return SARResult(hit.entry.narrative, "cache", template=compiled.key)
+
+        if hit is not None and self.semantic_mode == "review" and allow_review:
+            violations = check_narrative(hit.entry.narrative, sar_input, compiled.sections, compiled.heading_re)
+            return SARResult(
+                hit.entry.narrative, "review", hit.similarity, template=compiled.key,
+                violations=[v.to_dict() for v in violations],
             )
-        ])
 
-        self.chain = self.prompt | self.llm | StrOutputParser()
+        chain, edit_chain, continue_chain = self._chains_for(compiled)
+        inputs = self._inputs(sar_input, exemplars)
+        if hit is not None:
+            stream = edit_chain.stream(dict(inputs, reference_narrative=hit.entry.narrative))
+            source, similarity = "edit", hit.similarity
+        else:
+            stream = chain.stream(inputs)
+            source, similarity = "llm", 1.0
+        narrative, retries = self._guarded(stream, continue_chain, inputs, sar_input, compiled, should_abort)
+        violations = check_narrative(narrative, sar_input, compiled.sections, compiled.heading_re)
+        result = SARResult(
+            narrative, source, similarity, inputs["exemplars"], compiled.key,
+            violations=[v.to_dict() for v in violations], retries=retries,
+        )
+
+        # Drafts that still fail a guardrail are not reused for other cases
+        if self.cache is not None and not violations:
+            self.cache.store(sar_input, result.narrative, cache_tag)
+        return result
+
+    def _retryable(self, found: List[Violation], attempts: Dict[str, int]) -> Optional[Violation]:
+        return next((v for v in found if attempts.get(v.section, 0) < self.max_section_retries), None)
+
+    @staticmethod
+    def _close(stream):
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+    def _guarded(
+        self,
+        stream,
+        continue_chain,
+        inputs,
+        sar_input: SARInput,
+        compiled: CompiledTemplate,
+        should_abort: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[str, int]:
+        """
+        Consume a narrative stream through a NarrativeGuard.
+
+        On a violation the stream is abandoned and generation resumes from
+        the offending section's heading, keeping every earlier section;
+        each section is retried at most ``max_section_retries`` times, after
+        which its violations are accepted and reported. Sections still
+        missing at the end are written one at a time and spliced in.
+        """
+        guard = NarrativeGuard(sar_input, compiled.sections, compiled.heading_re)
+        attempts: Dict[str, int] = {}
+        while True:
+            violation = None
+            for chunk in stream:
+                if should_abort is not None and should_abort():
+                    self._close(stream)
+                    raise GenerationAborted("SAR generation aborted")
+                violation = self._retryable(guard.feed(chunk), attempts)
+                if violation is not None:
+                    break
+            else:
+                violation = self._retryable(guard.flush(), attempts)
+            if violation is None:
+                break
+
+            self._close(stream)
+            attempts[violation.section] = attempts.get(violation.section, 0) + 1
+            section = compiled.sections[0] if violation.section == PREAMBLE else violation.section
+            stream = continue_chain.stream(dict(
+                inputs,
+                draft_so_far=guard.rewind(violation.section) or "(nothing yet)",
+                section=section,
+                scope="and every section after it",
+                feedback=violation.feedback(),
+            ))
+
+        narrative = guard.text.rstrip()
+        missing = guard.missing()
+        for section in reversed(missing):
+            if should_abort is not None and should_abort():
+                raise GenerationAborted("SAR generation aborted")
+            text = continue_chain.invoke(dict(
+                inputs,
+                draft_so_far=narrative,
+                section=section,
+                scope="only",
+                feedback="",
+            )).strip()
+            narrative = self._splice(narrative, section, text, compiled)
+        return narrative, sum(attempts.values()) + len(missing)
+
+    @staticmethod
+    def _splice(narrative: str, section: str, text: str, compiled: CompiledTemplate) -> str:
+        """Insert a section before the next section present in template order."""
+        following = compiled.sections[compiled.sections.index(section) + 1:]
+        for m in compiled.heading_re.finditer(narrative):
+            if m.group("title").upper() in following:
+                return f"{narrative[:m.start()]}{text}\n\n{narrative[m.start():]}"
+        return f"{narrative}\n\n{text}"
 
     def generate_sar(self, sar_input: SARInput) -> str:
-        return self.chain.invoke({
-            "customer_profile": sar_input.customer_profile,
-            "transaction_summary": sar_input.transaction_summary,
-            "alert_reason": sar_input.alert_reason
-        })
\ No newline at end of file
+        return self.generate(sar_input).narrative
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+LangChain chat model over an EndpointPool (backend.llm.endpoints).
+
+Each call is routed to the least-loaded healthy Ollama instance. A call
+that cannot reach its instance (connection refused or dropped, timeout)
+takes that instance out of rotation and, if nothing was streamed yet, is
+retried on the next one. Any other error (model not found, bad request)
+is the request's fault, not the instance's: it is raised as is and the
+instance stays healthy.
+"""
+
+import urllib.error
+from typing import Any, Dict, Iterator, List, Tuple
+
+from langchain_core.language_models.chat_models import SimpleChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+
+
+def _transport_errors() -> Tuple[type, ...]:
+    """Exceptions meaning the instance could not be reached, for the HTTP stacks ChatOllama may use."""
+    errors: List[type] = [ConnectionError, TimeoutError, urllib.error.URLError]
+    try:
+        import requests
+
+        errors += [requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError]
+    except ImportError:
+        pass
+    try:
+        import httpx
+
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+_TRANSPORT_ERRORS = _transport_errors()
+
+
+class PooledChatOllama(SimpleChatModel):
+    pool: Any
+    # ChatOllama parameters, e.g. temperature
+    params: Dict[str, Any] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-pool"
+
+    def _call(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> str:
+        return "".join(chunk.message.content for chunk in self._stream(messages, stop=stop, **kwargs))
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        tried = []
+        while True:
+            with self.pool.acquire(exclude=tried) as endpoint:
+                client = endpoint.chat_model(self.pool.model, self.pool.keep_alive, **self.params)
+                streamed = False
+                try:
+                    for chunk in client.stream(messages, stop=stop, **kwargs):
+                        streamed = True
+                        if run_manager is not None:
+                            run_manager.on_llm_new_token(chunk.content)
+                        yield ChatGenerationChunk(message=AIMessageChunk(content=chunk.content))
+                    return
+                except _TRANSPORT_ERRORS as exc:
+                    self.pool.mark_failed(endpoint, exc)
+                    tried.append(endpoint)
+                    if streamed or len(tried) >= len(self.pool):
+                        raise
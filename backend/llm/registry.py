@@ -0,0 +1,212 @@
+"""
+Multi-jurisdiction SAR template registry.
+
+Responsibilities:
+- Discover versioned template files (backend/llm/templates/<id>.v<N>.toml)
+- Compile a template into prompt objects and an output schema on first
+  use, once per process
+- Pick the template for a case's jurisdiction (templates/index.toml)
+- Hot-reload edited or added files without restarting the app
+
+Startup only lists the directory and reads the small index file;
+templates are parsed and compiled lazily, so adding templates does not
+slow down startup.
+"""
+
+import os
+import re
+import threading
+import time
+import tomllib
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Pattern, Tuple
+
+from backend.llm.sections import compile_heading_re
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+_FILE_RE = re.compile(r"^(?P<id>[a-z0-9_]+)\.v(?P<version>\d+)\.toml$")
+
+HUMAN_PROMPT = """
+Customer Profile:
+{customer_profile}
+
+Transaction Summary:
+{transaction_summary}
+
+Alert Reason:
+{alert_reason}
+
+Style Reference (approved SARs; match tone and structure, do NOT copy facts):
+{exemplars}
+"""
+
+# Used on a semantic cache hit: revise a near-identical SAR instead of
+# drafting from scratch.
+EDIT_PROMPT = """
+A previously approved SAR for a near-identical case is provided as a reference.
+Revise it so that every fact, figure, date and name matches the NEW case data below.
+Keep the section structure and any wording that remains accurate. Remove anything
+the new data does not support.
+
+Reference SAR:
+{reference_narrative}
+
+NEW Customer Profile:
+{customer_profile}
+
+NEW Transaction Summary:
+{transaction_summary}
+
+NEW Alert Reason:
+{alert_reason}
+"""
+
+# Used by the guardrails to regenerate one section after a violation (and
+# to fill in a missing one) without redrafting the whole report.
+CONTINUE_PROMPT = """
+Customer Profile:
+{customer_profile}
+
+Transaction Summary:
+{transaction_summary}
+
+Alert Reason:
+{alert_reason}
+
+Report drafted so far (do not repeat it):
+{draft_so_far}
+
+Write the {section} section {scope}, starting with its heading.
+{feedback}
+"""
+
+
+@dataclass
+class CompiledTemplate:
+    template_id: str
+    version: int
+    name: str
+    authority: str
+    sections: Tuple[str, ...]
+    heading_re: Pattern
+    prompt: Any
+    edit_prompt: Any
+    continue_prompt: Any
+    source_mtime: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.template_id}@v{self.version}"
+
+
+def compile_template(path: str) -> CompiledTemplate:
+    from langchain_core.prompts import ChatPromptTemplate
+
+    with open(path, "rb") as f:
+        spec = tomllib.load(f)
+    system = ("system", spec["system"])
+    sections = tuple(spec["sections"])
+    return CompiledTemplate(
+        template_id=spec["id"],
+        version=int(spec["version"]),
+        name=spec.get("name", spec["id"]),
+        authority=spec.get("authority", ""),
+        sections=sections,
+        heading_re=compile_heading_re(sections),
+        prompt=ChatPromptTemplate.from_messages([system, ("human", spec.get("human", HUMAN_PROMPT))]),
+        edit_prompt=ChatPromptTemplate.from_messages([system, ("human", spec.get("edit_human", EDIT_PROMPT))]),
+        continue_prompt=ChatPromptTemplate.from_messages([system, ("human", spec.get("continue_human", CONTINUE_PROMPT))]),
+        source_mtime=os.stat(path).st_mtime,
+    )
+
+
+class TemplateRegistry:
+    def __init__(self, directory: str = TEMPLATE_DIR, reload_interval: float = 2.0):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._files: Dict[str, Dict[int, str]] = {}  # id -> version -> path
+        self._index: Dict[str, Any] = {}
+        self._compiled: Dict[str, CompiledTemplate] = {}  # path -> compiled
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _scan(self):
+        files: Dict[str, Dict[int, str]] = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                m = _FILE_RE.match(entry.name)
+                if m:
+                    files.setdefault(m.group("id"), {})[int(m.group("version"))] = entry.path
+        index_path = os.path.join(self.directory, "index.toml")
+        index: Dict[str, Any] = {}
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                index = tomllib.load(f)
+        self._files, self._index = files, index
+        self._checked_at = time.monotonic()
+
+    def _maybe_reload(self):
+        # Re-list the directory at most every reload_interval seconds;
+        # compiled templates are re-checked against their file mtime.
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            self._scan()
+
+    def templates(self) -> Dict[str, int]:
+        """Template id -> latest version."""
+        with self._lock:
+            self._maybe_reload()
+            return {template_id: max(versions) for template_id, versions in self._files.items()}
+
+    def get(self, template_id: str, version: Optional[int] = None) -> CompiledTemplate:
+        with self._lock:
+            self._maybe_reload()
+            return self._get(template_id, version)
+
+    def _get(self, template_id: str, version: Optional[int]) -> CompiledTemplate:
+        versions = self._files.get(template_id)
+        if not versions:
+            raise KeyError(f"No SAR template '{template_id}' in {self.directory}")
+        if version is not None and version not in versions:
+            raise KeyError(f"SAR template '{template_id}' has no version {version}")
+        path = versions[version if version is not None else max(versions)]
+
+        compiled = self._compiled.get(path)
+        try:
+            if compiled is None or compiled.source_mtime != os.stat(path).st_mtime:
+                compiled = self._compiled[path] = compile_template(path)
+        except FileNotFoundError:
+            # Deleted since the last directory scan: keep serving the copy
+            # compiled before; without one, rescan and pick from what is left
+            if compiled is not None:
+                return compiled
+            self._scan()
+            return self._get(template_id, version)
+        return compiled
+
+    def template_for(self, jurisdiction: Optional[str]) -> str:
+        with self._lock:
+            self._maybe_reload()
+            mapping = self._index.get("jurisdictions", {})
+            return mapping.get((jurisdiction or "").upper(), self._index.get("default", "generic"))
+
+    def select(self, jurisdiction: Optional[str]) -> CompiledTemplate:
+        return self.get(self.template_for(jurisdiction))
+
+    def resolve(self, key: str) -> CompiledTemplate:
+        """Look up an ``id@vN`` key as recorded on traces."""
+        template_id, _, version = key.partition("@v")
+        return self.get(template_id, int(version) if version else None)
+
+
+_default_registry: Optional[TemplateRegistry] = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> TemplateRegistry:
+    """Process-wide registry over SAR_TEMPLATE_DIR (or the bundled templates)."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = TemplateRegistry(os.getenv("SAR_TEMPLATE_DIR", TEMPLATE_DIR))
+        return _default_registry
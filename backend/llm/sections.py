@@ -0,0 +1,53 @@
+"""
+SAR report section definitions.
+
+The six sections required by the SARLLM system prompt, plus a splitter
+that finds them in generated narratives (numbered, markdown or plain
+uppercase headings).
+"""
+
+import re
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+SAR_SECTIONS = (
+    "SITUATION",
+    "CUSTOMER PROFILE ANALYSIS",
+    "TRANSACTION ANALYSIS",
+    "RED FLAGS IDENTIFIED",
+    "ASSESSMENT",
+    "RECOMMENDATION",
+)
+
+
+def compile_heading_re(titles: Sequence[str]) -> Pattern:
+    """Heading line: optional markdown / numbering, then one of ``titles``."""
+    return re.compile(
+        r"^\s*(?:#+\s*)?(?:\*\*)?\s*(?:\d+[.)]\s*)?(?P<title>"
+        + "|".join(re.escape(s) for s in titles)
+        + r")[\s:*#-]*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+SECTION_HEADING_RE = compile_heading_re(SAR_SECTIONS)
+
+
+def split_sections(narrative: str, heading_re: Optional[Pattern] = None) -> List[Tuple[str, str]]:
+    """
+    Return ``(section_title, body)`` pairs in document order.
+
+    Text before the first heading is returned under "PREAMBLE". Pass a
+    template's compiled ``heading_re`` for non-default section sets.
+    """
+    matches = list((heading_re or SECTION_HEADING_RE).finditer(narrative))
+    if not matches:
+        return [("PREAMBLE", narrative.strip())] if narrative.strip() else []
+
+    sections = []
+    head = narrative[:matches[0].start()].strip()
+    if head:
+        sections.append(("PREAMBLE", head))
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        body = narrative[m.end():nxt.start() if nxt else len(narrative)].strip()
+        sections.append((m.group("title").upper(), body))
+    return sections
@@ -0,0 +1,390 @@
+"""
+Memory budget for long-running SAR AI Copilot processes.
+
+Responsibilities:
+- Track the approximate in-memory size of every registered store (SAR
+  drafts, reasoning traces, the narrative cache, the case context memo,
+  traced flow analyses)
+- Keep their total under one budget: cold entries of spillable stores are
+  written to memory-mapped segment files on disk and read back on access;
+  entries of caches that can be rebuilt are evicted
+- Report usage per store (CaseService.memory_usage, GET /memory)
+
+A store registers itself with ``budget.register(store)`` and provides
+``name``, ``memory_usage()`` (bytes held in RAM), ``shed(nbytes)`` (free at
+least that much, coldest first; returns bytes freed) and ``usage()``.
+
+Configured from the environment:
+- SAR_MEMORY_BUDGET_MB: budget for all registered stores (default 512;
+  0 disables shedding)
+- SAR_SPILL_DIR: directory for spill segments (default: a temporary
+  directory removed at exit)
+"""
+
+import atexit
+import logging
+import mmap
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_ATOMS = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def approx_size(obj: Any) -> int:
+    """Deep size in bytes of plain data (containers, strings, numbers, objects with __dict__)."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, _ATOMS):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return total
+
+
+# -------------------------------
+# Spill segments
+# -------------------------------
+class _Segment:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a+b")
+        self.size = 0
+        self.live = 0
+        self.map: Optional[mmap.mmap] = None
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+class SpillFile:
+    """
+    Append-only segment files holding spilled records.
+
+    A record is written once and read back through an mmap of its segment.
+    A segment is deleted once every record in it has been freed (read back
+    into RAM or dropped).
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._segments: Dict[int, _Segment] = {}
+        self._active: Optional[int] = None
+        self._next = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, data: bytes) -> Tuple[int, int, int]:
+        """Store ``data``; returns its location (segment, offset, length)."""
+        with self._lock:
+            segment = self._segments.get(self._active) if self._active is not None else None
+            if segment is None or segment.size + len(data) > self.segment_bytes:
+                if segment is not None and segment.live <= 0:
+                    segment.close()
+                    os.remove(segment.path)
+                    del self._segments[self._active]
+                self._active, self._next = self._next, self._next + 1
+                segment = self._segments[self._active] = _Segment(
+                    os.path.join(self.directory, f"spill-{os.getpid()}-{self._active:06d}.seg")
+                )
+            offset = segment.size
+            segment.file.write(data)
+            segment.size += len(data)
+            segment.live += len(data)
+            return self._active, offset, len(data)
+
+    def read(self, location: Tuple[int, int, int]) -> bytes:
+        index, offset, length = location
+        with self._lock:
+            segment = self._segments[index]
+            if segment.map is None or len(segment.map) < offset + length:
+                # Records were appended since the segment was mapped
+                segment.file.flush()
+                if segment.map is not None:
+                    segment.map.close()
+                segment.map = mmap.mmap(segment.file.fileno(), 0, access=mmap.ACCESS_READ)
+            return segment.map[offset:offset + length]
+
+    def free(self, location: Tuple[int, int, int]):
+        index, _, length = location
+        with self._lock:
+            segment = self._segments[index]
+            segment.live -= length
+            if segment.live <= 0 and index != self._active:
+                segment.close()
+                os.remove(segment.path)
+                del self._segments[index]
+
+    @property
+    def live_bytes(self) -> int:
+        with self._lock:
+            return sum(s.live for s in self._segments.values())
+
+    @property
+    def disk_bytes(self) -> int:
+        with self._lock:
+            return sum(s.size for s in self._segments.values())
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+            self._active = None
+
+
+# -------------------------------
+# Stores
+# -------------------------------
+class SpillableStore:
+    """
+    Thread-safe key/value store whose cold entries can leave RAM.
+
+    Least recently used entries are shed first. With ``spill`` they are
+    pickled to the budget's SpillFile and transparently loaded back by
+    ``get``; without it they are dropped (for data that can be rebuilt).
+    Hot values are held by reference: after mutating one, ``put`` it again
+    so its size is re-measured.
+    """
+
+    def __init__(self, name: str, budget: Optional["MemoryBudget"] = None, spill: bool = True):
+        self.name = name
+        self.budget = budget
+        self.spill = spill
+        self._hot: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._cold: Dict[Hashable, Tuple[int, int, int]] = {}
+        self._hot_bytes = 0
+        self._cold_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"spills": 0, "reloads": 0, "evictions": 0}
+        if budget is not None:
+            budget.register(self)
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._cold)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._hot or key in self._cold
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._hot) + list(self._cold)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._hot.get(key)
+            if item is not None:
+                self._hot.move_to_end(key)
+                return item[0]
+            location = self._cold.pop(key, None)
+            if location is None:
+                return default
+            value = self._load(location)
+            self._insert(key, value)
+            self.stats["reloads"] += 1
+        self.budget.check()
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._discard(key)
+            self._insert(key, value)
+        if self.budget is not None:
+            self.budget.check()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._hot.pop(key, None)
+            if item is not None:
+                self._hot_bytes -= item[1]
+                return item[0]
+            location = self._cold.pop(key, None)
+            return self._load(location) if location is not None else default
+
+    def _load(self, location: Tuple[int, int, int]) -> Any:
+        """Unpickle a spilled value and release its record."""
+        spill = self.budget.spill
+        value = pickle.loads(spill.read(location))
+        spill.free(location)
+        self._cold_bytes -= location[2]
+        return value
+
+    def _insert(self, key: Hashable, value: Any):
+        size = approx_size(value)
+        self._hot[key] = (value, size)
+        self._hot_bytes += size
+
+    def _discard(self, key: Hashable):
+        item = self._hot.pop(key, None)
+        if item is not None:
+            self._hot_bytes -= item[1]
+        location = self._cold.pop(key, None)
+        if location is not None:
+            self.budget.spill.free(location)
+            self._cold_bytes -= location[2]
+
+    def memory_usage(self) -> int:
+        return self._hot_bytes
+
+    def shed(self, nbytes: int) -> int:
+        freed = 0
+        with self._lock:
+            for key in list(self._hot):
+                if freed >= nbytes:
+                    break
+                value, size = self._hot[key]
+                if self.spill and self.budget is not None:
+                    try:
+                        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    except (pickle.PicklingError, TypeError, AttributeError) as exc:
+                        logger.warning("Cannot spill %s[%r], keeping it in memory: %s", self.name, key, exc)
+                        continue
+                    location = self.budget.spill.write(data)
+                    self._cold[key] = location
+                    self._cold_bytes += location[2]
+                    self.stats["spills"] += 1
+                else:
+                    self.stats["evictions"] += 1
+                del self._hot[key]
+                self._hot_bytes -= size
+                freed += size
+        return freed
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "hot_entries": len(self._hot),
+            "hot_bytes": self._hot_bytes,
+            "spilled_entries": len(self._cold),
+            "spilled_bytes": self._cold_bytes,
+            **self.stats,
+        }
+
+
+# -------------------------------
+# Budget
+# -------------------------------
+class MemoryBudget:
+    """
+    One byte budget shared by the registered stores.
+
+    ``check`` runs after every write: once the stores together exceed
+    ``limit_bytes`` they are shed, largest first, down to ``low_water`` of
+    the limit so the next few writes do not shed again.
+    """
+
+    def __init__(
+        self,
+        limit_bytes: int,
+        spill_dir: Optional[str] = None,
+        low_water: float = 0.8,
+        segment_bytes: int = 64 << 20,
+    ):
+        self.limit_bytes = limit_bytes
+        self.spill_dir = spill_dir
+        self.low_water = low_water
+        self.segment_bytes = segment_bytes
+        self._stores: List[Any] = []
+        self._spill: Optional[SpillFile] = None
+        self._lock = threading.Lock()
+        self._shed_lock = threading.Lock()
+        self.stats = {"sheds": 0, "shed_bytes": 0}
+
+    @classmethod
+    def from_env(cls) -> "MemoryBudget":
+        return cls(
+            int(float(os.getenv("SAR_MEMORY_BUDGET_MB", "512")) * (1 << 20)),
+            spill_dir=os.getenv("SAR_SPILL_DIR") or None,
+        )
+
+    @property
+    def spill(self) -> SpillFile:
+        """Segment files, created on the first spill."""
+        with self._lock:
+            if self._spill is None:
+                if self.spill_dir:
+                    directory = self.spill_dir
+                else:
+                    directory = tempfile.mkdtemp(prefix="sar-spill-")
+                    atexit.register(shutil.rmtree, directory, True)
+                self._spill = SpillFile(directory, self.segment_bytes)
+                atexit.register(self._spill.close)
+            return self._spill
+
+    def register(self, store):
+        with self._lock:
+            self._stores.append(store)
+
+    def used_bytes(self) -> int:
+        return sum(store.memory_usage() for store in self._stores)
+
+    def check(self) -> int:
+        """Shed stores if over the limit; returns the bytes freed."""
+        if self.limit_bytes <= 0 or self.used_bytes() <= self.limit_bytes:
+            return 0
+        # One shedder at a time; concurrent writers go on without waiting
+        if not self._shed_lock.acquire(blocking=False):
+            return 0
+        try:
+            used = self.used_bytes()
+            need = used - int(self.limit_bytes * self.low_water)
+            freed = 0
+            for store in sorted(self._stores, key=lambda s: s.memory_usage(), reverse=True):
+                if freed >= need:
+                    break
+                freed += store.shed(need - freed)
+            self.stats["sheds"] += 1
+            self.stats["shed_bytes"] += freed
+            logger.info("Memory budget: %d of %d bytes in use, shed %d", used, self.limit_bytes, freed)
+            return freed
+        finally:
+            self._shed_lock.release()
+
+    def usage(self) -> Dict[str, Any]:
+        with self._lock:
+            stores = list(self._stores)
+            spill = self._spill
+        return {
+            "limit_bytes": self.limit_bytes,
+            "used_bytes": sum(store.memory_usage() for store in stores),
+            "spill_dir": spill.directory if spill is not None else None,
+            "spill_live_bytes": spill.live_bytes if spill is not None else 0,
+            "spill_disk_bytes": spill.disk_bytes if spill is not None else 0,
+            **self.stats,
+            "stores": {store.name: store.usage() for store in stores},
+        }
+
+
+_default_budget: Optional[MemoryBudget] = None
+_default_lock = threading.Lock()
+
+
+def default_budget() -> MemoryBudget:
+    """Process-wide budget from SAR_MEMORY_BUDGET_MB / SAR_SPILL_DIR."""
+    global _default_budget
+    with _default_lock:
+        if _default_budget is None:
+            _default_budget = MemoryBudget.from_env()
+        return _default_budget
@@ -0,0 +1,63 @@
+"""
+Offline text embeddings for SAR AI Copilot.
+
+Responsibilities:
+- Turn short case / narrative text into fixed-size vectors without a
+  network call or model download (free local mode)
+- Make near-identical alerts (same pattern, slightly different amounts)
+  land close together
+
+HashingEmbedder uses the hashing trick over word tokens and character
+trigrams. Numbers are reduced to an order-of-magnitude token so that
+9,500 and 9,800 embed identically.
+"""
+
+import re
+import zlib
+from typing import List
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z]+|\d[\d,]*(?:\.\d+)?")
+
+
+def _number_token(raw: str) -> str:
+    digits = raw.replace(",", "").split(".")[0]
+    return f"<num:{len(digits)}>"
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        tokens.append(_number_token(tok) if tok[0].isdigit() else tok)
+    return tokens
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> int:
+        # crc32 is stable across processes, unlike the builtin hash()
+        return zlib.crc32(feature.encode("utf-8")) % self.dim
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        tokens = tokenize(text)
+        for tok in tokens:
+            vec[self._bucket("w:" + tok)] += 1.0
+            if not tok.startswith("<num"):
+                padded = f"#{tok}#"
+                for i in range(len(padded) - 2):
+                    vec[self._bucket("c:" + padded[i:i + 3])] += 0.5
+        for a, b in zip(tokens, tokens[1:]):
+            vec[self._bucket(f"b:{a}_{b}")] += 0.75
+
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch; rows are L2-normalized so dot product = cosine."""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed_one(t) for t in texts])
@@ -0,0 +1,221 @@
+"""
+Approved-SAR exemplar index for SAR AI Copilot.
+
+Responsibilities:
+- Build (offline) an index of approved SAR narratives, chunked by section
+  and bucketed by (typology, risk band)
+- Retrieve the best 1-2 exemplars for a new case within a token budget
+
+Each bucket keeps at most ``per_bucket`` exemplars, chosen at build time to
+cover the bucket's variety, so retrieval cost depends on the bucket cap and
+not on how many historical SARs exist.
+
+Build with:
+    python -m backend.rag.exemplars --input approved_sars.jsonl --out .exemplars
+"""
+
+import argparse
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from backend.cases.typology import infer_typology
+from backend.llm.sections import split_sections
+from backend.rag.embeddings import HashingEmbedder
+
+ANY = "*"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def _risk_band(risk_score: float) -> str:
+    from backend.cases.repository import risk_band
+
+    return risk_band(risk_score)
+
+
+@dataclass
+class Exemplar:
+    case_id: Any
+    typology: str
+    risk_band: str
+    sections: List[Tuple[str, str]]
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(f"{title}\n{body}" for title, body in self.sections)
+
+    def fit(self, token_budget: int) -> Optional[str]:
+        """Whole sections, in order, until the budget runs out."""
+        parts, used = [], 0
+        for title, body in self.sections:
+            chunk = f"{title}\n{body}"
+            cost = estimate_tokens(chunk)
+            if used + cost > token_budget:
+                break
+            parts.append(chunk)
+            used += cost
+        return "\n\n".join(parts) if parts else None
+
+
+# Exemplars at least this similar to a kept one are duplicates
+DUPLICATE_SIMILARITY = 0.999
+
+
+def _select_diverse(vectors: np.ndarray, limit: int) -> List[int]:
+    """
+    Greedy farthest-point selection so a capped bucket keeps its variety.
+    Chosen rows are masked before each pick, and near-duplicates of a
+    chosen exemplar are never kept, so retrieval cannot return the same
+    text twice.
+    """
+    if not len(vectors) or limit <= 0:
+        return []
+    chosen = [0]
+    closest = (vectors @ vectors[0]).astype(np.float64)
+    closest[0] = np.inf
+    while len(chosen) < limit:
+        nxt = int(np.argmin(closest))
+        if closest[nxt] >= DUPLICATE_SIMILARITY:
+            break
+        chosen.append(nxt)
+        closest = np.maximum(closest, vectors @ vectors[nxt])
+        closest[chosen] = np.inf
+    return chosen
+
+
+class ExemplarIndex:
+    def __init__(self, embedder: Optional[HashingEmbedder] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.buckets: Dict[Tuple[str, str], Tuple[np.ndarray, List[Exemplar]]] = {}
+
+    # -------------------------------
+    # Offline build
+    # -------------------------------
+    @classmethod
+    def build(
+        cls,
+        approved_sars: List[Dict[str, Any]],
+        per_bucket: int = 32,
+        embedder: Optional[HashingEmbedder] = None,
+    ) -> "ExemplarIndex":
+        """
+        ``approved_sars`` items need ``narrative`` plus either ``typology`` /
+        ``risk_band`` or ``alert_reason`` / ``risk_score`` to derive them.
+        """
+        index = cls(embedder)
+        exemplars: List[Exemplar] = []
+        grouped: Dict[Tuple[str, str], List[int]] = {}
+
+        for sar in approved_sars:
+            typology = sar.get("typology") or infer_typology(sar.get("alert_reason", ""), sar.get("narrative", ""))
+            band = sar.get("risk_band") or _risk_band(float(sar.get("risk_score", 0)))
+            exemplar = Exemplar(
+                case_id=sar.get("case_id"),
+                typology=typology,
+                risk_band=band,
+                sections=split_sections(sar["narrative"]),
+            )
+            # Exact bucket plus typology-only / band-only fallbacks
+            for key in ((typology, band), (typology, ANY), (ANY, band)):
+                grouped.setdefault(key, []).append(len(exemplars))
+            exemplars.append(exemplar)
+
+        # Embed every exemplar once; buckets share the rows
+        all_vectors = index.embedder.embed([e.text for e in exemplars])
+        for key, members in grouped.items():
+            vectors = all_vectors[members]
+            keep = _select_diverse(vectors, per_bucket)
+            index.buckets[key] = (vectors[keep], [exemplars[members[i]] for i in keep])
+        return index
+
+    # -------------------------------
+    # Persistence
+    # -------------------------------
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        keys = sorted(self.buckets)
+        meta = {
+            "dim": self.embedder.dim,
+            "buckets": [
+                {"typology": t, "risk_band": b, "exemplars": [asdict(e) for e in self.buckets[(t, b)][1]]}
+                for t, b in keys
+            ],
+        }
+        with open(os.path.join(directory, "exemplars.json"), "w") as f:
+            json.dump(meta, f)
+        np.savez(os.path.join(directory, "vectors.npz"), *[self.buckets[k][0] for k in keys])
+
+    @classmethod
+    def load(cls, directory: str) -> "ExemplarIndex":
+        with open(os.path.join(directory, "exemplars.json")) as f:
+            meta = json.load(f)
+        index = cls(HashingEmbedder(dim=meta["dim"]))
+        with np.load(os.path.join(directory, "vectors.npz")) as vectors:
+            for i, bucket in enumerate(meta["buckets"]):
+                exemplars = [
+                    Exemplar(
+                        case_id=e["case_id"],
+                        typology=e["typology"],
+                        risk_band=e["risk_band"],
+                        sections=[tuple(s) for s in e["sections"]],
+                    )
+                    for e in bucket["exemplars"]
+                ]
+                index.buckets[(bucket["typology"], bucket["risk_band"])] = (vectors[f"arr_{i}"], exemplars)
+        return index
+
+    # -------------------------------
+    # Retrieval
+    # -------------------------------
+    def retrieve(
+        self,
+        typology: str,
+        risk_band: str,
+        query: str,
+        k: int = 2,
+        token_budget: int = 1200,
+    ) -> List[str]:
+        for key in ((typology, risk_band), (typology, ANY), (ANY, risk_band)):
+            if key in self.buckets:
+                break
+        else:
+            return []
+
+        vectors, exemplars = self.buckets[key]
+        scores = vectors @ self.embedder.embed_one(query)
+        ranked = np.argsort(-scores)[:k]
+
+        results, remaining = [], token_budget
+        for i in ranked:
+            text = exemplars[int(i)].fit(remaining)
+            if text is None:
+                break
+            results.append(text)
+            remaining -= estimate_tokens(text)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the approved-SAR exemplar index")
+    parser.add_argument("--input", required=True, help="JSONL of approved SARs")
+    parser.add_argument("--out", default=".exemplars")
+    parser.add_argument("--per-bucket", type=int, default=32)
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        sars = [json.loads(line) for line in f if line.strip()]
+
+    index = ExemplarIndex.build(sars, per_bucket=args.per_bucket)
+    index.save(args.out)
+    print(f"Indexed {len(sars)} SARs into {len(index.buckets)} buckets at {args.out}")
+
+
+if __name__ == "__main__":
+    main()
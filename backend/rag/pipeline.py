@@ -3,15 +3,21 @@ RAG pipeline (disabled for free local mode).
 
 This version removes OpenAI embeddings and vector storage
 so the app can run fully offline with Ollama.
+
+Approved-SAR exemplars are served from a precomputed local index
+(see backend/rag/exemplars.py) and need no network access.
 """
 
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
 
 
 class SARRAGPipeline:
-    def __init__(self, persist_dir: str = ".chroma"):
+    def __init__(self, persist_dir: str = ".chroma", exemplar_dir: str = ".exemplars"):
         # RAG disabled in free mode
         self.persist_dir = persist_dir
+        self.exemplar_dir = exemplar_dir
+        self._exemplars = None
 
     def ingest_documents(self, raw_docs: List[str], metadata: Dict[str, Any]):
         # No-op in free mode
@@ -19,4 +25,28 @@ class SARRAGPipeline:
 
     def retrieve_context(self, query: str, k: int = 4) -> str:
         # Return empty context since embeddings are disabled
-        return ""
\ No newline at end of file
+        return ""
+
+    @property
+    def exemplars(self):
+        # Loaded once per process, on first use
+        if self._exemplars is None and os.path.isdir(self.exemplar_dir):
+            from backend.rag.exemplars import ExemplarIndex
+
+            self._exemplars = ExemplarIndex.load(self.exemplar_dir)
+        return self._exemplars
+
+    def retrieve_exemplars(
+        self,
+        typology: str,
+        risk_band: str,
+        query: str,
+        k: int = 2,
+        token_budget: int = 1200,
+    ) -> str:
+        """Best approved SAR excerpts for style guidance, or "" if no index."""
+        index: Optional[Any] = self.exemplars
+        if index is None:
+            return ""
+        chunks = index.retrieve(typology, risk_band, query, k=k, token_budget=token_budget)
+        return "\n\n---\n\n".join(chunks)
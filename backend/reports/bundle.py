@@ -0,0 +1,237 @@
+"""
+Batch SAR export for regulator submissions.
+
+Responsibilities:
+- Collect each case's latest draft, its reasoning trace and its audit
+  history
+- Render the PDFs across a process pool; each worker builds the
+  ReportLab style sheet and fonts once and reuses them
+- Stream the finished PDFs into a zip or tar bundle as they complete,
+  followed by a manifest with a SHA-256 per file
+
+Cases are read page by page, and at most ``max_in_flight`` renders are
+outstanding at any time. Memory therefore depends on the pool size, not
+on the batch size.
+
+    python -m backend.reports.bundle --out sar_2026-09.zip --workers 8
+    python -m backend.reports.bundle --out sar_2026-09.tar.gz --case 3 --case 7
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from backend.cases.state import SAR_DRAFTED
+
+
+def _draft_trace(traces: List[Dict[str, Any]], draft: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The trace recorded for this draft; the latest trace for drafts that predate tracing."""
+    for trace in reversed(traces):
+        if (trace.get("output") or {}).get("draft_id") == draft["draft_id"]:
+            return trace
+    return traces[-1] if traces else None
+
+
+def iter_submissions(
+    service,
+    status: Optional[str] = SAR_DRAFTED,
+    case_ids: Optional[Iterable[int]] = None,
+    include_trace: bool = True,
+    include_audit: bool = True,
+    page_size: int = 200,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Render payloads, one case at a time. Cases listed by ``status``
+    without a draft are skipped; an explicitly requested case that does
+    not exist or has no draft yields an error record (``case_id``,
+    ``name``, ``error``) for the manifest instead.
+    """
+
+    def cases():
+        if case_ids is not None:
+            for case_id in case_ids:
+                try:
+                    yield service.get(case_id)
+                except LookupError as exc:
+                    yield _error(case_id, f"{type(exc).__name__}: case {case_id} not found ({exc})")
+            return
+        offset = 0
+        while True:
+            page = service.query(status=status, offset=offset, limit=page_size)
+            yield from page.items
+            offset += page_size
+            if offset >= page.total:
+                return
+
+    for case in cases():
+        if "error" in case:
+            yield case
+            continue
+        draft = service.latest_draft(case["case_id"])
+        if draft is None:
+            if case_ids is not None:
+                yield _error(case["case_id"], f"case {case['case_id']} has no SAR draft")
+            continue
+        yield {
+            "case": case,
+            "draft": draft,
+            "trace": _draft_trace(service.list_traces(case["case_id"]), draft) if include_trace else None,
+            "audit": service.audit_history(case["case_id"]) if include_audit else None,
+        }
+
+
+def _error(case_id: int, message: str) -> Dict[str, Any]:
+    return {"case_id": case_id, "name": f"SAR_Case_{case_id}.pdf", "error": message}
+
+
+# -------------------------------
+# Pool workers
+# -------------------------------
+def _init_worker():
+    from backend.reports.pdf import get_styles
+
+    get_styles()
+
+
+def _render(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from backend.reports.pdf import render_sar_pdf
+
+    case = payload["case"]
+    name = f"SAR_Case_{case['case_id']}.pdf"
+    try:
+        pdf = render_sar_pdf(case, payload["draft"], trace=payload["trace"], audit=payload["audit"])
+    except Exception as exc:
+        return {"case_id": case["case_id"], "name": name, "error": f"{type(exc).__name__}: {exc}"}
+    return {
+        "case_id": case["case_id"],
+        "name": name,
+        "pdf": pdf,
+        "sha256": hashlib.sha256(pdf).hexdigest(),
+        "draft_id": payload["draft"]["draft_id"],
+        "trace_id": (payload["trace"] or {}).get("trace_id"),
+        "audit_entries": len(payload["audit"] or []),
+    }
+
+
+# -------------------------------
+# Bundles
+# -------------------------------
+class BundleWriter:
+    """Append-only zip / tar(.gz) writer chosen by the output file extension."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if path.endswith(".zip"):
+            # PDF streams are already compressed
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED)
+            self._tar = None
+        elif path.endswith((".tar", ".tar.gz", ".tgz")):
+            self._zip = None
+            self._tar = tarfile.open(path, "w:gz" if path.endswith(("gz", "tgz")) else "w")
+        else:
+            raise ValueError(f"Unsupported bundle type: {path} (use .zip, .tar, .tar.gz or .tgz)")
+
+    def add(self, name: str, data: bytes):
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        (self._zip or self._tar).close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_bundle(
+    payloads: Iterable[Dict[str, Any]],
+    out_path: str,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Render ``payloads`` in a process pool and write the PDFs to
+    ``out_path`` in completion order. A failed render, or an error record
+    from iter_submissions, is recorded in the manifest and does not stop
+    the export.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    files, errors = [], []
+    started = time.perf_counter()
+
+    def collect(bundle, done):
+        for future in done:
+            result = future.result()
+            if "error" in result:
+                errors.append(result)
+                continue
+            bundle.add(result["name"], result.pop("pdf"))
+            files.append(result)
+
+    with BundleWriter(out_path) as bundle, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        for payload in payloads:
+            if "error" in payload:
+                errors.append(payload)
+                continue
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(bundle, done)
+            pending.add(pool.submit(_render, payload))
+        collect(bundle, wait(pending).done)
+
+        manifest = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "files": sorted(files, key=lambda f: f["case_id"]),
+            "errors": sorted(errors, key=lambda e: e["case_id"]),
+            "render_seconds": round(time.perf_counter() - started, 3),
+        }
+        bundle.add("manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render SAR PDFs with trace and audit appendices into one bundle")
+    parser.add_argument("--out", required=True, help="Bundle path (.zip, .tar, .tar.gz or .tgz)")
+    parser.add_argument("--status", default=SAR_DRAFTED, help="Export every case in this status")
+    parser.add_argument("--case", type=int, action="append", dest="case_ids", help="Export only these cases")
+    parser.add_argument("--workers", type=int, help="Render processes (default: CPU count)")
+    parser.add_argument("--no-trace", action="store_true")
+    parser.add_argument("--no-audit", action="store_true")
+    args = parser.parse_args()
+
+    from backend.cases.service import build_default_service
+
+    service = build_default_service(start_workers=False)
+    payloads = iter_submissions(
+        service,
+        status=args.status,
+        case_ids=args.case_ids,
+        include_trace=not args.no_trace,
+        include_audit=not args.no_audit,
+    )
+    manifest = export_bundle(payloads, args.out, workers=args.workers)
+    print(
+        f"Wrote {len(manifest['files'])} SAR PDFs to {args.out} in {manifest['render_seconds']}s"
+        + (f" ({len(manifest['errors'])} failed, see manifest.json)" if manifest["errors"] else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+SAR PDF rendering for SAR AI Copilot.
+
+Responsibilities:
+- Render a case's SAR draft into a PDF document
+- Optionally append the reasoning trace and the audit history, as
+  required for regulator submissions
+
+ReportLab is imported on first render, not at import time. The style
+sheet, table style and body font are built once per process and reused
+by every render (the batch exporter warms them in each pool worker).
+"""
+
+import json
+import os
+import threading
+from io import BytesIO
+from typing import Dict, Any, List, Optional
+from xml.sax.saxutils import escape
+
+_styles = None
+_table_style = None
+_styles_lock = threading.Lock()
+
+
+def _body_font() -> Optional[str]:
+    """
+    Register SAR_PDF_FONT (a TTF, e.g. DejaVuSans for the rupee sign) once;
+    None keeps ReportLab's built-in Helvetica.
+    """
+    path = os.getenv("SAR_PDF_FONT")
+    if not path or not os.path.exists(path):
+        return None
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    pdfmetrics.registerFont(TTFont("SARBody", path))
+    return "SARBody"
+
+
+def get_styles():
+    global _styles, _table_style
+    with _styles_lock:
+        if _styles is None:
+            from reportlab.lib import colors
+            from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+            from reportlab.platypus import TableStyle
+
+            styles = getSampleStyleSheet()
+            font = _body_font()
+            if font:
+                for name in ("Normal", "Title", "Heading2", "Heading3", "Code"):
+                    styles[name].fontName = font
+            styles.add(ParagraphStyle("Cell", parent=styles["Normal"], fontSize=7, leading=9))
+            _table_style = TableStyle([
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ])
+            _styles = styles
+        return _styles
+
+
+def _paragraph(text: Any, style):
+    from reportlab.platypus import Paragraph
+
+    return Paragraph(escape(str(text)).replace("\n", "<br/>"), style)
+
+
+def _trace_appendix(trace: Dict[str, Any], styles) -> List[Any]:
+    from reportlab.platypus import Paragraph, Spacer
+
+    output = trace.get("output") or {}
+    elements = [
+        Paragraph("Appendix A: Reasoning Trace", styles["Heading2"]),
+        _paragraph(
+            f"Trace {trace['trace_id']} (version {trace.get('version')}), model {trace['model_name']}, "
+            f"template {output.get('template') or '-'}, created {trace['created_at']}",
+            styles["Normal"],
+        ),
+        Spacer(1, 6),
+        Paragraph("Input signals", styles["Heading3"]),
+        _paragraph(json.dumps(trace.get("input_signals"), indent=1, default=str), styles["Code"]),
+    ]
+    if trace.get("feature_attributions"):
+        elements.append(Paragraph("Feature attributions", styles["Heading3"]))
+        elements.append(_paragraph(json.dumps(trace["feature_attributions"], indent=1, default=str), styles["Code"]))
+    if output.get("guardrail_violations"):
+        elements.append(Paragraph("Open guardrail findings", styles["Heading3"]))
+        for v in output["guardrail_violations"]:
+            elements.append(_paragraph(f"{v['section']}: {v['message']}", styles["Normal"]))
+    return elements
+
+
+def _audit_appendix(audit: List[Dict[str, Any]], styles) -> List[Any]:
+    from reportlab.platypus import Paragraph, Table
+
+    cell = styles["Cell"]
+    rows = [[_paragraph(h, cell) for h in ("Seq", "Time (UTC)", "Action", "Details", "Entry hash")]]
+    for entry in audit:
+        rows.append([
+            _paragraph(entry.get("seq"), cell),
+            _paragraph(entry.get("created_at_text") or entry.get("created_at"), cell),
+            _paragraph(entry.get("action"), cell),
+            _paragraph(entry.get("details_text") or entry.get("details"), cell),
+            _paragraph((entry.get("entry_hash") or "")[:16], cell),
+        ])
+    table = Table(rows, colWidths=[30, 95, 85, 210, 80], repeatRows=1)
+    table.setStyle(_table_style)
+    return [Paragraph("Appendix B: Audit History", styles["Heading2"]), table]
+
+
+def render_sar_pdf(
+    case: Dict[str, Any],
+    draft: Dict[str, Any],
+    trace: Optional[Dict[str, Any]] = None,
+    audit: Optional[List[Dict[str, Any]]] = None,
+) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+
+    styles = get_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    elements = []
+
+    elements.append(Paragraph("<b>Suspicious Activity Report</b>", styles["Title"]))
+    elements.append(Spacer(1, 12))
+
+    elements.append(Paragraph(f"Case ID: {case['case_id']}", styles["Normal"]))
+    elements.append(_paragraph(f"Customer ID: {case['customer_id']}", styles["Normal"]))
+    elements.append(Paragraph(f"Risk Score: {case['risk_score']}", styles["Normal"]))
+    elements.append(Spacer(1, 12))
+
+    elements.append(_paragraph(draft["narrative"], styles["Normal"]))
+
+    if trace is not None:
+        elements.append(PageBreak())
+        elements.extend(_trace_appendix(trace, styles))
+    if audit:
+        elements.append(PageBreak())
+        elements.extend(_audit_appendix(audit, styles))
+
+    doc.build(elements)
+    return buffer.getvalue()
@@ -0,0 +1,263 @@
+"""
+Peer-group statistics service for SAR AI Copilot.
+
+Responsibilities:
+- Keep per-segment (region, tier, customer type) distributions of
+  customer metrics (PEER_METRICS) as mergeable sketches
+- Update incrementally as alert intake refreshes a customer's totals
+- Merge each process's new observations into one sketch file
+- Answer percentile, z-score and peer-deviation queries in microseconds,
+  without sorting transaction history
+
+Segments with too few observations fall back to the all-customer
+distribution for the same metric.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from backend.stats.sketches import KLLSketch, RunningMoments
+
+ALL = "*"
+Segment = Tuple[str, str, str]
+
+# Customer-level metrics reported on the case view
+PEER_METRICS = ("total_amount", "highest_single_transfer", "transaction_count", "risk_score")
+
+
+def segment_of(profile: Dict[str, Any]) -> Segment:
+    return (
+        str(profile.get("region", ALL)),
+        str(profile.get("tier", ALL)),
+        str(profile.get("customer_type", ALL)),
+    )
+
+
+class _Distribution:
+    __slots__ = ("sketch", "moments")
+
+    def __init__(self, k: int):
+        self.sketch = KLLSketch(k=k)
+        self.moments = RunningMoments()
+
+    def update(self, value: float):
+        self.sketch.update(value)
+        self.moments.update(value)
+
+    def merge(self, other: "_Distribution"):
+        self.sketch.merge(other.sketch)
+        self.moments.merge(other.moments)
+
+
+class _file_lock:
+    """Exclusive lock on ``path`` across processes (best effort where fcntl is missing)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a")
+        try:
+            import fcntl
+
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        return self
+
+    def __exit__(self, *exc):
+        # Closing the file releases the lock
+        self._file.close()
+
+
+class PeerStatsService:
+    def __init__(self, k: int = 200, min_peers: int = 30):
+        self.k = k
+        self.min_peers = min_peers
+        self._dists: Dict[Tuple[Segment, str], _Distribution] = {}
+        # Observations not yet merged into the sketch file (see flush)
+        self._unsaved: Dict[Tuple[Segment, str], _Distribution] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _dist(self, segment: Segment, metric: str, dists: Optional[Dict] = None) -> _Distribution:
+        dists = self._dists if dists is None else dists
+        key = (segment, metric)
+        dist = dists.get(key)
+        if dist is None:
+            dist = dists[key] = _Distribution(self.k)
+        return dist
+
+    # -------------------------------
+    # Ingest
+    # -------------------------------
+    def observe(self, profile: Dict[str, Any], metric: str, value: float):
+        """Add one value to the customer's segment and the global distribution."""
+        with self._lock:
+            for segment in (segment_of(profile), (ALL, ALL, ALL)):
+                self._dist(segment, metric).update(value)
+                self._dist(segment, metric, self._unsaved).update(value)
+
+    def observe_many(self, profile: Dict[str, Any], metrics: Dict[str, float]):
+        for metric, value in metrics.items():
+            if value is not None:
+                self.observe(profile, metric, float(value))
+
+    def observe_customer(self, profile: Dict[str, Any], metrics: Dict[str, float]):
+        """
+        Add a snapshot of one customer's PEER_METRICS (ledger totals and
+        risk score). Sketches cannot retract a value, so a customer filed
+        again later is added again with its new totals.
+        """
+        self.observe_many(profile, {name: metrics.get(name) for name in PEER_METRICS})
+
+    def merge(self, other: "PeerStatsService") -> "PeerStatsService":
+        """Fold in stats built elsewhere (another shard, another day)."""
+        with self._lock:
+            for (segment, metric), dist in other._dists.items():
+                self._dist(segment, metric).merge(dist)
+        return self
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def _peer_dist(self, profile: Dict[str, Any], metric: str) -> Tuple[Optional[_Distribution], str]:
+        dist = self._dists.get((segment_of(profile), metric))
+        if dist is not None and dist.moments.n >= self.min_peers:
+            return dist, "segment"
+        return self._dists.get(((ALL, ALL, ALL), metric)), "all"
+
+    def percentile(self, profile: Dict[str, Any], metric: str, value: float) -> Optional[float]:
+        dist, _ = self._peer_dist(profile, metric)
+        return 100.0 * dist.sketch.rank(value) if dist else None
+
+    def zscore(self, profile: Dict[str, Any], metric: str, value: float) -> Optional[float]:
+        dist, _ = self._peer_dist(profile, metric)
+        return dist.moments.zscore(value) if dist else None
+
+    def compare(self, profile: Dict[str, Any], metric: str, value: float) -> Optional[Dict[str, Any]]:
+        """Percentile, z-score and deviation from the peer median for one value."""
+        dist, scope = self._peer_dist(profile, metric)
+        if dist is None or dist.moments.n == 0:
+            return None
+        median = dist.sketch.quantile(0.5)
+        zscore = dist.moments.zscore(value)
+        return {
+            "value": value,
+            "percentile": round(100.0 * dist.sketch.rank(value), 1),
+            "zscore": round(zscore, 2) if zscore is not None else None,
+            "peer_median": median,
+            "deviation_pct": round(100.0 * (value - median) / median, 1) if median else None,
+            "peer_count": dist.moments.n,
+            "scope": scope,
+        }
+
+    def peer_report(self, profile: Dict[str, Any], metrics: Dict[str, float]) -> Dict[str, Any]:
+        report = {}
+        for metric, value in metrics.items():
+            if value is None:
+                continue
+            result = self.compare(profile, metric, float(value))
+            if result is not None:
+                report[metric] = result
+        return report
+
+    # -------------------------------
+    # Persistence
+    # -------------------------------
+    def save(self, path: str):
+        with self._lock:
+            payload = {
+                "k": self.k,
+                "min_peers": self.min_peers,
+                "distributions": [
+                    {
+                        "segment": list(segment),
+                        "metric": metric,
+                        "sketch": dist.sketch.to_dict(),
+                        "moments": dist.moments.to_dict(),
+                    }
+                    for (segment, metric), dist in self._dists.items()
+                ],
+            }
+        with open(path, "w") as f:
+            json.dump(payload, f)
+
+    def flush(self, path: str, min_interval: float = 0.0) -> bool:
+        """
+        Merge the observations made since the last flush into the sketches
+        stored at ``path``; returns False if there was nothing to write or
+        the last flush is less than ``min_interval`` seconds old.
+
+        Only this process's new observations are merged, so every process
+        feeding the same file adds its share exactly once. The file is
+        locked while it is read and rewritten, and replaced atomically.
+        """
+        with self._lock:
+            if not self._unsaved or time.monotonic() - self._last_flush < min_interval:
+                return False
+            unsaved, self._unsaved = self._unsaved, {}
+            self._last_flush = time.monotonic()
+
+        with _file_lock(f"{path}.lock"):
+            stored = type(self).load(path) if os.path.exists(path) else type(self)(self.k, self.min_peers)
+            for (segment, metric), dist in unsaved.items():
+                stored._dist(segment, metric).merge(dist)
+            stored.save(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        return True
+
+    @classmethod
+    def load(cls, path: str) -> "PeerStatsService":
+        with open(path) as f:
+            payload = json.load(f)
+        stats = cls(k=payload["k"], min_peers=payload["min_peers"])
+        for item in payload["distributions"]:
+            dist = _Distribution(stats.k)
+            dist.sketch = KLLSketch.from_dict(item["sketch"])
+            dist.moments = RunningMoments.from_dict(item["moments"])
+            stats._dists[(tuple(item["segment"]), item["metric"])] = dist
+        return stats
+
+
+def demo_peer_stats(profiles: Dict[str, Dict[str, Any]], peers_per_segment: int = 1000, seed: int = 7) -> PeerStatsService:
+    """
+    Synthetic peer population for local mode, scaled to each segment's
+    declared income so the demo customers have something to compare with.
+    """
+    rng = np.random.default_rng(seed)
+    stats = PeerStatsService()
+    seen = set()
+    for profile in profiles.values():
+        segment = segment_of(profile)
+        if segment in seen:
+            continue
+        seen.add(segment)
+        scale = float(profile.get("declared_annual_income", 100000)) / 12
+        tx_counts = rng.poisson(6, peers_per_segment) + 1
+        tx_amounts = rng.lognormal(np.log(scale / 3), 1.0, peers_per_segment)
+        risk_scores = np.clip(rng.normal(55, 12, peers_per_segment), 0, 100)
+        for count, amount, risk in zip(tx_counts, tx_amounts, risk_scores):
+            amounts = amount * rng.lognormal(0, 0.4, count)
+            stats.observe_many(profile, {
+                "transaction_count": count,
+                "total_amount": amounts.sum(),
+                "highest_single_transfer": amounts.max(),
+                "risk_score": risk,
+            })
+    # Synthetic peers are never merged into a persisted sketch file
+    stats._unsaved.clear()
+    return stats
+
+
+def peer_metrics(case: Dict[str, Any], exposure: Dict[str, Any]) -> Dict[str, float]:
+    metrics = {name: exposure.get(name) for name in PEER_METRICS if name in exposure}
+    metrics["risk_score"] = case.get("risk_score")
+    return metrics
+
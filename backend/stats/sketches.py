@@ -0,0 +1,174 @@
+"""
+Mergeable streaming summaries for SAR AI Copilot peer statistics.
+
+Responsibilities:
+- Approximate quantiles / ranks over unbounded streams in bounded memory
+  (KLLSketch, after Karnin, Lang & Liberty 2016)
+- Exact running mean / variance for z-scores (RunningMoments)
+
+Both support O(1) amortized updates and merging, so per-shard or
+per-day summaries can be combined without rescanning history.
+"""
+
+import bisect
+import math
+import random
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch.
+
+    Level ``h`` holds items of weight ``2**h``. When the sketch exceeds its
+    capacity the lowest full level is sorted and every other item (random
+    offset) is promoted, keeping rank error around ``1.65 / k``.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.min_value = math.inf
+        self.max_value = -math.inf
+        self.levels: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+        self._sorted: Optional[Tuple[List[float], List[int]]] = None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, value: float):
+        value = float(value)
+        self.n += 1
+        self.min_value = min(self.min_value, value)
+        self.max_value = max(self.max_value, value)
+        self.levels[0].append(value)
+        self._sorted = None
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    offset = self._rng.randint(0, 1)
+                    self.levels[h + 1].extend(items[offset::2])
+                    self.levels[h] = []
+                    break
+            else:
+                break
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self._sorted = None
+        self._compress()
+        return self
+
+    def _weighted(self) -> Tuple[List[float], List[int]]:
+        # Sorted values + cumulative weights, rebuilt lazily after updates
+        if self._sorted is None:
+            pairs = sorted((v, 1 << h) for h, items in enumerate(self.levels) for v in items)
+            values, cumulative, total = [], [], 0
+            for value, weight in pairs:
+                total += weight
+                values.append(value)
+                cumulative.append(total)
+            self._sorted = (values, cumulative)
+        return self._sorted
+
+    def rank(self, value: float) -> float:
+        """Approximate fraction of observed items <= ``value``."""
+        if self.n == 0:
+            return 0.0
+        values, cumulative = self._weighted()
+        i = bisect.bisect_right(values, value)
+        return cumulative[i - 1] / cumulative[-1] if i else 0.0
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            raise ValueError("quantile of an empty sketch")
+        if q <= 0:
+            return self.min_value
+        if q >= 1:
+            return self.max_value
+        values, cumulative = self._weighted()
+        i = bisect.bisect_left(cumulative, q * cumulative[-1])
+        return values[min(i, len(values) - 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min_value if self.n else None,
+            "max": self.max_value if self.n else None,
+            "levels": self.levels,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        if data["n"]:
+            sketch.min_value = data["min"]
+            sketch.max_value = data["max"]
+        sketch.levels = [list(items) for items in data["levels"]] or [[]]
+        return sketch
+
+
+class RunningMoments:
+    """Welford mean / variance with Chan et al. parallel merge."""
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def zscore(self, value: float) -> Optional[float]:
+        std = self.std
+        return (value - self.mean) / std if std else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningMoments":
+        return cls(data["n"], data["mean"], data["m2"])
@@ -0,0 +1,133 @@
+"""
+Cold-start import benchmark for SAR AI Copilot.
+
+Runs each cold path in a fresh interpreter under ``python -X importtime``
+and summarizes where the time goes. The check fails (exit 1) if a cold
+path pulls in a heavy subsystem that should load lazily (LLM stack,
+ReportLab, database driver, numeric libraries) or exceeds its budget.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --top 15 --json report.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Any, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Subsystems that must stay off the path to the first dashboard render
+DEFERRED = (
+    "langchain", "langchain_core", "langchain_community", "ollama",
+    "reportlab",
+    "psycopg2",
+    "numpy", "sklearn", "shap", "networkx",
+)
+
+# name -> (code, budget in ms of cumulative import time)
+COLD_PATHS = {
+    "service_import": ("import backend.cases.service", 250),
+    "first_render": (
+        "from backend.cases.service import build_default_service\n"
+        "service = build_default_service(start_workers=False)\n"
+        "service.counts()\n"
+        "service.query(limit=25)",
+        400,
+    ),
+    # What the Streamlit app actually runs: local mode with worker threads,
+    # the endpoint pool and the prefetcher started
+    "app_startup": (
+        "from backend.cases.service import build_default_service\n"
+        "service = build_default_service()\n"
+        "service.counts()\n"
+        "service.query(limit=25)",
+        450,
+    ),
+    "api_client": ("import backend.api.client", 600),
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile(code: str) -> List[Dict[str, Any]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    # Keep the benchmark hermetic: no database, and local job / trace files
+    # of the paths that start workers go to a scratch directory
+    env.pop("POSTGRES_URL", None)
+    with tempfile.TemporaryDirectory(prefix="sar-import-bench-") as scratch:
+        env["SAR_JOB_DB"] = os.path.join(scratch, "jobs.sqlite3")
+        env["SAR_TRACE_LOG"] = os.path.join(scratch, "traces.jsonl")
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+    if proc.returncode != 0:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"cold path failed:\n{tail}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append({
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+                "depth": len(m.group(3)) // 2,
+                "module": m.group(4),
+            })
+    return rows
+
+
+def summarize(name: str, code: str, budget_ms: float, top: int) -> Dict[str, Any]:
+    rows = profile(code)
+    total_ms = sum(r["self_us"] for r in rows) / 1000
+    modules = {r["module"] for r in rows}
+    leaked = sorted({m.split(".")[0] for m in modules} & set(DEFERRED))
+    heaviest = sorted((r for r in rows if r["depth"] == 0), key=lambda r: -r["cumulative_us"])[:top]
+    return {
+        "name": name,
+        "total_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "module_count": len(modules),
+        "deferred_leaks": leaked,
+        "top_level": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in heaviest],
+        "ok": not leaked and total_ms <= budget_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of SAR AI Copilot cold paths")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--only", choices=sorted(COLD_PATHS))
+    args = parser.parse_args()
+
+    reports = []
+    for name, (code, budget_ms) in COLD_PATHS.items():
+        if args.only and name != args.only:
+            continue
+        report = summarize(name, code, budget_ms, args.top)
+        reports.append(report)
+
+        status = "OK" if report["ok"] else "FAIL"
+        print(f"[{status}] {name}: {report['total_ms']} ms import time "
+              f"(budget {budget_ms} ms), {report['module_count']} modules")
+        for item in report["top_level"]:
+            print(f"    {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+        if report["deferred_leaks"]:
+            print(f"    loaded eagerly: {', '.join(report['deferred_leaks'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    sys.exit(0 if all(r["ok"] for r in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Memory budget benchmark for SAR AI Copilot.
+
+Simulates a long-running single-node process in local mode: drafts and
+reasoning traces for many cases pile up in the in-memory repository and
+ExplainabilityEngine. Runs the same workload without and with a
+MemoryBudget (backend.memory) and reports:
+- peak Python heap (tracemalloc) and the bytes the stores track as held
+  in RAM (estimates per store: a narrative shared by a draft and its
+  trace is counted in both)
+- bytes spilled to disk and the cost of reading a spilled draft back
+
+    python benchmarks/memory_budget.py
+    python benchmarks/memory_budget.py --cases 5000 --drafts 4 --budget-mb 16 --json report.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.cases.repository import InMemoryCaseRepository  # noqa: E402
+from backend.explainability.trace import ExplainabilityEngine  # noqa: E402
+from backend.memory import MemoryBudget  # noqa: E402
+
+
+def narrative(case_id: int, draft: int, words: int) -> str:
+    rng = random.Random(case_id * 1000 + draft)
+    vocab = ("transfer", "offshore", "account", "structuring", "wire", "beneficiary", "threshold", "customer")
+    return f"SAR draft {draft} for case {case_id}: " + " ".join(rng.choice(vocab) for _ in range(words))
+
+
+def run(args, budget_mb: Optional[float]) -> Dict[str, Any]:
+    budget = None
+    if budget_mb is not None:
+        budget = MemoryBudget(int(budget_mb * (1 << 20)), spill_dir=tempfile.mkdtemp(prefix="sar-spill-bench-"))
+    tracemalloc.start()
+    started = time.perf_counter()
+    repo = InMemoryCaseRepository(budget=budget)
+    engine = ExplainabilityEngine(budget=budget)
+    for case_id in range(1, args.cases + 1):
+        for draft in range(1, args.drafts + 1):
+            text = narrative(case_id, draft, args.words)
+            repo.save_draft(case_id, text, "mock-sar")
+            engine.capture_trace(case_id, "mock-sar", {"risk_score": 80 + draft}, "context " * 50, output={"narrative": text})
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Read back the oldest drafts (spilled first under a budget)
+    rng = random.Random(7)
+    sample = [(rng.randint(1, max(1, args.cases // 10)), 1) for _ in range(args.reads)]
+    read_started = time.perf_counter()
+    for key in sample:
+        assert repo._drafts.get(key)["case_id"] == key[0]
+    read_us = (time.perf_counter() - read_started) / len(sample) * 1e6
+
+    report = {
+        "budget_mb": budget_mb,
+        "write_s": round(elapsed, 3),
+        "peak_heap_mb": round(peak / (1 << 20), 1),
+        "cold_read_us": round(read_us, 1),
+    }
+    if budget is not None:
+        usage = budget.usage()
+        report["tracked_mb"] = round(usage["used_bytes"] / (1 << 20), 1)
+        report["spilled_mb"] = round(usage["spill_live_bytes"] / (1 << 20), 1)
+        report["stores"] = {
+            name: {k: store[k] for k in ("hot_entries", "spilled_entries", "spills", "reloads")}
+            for name, store in usage["stores"].items()
+        }
+    else:
+        report["tracked_mb"] = round((repo._drafts.memory_usage() + engine.traces.memory_usage()) / (1 << 20), 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure RAM held by drafts and traces without and with a memory budget")
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--drafts", type=int, default=3, help="Drafts (and traces) per case")
+    parser.add_argument("--words", type=int, default=400, help="Words per narrative")
+    parser.add_argument("--budget-mb", type=float, default=8.0)
+    parser.add_argument("--reads", type=int, default=500, help="Old drafts read back after the run")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = {"unbounded": run(args, None), "budgeted": run(args, args.budget_mb)}
+    for label, row in report.items():
+        extra = f", spilled {row['spilled_mb']} MB" if "spilled_mb" in row else ""
+        print(f"[{label}] peak heap {row['peak_heap_mb']} MB, tracked {row['tracked_mb']} MB{extra}, "
+              f"write {row['write_s']:.2f}s, old-draft read {row['cold_read_us']:.0f} us")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Ollama endpoint benchmark for SAR AI Copilot.
+
+Runs mock Ollama instances (backend.eval.mock_ollama) in this process and
+drives them through an EndpointPool (backend.llm.endpoints):
+- cold start: latency of the first draft without and with the pool's
+  startup warm-up (the warm-up itself runs before the first request)
+- throughput: the same batch of concurrent drafts on one instance and
+  with least-loaded routing over several
+
+    python benchmarks/ollama_endpoints.py
+    python benchmarks/ollama_endpoints.py --instances 4 --requests 32 --load-seconds 3 --json report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.eval.mock_ollama import MockOllamaServer  # noqa: E402
+from backend.llm.endpoints import EndpointPool  # noqa: E402
+
+MODEL = "mock-sar"
+MESSAGES = [
+    {"role": "system", "content": "You are an AML analyst drafting a Suspicious Activity Report."},
+    {"role": "user", "content": "{'customer_name': 'Demo Customer', 'risk_score': 86.5, 'total_amount': 125000}"},
+]
+
+
+def draft(pool: EndpointPool) -> float:
+    started = time.perf_counter()
+    with pool.acquire() as endpoint:
+        endpoint.request(
+            "POST",
+            "/api/chat",
+            {"model": pool.model, "messages": MESSAGES, "stream": False, "keep_alive": pool.keep_alive},
+            timeout=pool.load_timeout,
+        )
+    return time.perf_counter() - started
+
+
+def start_servers(count: int, args) -> List[MockOllamaServer]:
+    return [
+        MockOllamaServer(load_seconds=args.load_seconds, token_delay=args.token_delay, parallel=1).start()
+        for _ in range(count)
+    ]
+
+
+def cold_start(args) -> Dict[str, Any]:
+    report = {}
+    for warm in (False, True):
+        servers = start_servers(1, args)
+        pool = EndpointPool([s.url for s in servers], model=MODEL)
+        warm_up = sum(v or 0.0 for v in pool.warm_up().values()) if warm else 0.0
+        report["warm" if warm else "cold"] = {"warm_up_s": round(warm_up, 3), "first_draft_s": round(draft(pool), 3)}
+        for server in servers:
+            server.stop()
+    return report
+
+
+def throughput(instances: int, args) -> Dict[str, Any]:
+    servers = start_servers(instances, args)
+    pool = EndpointPool([s.url for s in servers], model=MODEL)
+    pool.warm_up()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = sorted(executor.map(lambda _: draft(pool), range(args.requests)))
+    elapsed = time.perf_counter() - started
+    served = [ep["served"] for ep in pool.stats()]
+    for server in servers:
+        server.stop()
+    return {
+        "instances": instances,
+        "requests": args.requests,
+        "seconds": round(elapsed, 3),
+        "drafts_per_s": round(args.requests / elapsed, 2),
+        "p50_s": round(latencies[len(latencies) // 2], 3),
+        "p95_s": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "served_per_instance": served,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Ollama warm-up and multi-instance routing against mock servers")
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, help="Drafts in flight (default: 2 per instance)")
+    parser.add_argument("--load-seconds", type=float, default=2.0, help="Mock model load time")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Mock seconds per token")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    args.concurrency = args.concurrency or 2 * args.instances
+
+    report = {"cold_start": cold_start(args)}
+    cold, warm = report["cold_start"]["cold"], report["cold_start"]["warm"]
+    print(f"[cold start] first draft {cold['first_draft_s']:.2f}s without warm-up, "
+          f"{warm['first_draft_s']:.2f}s after a {warm['warm_up_s']:.2f}s startup warm-up")
+
+    single, pooled = throughput(1, args), throughput(args.instances, args)
+    report["throughput"] = {"single": single, "pooled": pooled, "speedup": round(pooled["drafts_per_s"] / single["drafts_per_s"], 2)}
+    for row in (single, pooled):
+        print(f"[throughput] {row['instances']} instance(s): {row['drafts_per_s']:.2f} drafts/s, "
+              f"p50 {row['p50_s']:.2f}s, p95 {row['p95_s']:.2f}s, served {row['served_per_instance']}")
+    print(f"[throughput] speedup x{report['throughput']['speedup']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,6 @@ Now includes:
 import sys
 import os
 import streamlit as st
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
 
 # Ensure project root is in Python path
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,8 +17,10 @@ PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-from backend.llm.model import SARLLM, SARInput
-from backend.explainability.trace import ExplainabilityEngine
+from backend.cases.repository import risk_band
+from backend.cases.service import build_default_service
+from backend.cases.state import CLOSED_FALSE_POSITIVE, SAR_DRAFTED, InvalidTransition, StaleCaseVersion
+from frontend.components.case_table import render_case_table
 
 # -------------------------------
 # App Configuration
@@ -204,68 +201,80 @@ with st.sidebar:
     st.button("Sign Out")
     st.markdown('</div>', unsafe_allow_html=True)
 
-llm = SARLLM()
-explain_engine = ExplainabilityEngine()
-
 # -------------------------------
-# Mock Case Data (Hackathon Demo)
+# Case Service (shared across sessions)
 # -------------------------------
-if "cases" not in st.session_state:
-    st.session_state.cases = [
-        {
-            "case_id": 1,
-            "customer_id": "CUST-001",
-            "customer_name": "John Doe",
-            "risk_score": 86.5,
-            "status": "NEW",
-            "alert_reason": "Unusual spike in cross-border transfers.",
-            "transaction_summary": "Multiple high-value transfers to offshore accounts within 7 days."
-        },
-        {
-            "case_id": 2,
-            "customer_id": "CUST-002",
-            "customer_name": "Priya Sharma",
-            "risk_score": 72.3,
-            "status": "UNDER_REVIEW",
-            "alert_reason": "Structuring detected below reporting threshold.",
-            "transaction_summary": "Frequent cash deposits slightly below compliance threshold."
-        },
-        {
-            "case_id": 3,
-            "customer_id": "CUST-003",
-            "customer_name": "Michael Tan",
-            "risk_score": 91.2,
-            "status": "NEW",
-            "alert_reason": "Rapid movement of funds across high-risk jurisdictions.",
-            "transaction_summary": "Three large transfers routed through layered shell accounts in 48 hours."
-        },
-        {
-            "case_id": 4,
-            "customer_id": "CUST-004",
-            "customer_name": "Sara Williams",
-            "risk_score": 67.4,
-            "status": "UNDER_REVIEW",
-            "alert_reason": "Inconsistent income declaration patterns.",
-            "transaction_summary": "Account activity inconsistent with declared business revenue profile."
-        },
-        {
-            "case_id": 5,
-            "customer_id": "CUST-005",
-            "customer_name": "Arjun Mehta",
-            "risk_score": 78.9,
-            "status": "NEW",
-            "alert_reason": "Structuring behavior across multiple accounts.",
-            "transaction_summary": "Repeated sub-threshold deposits across linked accounts within 5 days."
-        }
-    ]
+@st.cache_resource
+def get_case_service():
+    # Remote case service when configured, otherwise one in-process
+    # service shared by every session of this Streamlit process.
+    api_url = os.getenv("SAR_API_URL")
+    if api_url:
+        from backend.api.client import CaseServiceClient
+
+        return CaseServiceClient(api_url)
+    return build_default_service()
+
+
+case_service = get_case_service()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def sar_pdf(case, draft):
+    # ReportLab loads on the first download render; later reruns reuse the bytes
+    from backend.reports.pdf import render_sar_pdf
+
+    return render_sar_pdf(case, draft)
+
+
+def compact_usd(amount):
+    amount = float(amount or 0)
+    if abs(amount) >= 1_000_000:
+        return f"${amount / 1_000_000:,.1f}M"
+    if abs(amount) >= 1_000:
+        return f"${amount / 1_000:,.0f}K"
+    return f"${amount:,.0f}"
 
-if "selected_case" not in st.session_state:
-    st.session_state.selected_case = None
+
+def weekly_change(timeline):
+    # Volume of the last 7 days against the 7 days before; None without a baseline
+    last = sum(e["amount"] for e in timeline if -7 < e["day"] <= 0)
+    prior = sum(e["amount"] for e in timeline if -14 < e["day"] <= -7)
+    return 100.0 * (last - prior) / prior if prior else None
+
+
+def band_false_positive_rate(band):
+    # Share of decided cases in the band that were closed as false positives
+    closed = case_service.query(status=CLOSED_FALSE_POSITIVE, band=band, limit=1).total
+    filed = case_service.query(status=SAR_DRAFTED, band=band, limit=1).total
+    return (100.0 * closed / (closed + filed), closed + filed) if closed + filed else (None, 0)
+
+
+@st.fragment(run_every=2)
+def render_draft_status(case_id):
+    # Polls the drafting job without blocking the rest of the page
+    job = case_service.latest_job(case_id)
+    if job is None:
+        return
+    if job["status"] in ("QUEUED", "RUNNING"):
+        st.info(f"SAR draft {job['status'].lower()} (job #{job['job_id']})...")
+        st.session_state.pending_draft_job = job["job_id"]
+    elif st.session_state.get("pending_draft_job") == job["job_id"]:
+        # Job just finished: rerun the full page so the narrative shows up
+        st.session_state.pending_draft_job = None
+        st.rerun(scope="app")
+    elif job["status"] == "FAILED":
+        st.error(f"SAR drafting failed: {job['error']}")
+    else:
+        st.success("SAR Draft Generated Successfully")
+
+if "selected_case_id" not in st.session_state:
+    st.session_state.selected_case_id = None
 
 # -------------------------------
 # Dashboard View
 # -------------------------------
-if st.session_state.selected_case is None:
+if st.session_state.selected_case_id is None:
 
     if selected_tab != "Dashboard":
 
@@ -423,10 +432,11 @@ if st.session_state.selected_case is None:
     # ===============================
     # TOP METRICS ROW
     # ===============================
-    total_cases = len(st.session_state.cases)
-    high_risk = len([c for c in st.session_state.cases if c["risk_score"] >= 80])
-    medium_risk = len([c for c in st.session_state.cases if 70 <= c["risk_score"] < 80])
-    low_risk = len([c for c in st.session_state.cases if c["risk_score"] < 70])
+    counts = case_service.counts()
+    total_cases = counts.total
+    high_risk = counts.by_band.get("High", 0)
+    medium_risk = counts.by_band.get("Medium", 0)
+    low_risk = counts.by_band.get("Low", 0)
 
     m1, m2, m3, m4 = st.columns(4)
 
@@ -454,9 +464,9 @@ if st.session_state.selected_case is None:
     # ===============================
     st.markdown("### Case Workflow Pipeline")
 
-    new_cases = len([c for c in st.session_state.cases if c["status"] == "NEW"])
-    under_review = len([c for c in st.session_state.cases if c["status"] == "UNDER_REVIEW"])
-    drafted = len([c for c in st.session_state.cases if c["status"] == "SAR_DRAFTED"])
+    new_cases = counts.by_status.get("NEW", 0)
+    under_review = counts.by_status.get("UNDER_REVIEW", 0)
+    drafted = counts.by_status.get("SAR_DRAFTED", 0)
 
     p1, p2, p3 = st.columns(3)
     p1.markdown(f"""
@@ -495,110 +505,26 @@ if st.session_state.selected_case is None:
 </style>
 """, unsafe_allow_html=True)
     # ===============================
-    # INSTITUTIONAL TERMINAL HEADER
-    # ===============================
-    header_cols = st.columns([0.6, 2.2, 1, 1, 1.2, 0.8, 1, 1])
-
-    header_cols[0].markdown("**ID**")
-    header_cols[1].markdown("**CUSTOMER**")
-    header_cols[2].markdown("**RISK SCORE**")
-    header_cols[3].markdown("**RISK**")
-    header_cols[4].markdown("**STATUS**")
-    header_cols[5].markdown("**SLA (HRS)**")
-    header_cols[6].markdown("**GEOGRAPHY**")
-    header_cols[7].markdown("**ACTION**")
-
-    st.divider()
-
-    # ===============================
-    # CASE ROWS
+    # CASE TABLE (one page at a time)
     # ===============================
-    for case in st.session_state.cases:
-
-        # Filtering logic
-        if risk_filter == "High" and case["risk_score"] < 80:
-            continue
-        if risk_filter == "Medium" and not (70 <= case["risk_score"] < 80):
-            continue
-        if risk_filter == "Low" and case["risk_score"] >= 70:
-            continue
-        if status_filter != "All" and case["status"] != status_filter:
-            continue
-        if search_query and search_query.lower() not in case["customer_name"].lower():
-            continue
-
-        # Risk tier logic
-        if case["risk_score"] >= 80:
-            risk_label = "HIGH"
-            risk_color = "#DC2626"
-        elif case["risk_score"] >= 70:
-            risk_label = "MED"
-            risk_color = "#F59E0B"
-        else:
-            risk_label = "LOW"
-            risk_color = "#22C55E"
-
-        # SLA logic
-        sla_hours = max(0, 4 - case["case_id"])
-
-        if sla_hours <= 0:
-            sla_color = "#DC2626"
-        elif sla_hours <= 1:
-            sla_color = "#F59E0B"
-        else:
-            sla_color = "#22C55E"
-
-        # Geography (demo value)
-        geography = "APAC" if case["case_id"] % 2 == 0 else "EMEA"
-
-        row_cols = st.columns([0.6, 2.2, 1, 1, 1.2, 0.8, 1, 1])
-
-        # ID
-        row_cols[0].markdown(f"#{case['case_id']}")
-
-        # Customer
-        row_cols[1].markdown(
-            f"**{case['customer_name']}**  \n"
-            f"<span style='color:#64748B; font-size:12px;'>{case['customer_id']} | {case['status']}</span>",
-            unsafe_allow_html=True
-        )
-
-        # Risk Score
-        row_cols[2].markdown(
-            f"<div style='font-weight:700; text-align:right; font-family:monospace;'>{case['risk_score']:.1f}</div>",
-            unsafe_allow_html=True
-        )
-
-        # Risk Tier
-        row_cols[3].markdown(
-            f"<span style='font-weight:700; color:{risk_color};'>{risk_label}</span>",
-            unsafe_allow_html=True
-        )
-
-        # Status
-        row_cols[4].markdown(case["status"])
-
-        # SLA (colored text only)
-        row_cols[5].markdown(
-            f"<div style='font-weight:700; color:{sla_color}; text-align:right; font-family:monospace;'>{sla_hours}h</div>",
-            unsafe_allow_html=True
-        )
-
-        # Geography
-        row_cols[6].markdown(geography)
-
-        if row_cols[7].button(
-            "Open",
-            key=f"open_case_{case['case_id']}",
-            use_container_width=True
-        ):
-            st.session_state.selected_case = case
-            st.rerun()
+    opened_case = render_case_table(
+        case_service,
+        status=None if status_filter == "All" else status_filter,
+        band=None if risk_filter == "All" else risk_filter,
+        search=search_query or None,
+    )
 
-        st.divider()
+    if opened_case is not None:
+        st.session_state.selected_case_id = opened_case["case_id"]
+        st.rerun()
 
 else:
-    case = st.session_state.selected_case
+    case = case_service.get(st.session_state.selected_case_id)
+    context = case_service.get_context(case["case_id"])
+    exposure = context["exposure"]
+    screening = context["screening"]
+    profile = context.get("profile", {})
+    band = risk_band(case["risk_score"])
 
     # Use CSS variables (defined in apply_theme) for all case detail colors
     st.markdown(f"""
@@ -618,7 +544,7 @@ else:
         color: var(--text-secondary);
         margin-top: 6px;
     }}
-    .bb-badge-high {{
+    .bb-badge-high, .bb-badge-medium, .bb-badge-low {{
         background: var(--accent-danger);
         color: var(--card);
         padding:4px 10px;
@@ -626,6 +552,12 @@ else:
         font-size:12px;
         font-weight:600;
     }}
+    .bb-badge-medium {{
+        background: #F59E0B;
+    }}
+    .bb-badge-low {{
+        background: var(--accent-success);
+    }}
     .bb-card {{
         background: var(--card);
         border:1px solid var(--border);
@@ -690,7 +622,7 @@ else:
         st.markdown('<div class="bb-header">', unsafe_allow_html=True)
         st.markdown(
             f'<div class="bb-title">CASE #{case["case_id"]} — {case["customer_name"]} '
-            f'<span class="bb-badge-high">HIGH RISK</span></div>'
+            f'<span class="bb-badge-{band.lower()}">{band.upper()} RISK</span></div>'
             f'<div class="bb-small" style="margin-top:4px;">'
             f'Case Severity: Critical | Escalation Tier: 3 | Monitoring Priority: Immediate'
             f'</div>',
@@ -699,7 +631,8 @@ else:
         st.markdown(
             f'<div class="bb-meta">Customer ID: {case["customer_id"]} | '
             f'Risk Score: {case["risk_score"]} | '
-            f'Status: {case["status"]} | Region: APAC | Tier: 3</div>',
+            f'Status: {case["status"]} | Region: {profile.get("region", "n/a")} | '
+            f'Tier: {profile.get("tier", "n/a")}</div>',
             unsafe_allow_html=True
         )
         st.markdown('</div>', unsafe_allow_html=True)
@@ -707,7 +640,7 @@ else:
     with header_right:
         st.markdown("<div style='height:60px;'></div>", unsafe_allow_html=True)
         if st.button("Back to Dashboard", use_container_width=True):
-            st.session_state.selected_case = None
+            st.session_state.selected_case_id = None
             st.rerun()
 
     left, right = st.columns([2,1])
@@ -724,9 +657,23 @@ else:
         st.markdown('<div class="bb-section-title">Transaction Intelligence</div>', unsafe_allow_html=True)
 
         c1, c2, c3 = st.columns(3)
-        c1.markdown('<div class="bb-metric">17</div><div class="bb-small">Flagged Transactions</div>', unsafe_allow_html=True)
-        c2.markdown('<div class="bb-metric">$482K</div><div class="bb-small">Total Exposure</div>', unsafe_allow_html=True)
-        c3.markdown('<div class="bb-metric">+240%</div><div class="bb-small">Peer Deviation</div>', unsafe_allow_html=True)
+        c1.markdown(
+            f'<div class="bb-metric">{exposure.get("flagged_count", 0)}</div><div class="bb-small">Flagged Transactions</div>',
+            unsafe_allow_html=True
+        )
+        c2.markdown(
+            f'<div class="bb-metric">{compact_usd(exposure.get("total_amount"))}</div><div class="bb-small">Total Exposure</div>',
+            unsafe_allow_html=True
+        )
+        peer_total = context.get("peers", {}).get("total_amount")
+        if peer_total and peer_total["deviation_pct"] is not None:
+            c3.markdown(
+                f'<div class="bb-metric">{peer_total["deviation_pct"]:+.0f}%</div>'
+                f'<div class="bb-small">Peer Deviation ({peer_total["percentile"]:.0f}th pct)</div>',
+                unsafe_allow_html=True
+            )
+        else:
+            c3.markdown('<div class="bb-metric">n/a</div><div class="bb-small">Peer Deviation</div>', unsafe_allow_html=True)
 
         st.markdown('<div class="bb-divider"></div>', unsafe_allow_html=True)
 
@@ -752,7 +699,12 @@ else:
             st.caption("Cross-border transaction velocity vs historical baseline")
 
         with v2:
-            st.markdown('<div class="bb-metric">+12%</div><div class="bb-small">Weekly Increase</div>', unsafe_allow_html=True)
+            change = weekly_change(context["timeline"])
+            st.markdown(
+                f'<div class="bb-metric">{f"{change:+.0f}%" if change is not None else "n/a"}</div>'
+                f'<div class="bb-small">Weekly Volume Change</div>',
+                unsafe_allow_html=True
+            )
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -762,13 +714,13 @@ else:
         st.markdown('<div class="bb-card">', unsafe_allow_html=True)
         st.markdown('<div class="bb-section-title">Financial Exposure Breakdown</div>', unsafe_allow_html=True)
 
-        st.markdown("""
-        Highest Single Transfer: $125,000  
-        Offshore Jurisdictions: 3  
-        PEP Screening: Negative  
-        Sanctions Hit: None  
-        Monitoring Window: 30 Days  
-        """)
+        st.markdown(
+            f"Highest Single Transfer: \\${exposure['highest_single_transfer']:,.0f}  \n"
+            f"Offshore Jurisdictions: {exposure['offshore_jurisdictions']}  \n"
+            f"PEP Screening: {'Positive' if screening['pep'] else 'Negative'}  \n"
+            f"Sanctions Hit: {'Yes' if screening['sanctions_hit'] else 'None'}  \n"
+            f"Monitoring Window: {exposure['monitoring_window_days']} Days  "
+        )
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -778,15 +730,26 @@ else:
         st.markdown('<div class="bb-card">', unsafe_allow_html=True)
         st.markdown('<div class="bb-section-title">Recent Transaction Timeline</div>', unsafe_allow_html=True)
 
-        st.markdown("""
-        • Day -7: $45,000 transfer to SG entity  
-        • Day -5: $62,000 transfer to HK beneficiary  
-        • Day -3: $125,000 offshore wire (flagged)  
-        • Day -1: $38,000 cross-border movement  
-        """)
+        timeline_lines = [
+            f"• Day {event['day']:g}: \\${event['amount']:,.0f} "
+            f"{'transfer to' if event['direction'] == 'out' else 'received from'} "
+            f"{event['counterparty']} ({event['country']})"
+            f"{' (flagged)' if event['flagged'] else ''}"
+            for event in context["timeline"][-6:]
+        ]
+        st.markdown("  \n".join(timeline_lines) or "No transactions in the monitoring window.")
 
         st.markdown('</div>', unsafe_allow_html=True)
 
+        # -----------------------------
+        # TRACED FUND FLOWS
+        # -----------------------------
+        if context["flows"]["summary"]:
+            st.markdown('<div class="bb-card">', unsafe_allow_html=True)
+            st.markdown('<div class="bb-section-title">Traced Fund Flows</div>', unsafe_allow_html=True)
+            st.markdown("  \n".join(f"• {line}" for line in context["flows"]["summary"].splitlines()))
+            st.markdown('</div>', unsafe_allow_html=True)
+
         # -----------------------------
         # ALERT NARRATIVE (NOW LAST)
         # -----------------------------
@@ -824,13 +787,30 @@ else:
         st.markdown('<div class="bb-card">', unsafe_allow_html=True)
         st.markdown('<div class="bb-section-title">Model Explainability</div>', unsafe_allow_html=True)
 
-        st.markdown("""
+        peer_risk = context.get("peers", {}).get("risk_score")
+        anomaly_percentile = f'{peer_risk["percentile"]:.0f}th' if peer_risk else "n/a"
+        fp_rate, decided = band_false_positive_rate(band)
+        fp_text = f"{fp_rate:.0f}% of {decided} decided {band} cases" if fp_rate is not None else "n/a"
+        st.markdown(f"""
         Primary Model: Hybrid Rules + ML  
-        SHAP Feature Impact: High on cross-border weight  
-        Anomaly Score Percentile: 94th  
-        False Positive Probability: 8%  
+        Anomaly Score Percentile: {anomaly_percentile}  
+        False Positive Rate ({band} band): {fp_text}  
         """)
 
+        attributions = case_service.get_attributions(case["case_id"])
+        if attributions:
+            st.markdown("**SHAP Feature Impact**")
+            for feat in attributions["top_features"]:
+                arrow = "↑" if feat["shap"] >= 0 else "↓"
+                st.markdown(
+                    f'<div class="bb-small">{arrow} {feat["label"]}: '
+                    f'{feat["shap"]:+.1f} pts (value {feat["value"]:,.0f})</div>',
+                    unsafe_allow_html=True
+                )
+            st.caption(f'Baseline {attributions["base_value"]:.1f} → model {attributions["prediction"]:.1f}')
+        else:
+            st.caption("SHAP attributions not computed yet (run backend.explainability.attributions).")
+
         st.markdown('<div class="bb-divider"></div>', unsafe_allow_html=True)
 
         st.markdown("**Regulatory Impact Assessment**")
@@ -851,68 +831,54 @@ else:
         false_positive_clicked = st.button("Mark as False Positive", use_container_width=True)
 
         if generate_clicked:
-            with st.spinner("Generating Suspicious Activity Report..."):
-                customer_profile = {
-                    "customer_id": case["customer_id"],
-                    "customer_name": case["customer_name"],
-                    "risk_score": case["risk_score"],
-                }
-
-                sar_input = SARInput(
-                    customer_profile=customer_profile,
-                    transaction_summary={"summary": case["transaction_summary"]},
-                    alert_reason=case["alert_reason"],
-                )
+            case_service.enqueue_draft(case["case_id"], actor="analyst")
 
-                sar_output = llm.generate_sar(sar_input)
-
-                case["status"] = "SAR_DRAFTED"
-                st.session_state.generated_sar = sar_output
-
-            st.success("SAR Draft Generated Successfully")
+        render_draft_status(case["case_id"])
 
         if escalate_clicked:
             st.warning("Case escalated to Manager")
 
         if false_positive_clicked:
-            case["status"] = "CLOSED_FALSE_POSITIVE"
-            st.success("Marked as False Positive")
+            try:
+                case_service.transition(
+                    case["case_id"],
+                    "CLOSED_FALSE_POSITIVE",
+                    actor="analyst",
+                    expected_version=case["version"],
+                )
+                st.success("Marked as False Positive")
+            except StaleCaseVersion:
+                st.warning("Case was updated by someone else. Reload and review before closing.")
+            except InvalidTransition as exc:
+                st.error(str(exc))
 
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-    if "generated_sar" in st.session_state:
+    draft = case_service.latest_draft(case["case_id"])
+
+    if draft is not None:
         st.markdown("---")
         st.subheader("Generated SAR Narrative Report")
 
         st.text_area(
             "SAR Narrative",
-            st.session_state.generated_sar,
+            draft["narrative"],
             height=350
         )
 
-        # -------- Generate PDF Button BELOW narrative --------
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        elements = []
-
-        styles = getSampleStyleSheet()
-        elements.append(Paragraph("<b>Suspicious Activity Report</b>", styles["Title"]))
-        elements.append(Spacer(1, 12))
-
-        elements.append(Paragraph(f"Case ID: {case['case_id']}", styles["Normal"]))
-        elements.append(Paragraph(f"Customer ID: {case['customer_id']}", styles["Normal"]))
-        elements.append(Paragraph(f"Risk Score: {case['risk_score']}", styles["Normal"]))
-        elements.append(Spacer(1, 12))
-
-        elements.append(Paragraph(st.session_state.generated_sar.replace("\n", "<br/>"), styles["Normal"]))
-
-        doc.build(elements)
-        buffer.seek(0)
+        traces = case_service.list_traces(case["case_id"])
+        violations = traces[-1]["output"].get("guardrail_violations") if traces else None
+        if violations:
+            st.warning(
+                "Guardrail checks still failing after retries - review before filing:\n"
+                + "\n".join(f"- {v['section']}: {v['message']}" for v in violations)
+            )
 
+        # -------- Generate PDF Button BELOW narrative --------
         st.download_button(
             label="Download SAR as PDF",
-            data=buffer,
+            data=sar_pdf(case, draft),
             file_name=f"SAR_Case_{case['case_id']}.pdf",
             mime="application/pdf",
             use_container_width=True
@@ -0,0 +1,161 @@
+"""
+Paginated case table component for the SAR AI Copilot dashboard.
+
+Responsibilities:
+- Ask the case source for one sorted, filtered page at a time
+- Render only that page (one row + one button per visible case)
+- Keep pagination / sort state in st.session_state under a component key
+
+Any object exposing ``query(status, band, search, offset, limit, sort_by,
+descending)`` returning a CasePage can back the table.
+"""
+
+from typing import Dict, Any, Optional
+
+import streamlit as st
+
+COLUMN_WIDTHS = [0.6, 2.2, 1, 1, 1.2, 0.8, 1, 1]
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+SORT_OPTIONS = {
+    "Case ID": "case_id",
+    "Risk Score": "risk_score",
+    "Customer": "customer_name",
+    "Status": "status",
+}
+
+
+def _risk_tier(risk_score: float):
+    if risk_score >= 80:
+        return "HIGH", "#DC2626"
+    if risk_score >= 70:
+        return "MED", "#F59E0B"
+    return "LOW", "#22C55E"
+
+
+def _sla(case_id: int):
+    sla_hours = max(0, 4 - case_id)
+    if sla_hours <= 0:
+        return sla_hours, "#DC2626"
+    if sla_hours <= 1:
+        return sla_hours, "#F59E0B"
+    return sla_hours, "#22C55E"
+
+
+def _render_row(case: Dict[str, Any], key: str) -> bool:
+    risk_label, risk_color = _risk_tier(case["risk_score"])
+    sla_hours, sla_color = _sla(case["case_id"])
+
+    # Geography (demo value)
+    geography = "APAC" if case["case_id"] % 2 == 0 else "EMEA"
+
+    row_cols = st.columns(COLUMN_WIDTHS)
+
+    row_cols[0].markdown(f"#{case['case_id']}")
+    row_cols[1].markdown(
+        f"**{case['customer_name']}**  \n"
+        f"<span style='color:#64748B; font-size:12px;'>{case['customer_id']} | {case['status']}</span>",
+        unsafe_allow_html=True
+    )
+    row_cols[2].markdown(
+        f"<div style='font-weight:700; text-align:right; font-family:monospace;'>{case['risk_score']:.1f}</div>",
+        unsafe_allow_html=True
+    )
+    row_cols[3].markdown(
+        f"<span style='font-weight:700; color:{risk_color};'>{risk_label}</span>",
+        unsafe_allow_html=True
+    )
+    row_cols[4].markdown(case["status"])
+    row_cols[5].markdown(
+        f"<div style='font-weight:700; color:{sla_color}; text-align:right; font-family:monospace;'>{sla_hours}h</div>",
+        unsafe_allow_html=True
+    )
+    row_cols[6].markdown(geography)
+
+    return row_cols[7].button(
+        "Open",
+        key=f"{key}_open_{case['case_id']}",
+        use_container_width=True
+    )
+
+
+def render_case_table(
+    source,
+    status: Optional[str] = None,
+    band: Optional[str] = None,
+    search: Optional[str] = None,
+    page_size: int = 25,
+    key: str = "case_table",
+) -> Optional[Dict[str, Any]]:
+    """
+    Render one page of cases and return the case whose "Open" was clicked.
+    """
+    s1, s2, s3 = st.columns([1.5, 1, 1])
+    sort_label = s1.selectbox("Sort by", list(SORT_OPTIONS), key=f"{key}_sort")
+    descending = s2.toggle("Descending", key=f"{key}_desc")
+    page_size = s3.selectbox(
+        "Rows per page",
+        PAGE_SIZES,
+        index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+        key=f"{key}_size",
+    )
+
+    # Any filter, sort or page-size change jumps back to the first page
+    state = st.session_state.setdefault(key, {"page": 0, "filters": None})
+    filters = (status, band, search, sort_label, descending, page_size)
+    if state["filters"] != filters:
+        state["filters"] = filters
+        state["page"] = 0
+
+    page = source.query(
+        status=status,
+        band=band,
+        search=search,
+        offset=state["page"] * page_size,
+        limit=page_size,
+        sort_by=SORT_OPTIONS[sort_label],
+        descending=descending,
+    )
+
+    # Clamp after the source reports the real total (e.g. rows closed elsewhere)
+    if state["page"] > 0 and page.offset >= page.total and not page.total_capped:
+        state["page"] = page.page_count - 1
+        st.rerun()
+
+    header_cols = st.columns(COLUMN_WIDTHS)
+    for col, title in zip(header_cols, ["ID", "CUSTOMER", "RISK SCORE", "RISK", "STATUS", "SLA (HRS)", "GEOGRAPHY", "ACTION"]):
+        col.markdown(f"**{title}**")
+
+    st.divider()
+
+    selected = None
+    for case in page.items:
+        if _render_row(case, key):
+            selected = case
+        st.divider()
+
+    if not page.items:
+        st.caption("No cases match the current filters.")
+
+    # ===============================
+    # PAGINATION CONTROLS
+    # ===============================
+    p1, p2, p3 = st.columns([1, 2, 1])
+    if p1.button("Previous", disabled=state["page"] == 0, key=f"{key}_prev", use_container_width=True):
+        state["page"] -= 1
+        st.rerun()
+    first = page.offset + 1 if page.total else 0
+    more = "+" if page.total_capped else ""
+    p2.markdown(
+        f"<div style='text-align:center; color:var(--text-secondary);'>"
+        f"Page {state['page'] + 1} of {page.page_count}{more} · {first}–{page.offset + len(page.items)} of {page.total}{more} cases"
+        f"</div>",
+        unsafe_allow_html=True
+    )
+    last_page = len(page.items) < page.limit if page.total_capped else state["page"] + 1 >= page.page_count
+    if p3.button("Next", disabled=last_page, key=f"{key}_next", use_container_width=True):
+        state["page"] += 1
+        st.rerun()
+
+    return selected
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.cases.demo import DEMO_CASES  # noqa: E402
+from backend.cases.repository import InMemoryCaseRepository  # noqa: E402
+from backend.cases.service import CaseService  # noqa: E402
+from backend.explainability.attributions import (  # noqa: E402
+    FEATURES,
+    AttributionStore,
+    InsufficientTrainingData,
+    RiskModel,
+    compute_store,
+    load_training_set,
+)
+from backend.explainability.trace import ExplainabilityEngine  # noqa: E402
+
+
+class CountingModel:
+    """Stands in for a trained RiskModel: SHAP value j is j + 1, negated on odd rows."""
+
+    version = "risk_model.joblib@test"
+
+    def __init__(self):
+        self.calls = 0
+
+    def explain(self, X, batch_size=4096):
+        self.calls += 1
+        weights = np.arange(1, X.shape[1] + 1, dtype=float)
+        return 50.0, np.array([weights * (-1) ** row for row in range(len(X))])
+
+
+def snapshot(case_id, risk_score=70.0, total=10000.0):
+    return {
+        "case": {"case_id": case_id, "risk_score": risk_score},
+        "exposure": {"total_amount": total, "transaction_count": 3},
+        "profile": {"tier": 2},
+        "flows": {},
+    }
+
+
+def test_top_k_stored_and_served_without_recomputation(tmp_path):
+    model = CountingModel()
+    store = compute_store([snapshot(1), snapshot(2)], model=model, k=3)
+    assert model.calls == 1
+    path = str(tmp_path / "attributions.json")
+    store.save(path)
+
+    service = CaseService(
+        InMemoryCaseRepository(DEMO_CASES),
+        explain_engine=ExplainabilityEngine(attributions=AttributionStore.load(path)),
+    )
+    for case_id in (1, 2, 1):
+        record = service.get_attributions(case_id)
+        assert [f["feature"] for f in record["top_features"]] == list(FEATURES[-1:-4:-1])
+        assert record["model_version"] == "risk_model.joblib@test"
+    assert service.get_attributions(1)["top_features"][0]["shap"] == len(FEATURES)
+    assert service.get_attributions(2)["top_features"][0]["shap"] == -len(FEATURES)
+    assert service.get_attributions(3) is None
+    assert model.calls == 1
+
+
+def test_training_needs_enough_labelled_history():
+    with pytest.raises(InsufficientTrainingData):
+        RiskModel.train(np.zeros((5, len(FEATURES))), np.zeros(5))
+
+
+def test_training_set_reads_labels(tmp_path):
+    path = tmp_path / "history.jsonl"
+    rows = [dict(snapshot(10), label=91.0), snapshot(11, risk_score=40.0), {"case": {"case_id": 12}}]
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    case_ids, X, y = load_training_set(str(path))
+    assert case_ids == [10, 11]
+    assert X.shape == (2, len(FEATURES))
+    assert y.tolist() == [91.0, 40.0]
@@ -0,0 +1,71 @@
+from backend.audit.chain import GENESIS_HASH, AuditChain, entry_hash
+
+
+class FakeAuditStore:
+    """The audit-chain subset of PostgresClient, chained like the trigger does."""
+
+    def __init__(self):
+        self.rows = []
+        self.checkpoints = []
+
+    def append(self, case_id, action, details):
+        prev = self.rows[-1]["entry_hash"] if self.rows else GENESIS_HASH
+        row = {
+            "id": len(self.rows) + 1,
+            "case_id": case_id,
+            "seq": len(self.rows) + 1,
+            "action": action,
+            "prev_hash": prev,
+            "details_text": details,
+            "created_at_text": f"2026-02-01T12:00:{len(self.rows):02d}.000000",
+        }
+        row["entry_hash"] = entry_hash(row)
+        self.rows.append(row)
+
+    def audit_entries(self, case_id, from_seq=1, to_seq=None):
+        return [dict(r) for r in self.rows if r["seq"] >= from_seq and (to_seq is None or r["seq"] <= to_seq)]
+
+    def audit_head(self, case_id):
+        last = self.rows[-1]
+        return {"case_id": case_id, "seq": last["seq"], "head_hash": last["entry_hash"]}
+
+    def audit_checkpoints(self, scope, scope_key):
+        return [cp for cp in self.checkpoints if (cp["scope"], cp["scope_key"]) == (scope, scope_key)]
+
+    def save_audit_checkpoint(self, checkpoint):
+        checkpoint = dict(checkpoint, id=len(self.checkpoints) + 1)
+        self.checkpoints.append(checkpoint)
+        return checkpoint["id"]
+
+
+def _sealed_store():
+    store = FakeAuditStore()
+    for i in range(4):
+        store.append(7, "UPDATED", f'{{"step": {i}}}')
+    AuditChain(store).checkpoint_case(7)
+    store.append(7, "SAR_DRAFTED", '{"draft_id": 1}')
+    return store
+
+
+def test_intact_chain_verifies_incrementally_and_fully():
+    store = _sealed_store()
+    chain = AuditChain(store)
+    assert chain.verify_case(7).ok
+    assert chain.verify_case(7, full=True).ok
+
+
+def test_edited_anchor_row_fails_incremental_verify():
+    store = _sealed_store()
+    # Rewrite the sealed head's content but keep its stored hash
+    store.rows[3]["details_text"] = '{"step": "forged"}'
+    result = AuditChain(store).verify_case(7)
+    assert not result.ok
+    assert result.first_bad_ref == 4
+
+
+def test_edited_tail_row_fails_verify():
+    store = _sealed_store()
+    store.rows[4]["action"] = "CLOSED_FALSE_POSITIVE"
+    result = AuditChain(store).verify_case(7)
+    assert not result.ok
+    assert result.reason == "entry modified"
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from backend.cases.demo import DEMO_CASES
+from backend.cases.repository import InMemoryCaseRepository
+from backend.cases.service import CaseService
+from backend.reports.bundle import export_bundle, iter_submissions
+
+
+def make_service():
+    repo = InMemoryCaseRepository(DEMO_CASES)
+    for case_id in (1, 2):
+        repo.save_draft(case_id, f"1. SITUATION\nDraft narrative for case {case_id}.\n", "mock-sar")
+    return CaseService(repo)
+
+
+def test_missing_and_undrafted_cases_are_manifest_errors(tmp_path):
+    service = make_service()
+    payloads = list(iter_submissions(service, case_ids=[999, 3]))
+    assert [(p["case_id"], "error" in p) for p in payloads] == [(999, True), (3, True)]
+    assert "not found" in payloads[0]["error"]
+
+    manifest = export_bundle(iter(payloads), str(tmp_path / "sars.zip"), workers=1)
+    assert manifest["files"] == []
+    assert [e["case_id"] for e in manifest["errors"]] == [3, 999]
+    with zipfile.ZipFile(tmp_path / "sars.zip") as bundle:
+        assert bundle.namelist() == ["manifest.json"]
+
+
+@pytest.mark.parametrize("name", ["sars.zip", "sars.tar.gz"])
+def test_bundle_entries_match_manifest(tmp_path, name):
+    pytest.importorskip("reportlab")
+    service = make_service()
+    out = str(tmp_path / name)
+    manifest = export_bundle(iter_submissions(service, case_ids=[1, 2, 404]), out, workers=2, max_in_flight=1)
+
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(out) as bundle:
+            entries = {n: bundle.read(n) for n in bundle.namelist()}
+    else:
+        with tarfile.open(out) as bundle:
+            entries = {m.name: bundle.extractfile(m).read() for m in bundle.getmembers()}
+
+    assert sorted(entries) == ["SAR_Case_1.pdf", "SAR_Case_2.pdf", "manifest.json"]
+    assert json.loads(entries["manifest.json"]) == manifest
+    assert [f["case_id"] for f in manifest["files"]] == [1, 2]
+    for f in manifest["files"]:
+        assert entries[f["name"]].startswith(b"%PDF")
+        assert hashlib.sha256(entries[f["name"]]).hexdigest() == f["sha256"]
+    assert [e["case_id"] for e in manifest["errors"]] == [404]
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from backend.cases.context import CaseContextBuilder, ContextSource, demo_sources, exposure_from_transactions
+from backend.cases.demo import DEMO_CASES
+from backend.cases.repository import InMemoryCaseRepository
+from backend.cases.service import CaseService
+
+
+def counting_builder():
+    calls = []
+
+    def summary(case, deps):
+        calls.append(case["version"])
+        return {"risk_score": case["risk_score"]}
+
+    return CaseContextBuilder([ContextSource("summary", summary, ttl_seconds=3600)]), calls
+
+
+def test_source_is_memoized_per_version():
+    builder, calls = counting_builder()
+    case = {"case_id": 1, "version": 1, "risk_score": 50.0}
+    assert builder.load(case, "summary") == {"summary": {"risk_score": 50.0}}
+    builder.load(case, "summary")
+    assert calls == [1]
+
+    edited = dict(case, version=2, risk_score=90.0)
+    assert builder.load(edited, "summary") == {"summary": {"risk_score": 90.0}}
+    assert calls == [1, 2]
+
+
+def test_service_update_invalidates_context():
+    builder, calls = counting_builder()
+    service = CaseService(InMemoryCaseRepository(DEMO_CASES), context_builder=builder)
+    service.build_context(1)
+    service.update(1, {"risk_score": 12.0})
+    assert builder.usage()["entries"] == 0
+    assert service.build_context(1).data["summary"] == {"risk_score": 12.0}
+    assert len(calls) == 2
+
+
+def test_demo_exposure_summarises_the_ledger():
+    builder = CaseContextBuilder(demo_sources())
+    case = next(c for c in DEMO_CASES if c["customer_id"] == "CUST-001")
+    assert builder.load(case, "exposure")["exposure"] == {
+        "transaction_count": 4,
+        "total_amount": 270000,
+        "highest_single_transfer": 125000,
+        "offshore_jurisdictions": 3,
+        "sub_threshold_count": 0,
+        "flagged_count": 1,
+        "monitoring_window_days": 7,
+    }
+
+
+def test_exposure_counts_flags_and_structuring_band():
+    as_of = datetime(2026, 2, 1)
+    txs = [
+        {"source": "C", "target": "X", "amount": amount, "timestamp": as_of + timedelta(days=day), "country": country, "flagged": flagged}
+        for amount, day, country, flagged in [(9500, 0, "US", True), (10000, 2, "MX", False), (8999, 2, "US", True)]
+    ]
+    exposure = exposure_from_transactions({}, {"transactions": txs, "profile": {"home_country": "US"}})
+    assert exposure["flagged_count"] == 2
+    assert exposure["sub_threshold_count"] == 1
+    assert exposure["offshore_jurisdictions"] == 1
+    assert exposure["monitoring_window_days"] == 3
+    assert exposure_from_transactions({}, {"transactions": [], "profile": {}})["flagged_count"] == 0
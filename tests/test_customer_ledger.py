@@ -0,0 +1,60 @@
+"""
+Customer ledger against a real Postgres (SAR_TEST_POSTGRES_URL): the
+customer_360 trigger must agree with exposure_from_transactions, which
+local mode computes from the same rows.
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("psycopg2")
+if not os.getenv("SAR_TEST_POSTGRES_URL"):
+    pytest.skip("SAR_TEST_POSTGRES_URL is not set", allow_module_level=True)
+
+from backend.cases.context import exposure_from_transactions  # noqa: E402
+from backend.db.postgres import PostgresClient  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client():
+    client = PostgresClient(os.environ["SAR_TEST_POSTGRES_URL"])
+    client.init_tables()
+    return client
+
+
+def ledger(customer_id):
+    as_of = datetime(2026, 2, 1, 12)
+    rows = [(45000, -7, "SG", False), (9500, -5, "HK", True), (125000, -3, "VG", True), (9900, -1, "SG", False)]
+    return [
+        {"tx_id": f"{customer_id}-{i}", "source": customer_id, "target": f"BENEF-{i}", "amount": amount,
+         "timestamp": as_of + timedelta(days=day), "country": country, "channel": "wire", "flagged": flagged}
+        for i, (amount, day, country, flagged) in enumerate(rows)
+    ]
+
+
+def test_customer_360_matches_local_exposure(client):
+    customer_id = f"TEST-{uuid.uuid4().hex[:12]}"
+    segment = client.upsert_customer({"customer_id": customer_id, "region": "APAC", "tier": 3, "home_country": "SG"})
+    assert segment == {"region": "APAC", "tier": 3}
+    txs = ledger(customer_id)
+    assert len(client.insert_transactions(customer_id, txs)) == 4
+    assert client.insert_transactions(customer_id, txs) == []  # replay is not double counted
+
+    case_id = client.create_case(customer_id=customer_id, risk_score=88.0, status="NEW")
+    detail = client.case_detail(case_id)
+    expected = exposure_from_transactions({"customer_id": customer_id}, {"transactions": txs, "profile": {"home_country": "SG"}})
+    assert {k: float(v) for k, v in detail["exposure"].items()} == {k: float(v) for k, v in expected.items()}
+
+    stored = client.customer_exposure(customer_id)
+    assert stored["flagged_count"] == 2 and float(stored["total_amount"]) == 189400
+
+    # Deletes recompute the summary (MAX cannot be decremented)
+    with client.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM transactions WHERE tx_id = %s;", (f"{customer_id}-2",))
+        conn.commit()
+    stored = client.customer_exposure(customer_id)
+    assert (stored["transaction_count"], stored["flagged_count"], float(stored["highest_single_transfer"])) == (3, 1, 45000)
@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from backend.cases.dedup import AlertIndex, fingerprint, similarity  # noqa: E402
+from backend.cases.demo import DEMO_CASES  # noqa: E402
+from backend.cases.repository import InMemoryCaseRepository  # noqa: E402
+from backend.cases.service import CaseService  # noqa: E402
+from backend.cases.state import CLOSED_FALSE_POSITIVE  # noqa: E402
+
+STRUCTURING = {
+    "alert_reason": "Structuring detected below reporting threshold.",
+    "transaction_summary": "Frequent cash deposits slightly below compliance threshold.",
+}
+
+
+def alert(customer_id, risk_score=70.0, amounts=(9500, 9600, 9800), linked=(), **fields):
+    return dict(
+        STRUCTURING,
+        customer_id=customer_id,
+        customer_name=customer_id,
+        risk_score=risk_score,
+        linked_accounts=list(linked),
+        transactions=[{"source": "CASH", "target": customer_id, "amount": a, "channel": "cash"} for a in amounts],
+        **fields,
+    )
+
+
+def make_service():
+    return CaseService(InMemoryCaseRepository(DEMO_CASES))
+
+
+def test_second_alert_for_customer_merges_into_open_case():
+    service = make_service()
+    first = service.ingest_alert(alert("CUST-900"))
+    assert first["outcome"] in ("created", "clustered")
+    second = service.ingest_alert(alert("CUST-900", risk_score=88.0))
+    assert second["outcome"] == "merged"
+    assert second["case"]["case_id"] == first["case"]["case_id"]
+    assert second["case"]["risk_score"] == 88.0
+
+
+def test_linked_account_alert_merges():
+    service = make_service()
+    first = service.ingest_alert(alert("CUST-901", linked=["CUST-901-B"]))
+    second = service.ingest_alert(alert("CUST-901-B", amounts=(9400,)))
+    assert second["outcome"] == "merged"
+    assert second["case"]["case_id"] == first["case"]["case_id"]
+
+
+def test_alert_after_close_opens_new_case():
+    service = make_service()
+    first = service.ingest_alert(alert("CUST-902"))
+    service.transition(first["case"]["case_id"], CLOSED_FALSE_POSITIVE)
+    again = service.ingest_alert(alert("CUST-902"))
+    assert again["outcome"] != "merged"
+    assert again["case"]["case_id"] != first["case"]["case_id"]
+
+
+def test_case_filed_outside_the_index_is_matched():
+    # Another process filed the case: it is in the store but not in this index
+    service = make_service()
+    service.alert_index.get()
+    case_id = service.repository.add(dict(alert("CUST-903"), status="NEW"))
+    assert case_id not in service.alert_index.get()
+    merged = service.ingest_alert(alert("CUST-903"))
+    assert merged["outcome"] == "merged"
+    assert merged["case"]["case_id"] == case_id
+
+
+def test_merge_folds_alert_into_fingerprint():
+    index = AlertIndex()
+    base = fingerprint(alert("CUST-904"), (), alert("CUST-904")["transactions"])
+    index.add(1, base)
+    extra = alert("CUST-904", amounts=(250000,))
+    extra_fp = fingerprint(extra, ["CUST-904-OFF"], extra["transactions"])
+    index.fold(1, extra_fp)
+    folded = index._cases[1]
+    assert "CUST-904-OFF" in folded.accounts
+    assert similarity(folded.signature, extra_fp.signature) > similarity(base.signature, extra_fp.signature)
+    assert index.match(fingerprint(alert("CUST-904-OFF"), (), ())).case_id == 1
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from backend.llm.endpoints import EndpointPool
+
+
+def make_pool(release):
+    pool = EndpointPool(["http://ollama-0:11434", "http://ollama-1:11434"], model="llama3")
+    loads = []
+    for endpoint in pool.endpoints:
+        endpoint.loaded_models = lambda: []
+
+        def load(model, keep_alive, timeout, endpoint=endpoint):
+            loads.append(endpoint.url)
+            release.wait(5)
+            endpoint.loaded = True
+            return 0.1
+
+        endpoint.load = load
+    return pool, loads
+
+
+def test_health_check_does_not_wait_for_model_loads():
+    release = threading.Event()
+    pool, loads = make_pool(release)
+    started = time.perf_counter()
+    stats = pool.check_health()
+    assert time.perf_counter() - started < 1.0
+    assert all(s["healthy"] for s in stats)
+
+    # A second pass while the loads are running does not start more of them
+    pool.check_health()
+    deadline = time.monotonic() + 2
+    while len(loads) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(loads) == [ep.url for ep in pool.endpoints]
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while pool._warming and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not pool._warming
+    assert all(ep.loaded for ep in pool.endpoints)
+
+
+def test_unreachable_instance_is_marked_failed():
+    pool, _ = make_pool(threading.Event())
+
+    def refuse():
+        raise ConnectionRefusedError("refused")
+
+    pool.endpoints[0].loaded_models = refuse
+    pool.keep_warm = False
+    stats = pool.check_health()
+    assert [s["healthy"] for s in stats] == [False, True]
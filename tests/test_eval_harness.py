@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from backend.eval.harness import compare_runs, score_facts, summarize
+
+SAR_INPUT = SimpleNamespace(
+    customer_profile={"customer_id": "C1", "risk_score": 87.0},
+    transaction_summary={
+        "exposure": {"total_amount": 28700.0, "highest_single_transfer": 9800.0},
+        "timeline": [{"amount": 9500.0}, {"amount": 9400.0}, {"amount": 9800.0}],
+    },
+    alert_reason="Structuring",
+)
+
+
+def test_complete_narrative_scores_full_marks():
+    text = ("The customer has a risk score of 87. Deposits of $9,500, $9,400 and $9,800 "
+            "totalled $28,700.00; the largest was $9,800.")
+    scores = score_facts(text, SAR_INPUT)
+    assert scores["factual_consistency"] == 1.0
+    assert scores["amount_coverage"] == 1.0
+    assert scores["facts_missing"] == []
+
+
+def test_missing_and_wrong_facts_lower_the_score():
+    text = "The customer has a risk score of 78. Deposits totalled $28,700."
+    scores = score_facts(text, SAR_INPUT)
+    assert scores["facts_missing"] == ["highest_single_transfer", "risk_score"]
+    assert abs(scores["factual_consistency"] - 1 / 3) < 1e-9
+    assert scores["amount_coverage"] == 0.0
+
+
+def _run(run_id, results):
+    return {"run_id": run_id, "summary": summarize(results, wall_s=1.0)}, results
+
+
+def test_compare_flags_new_errors():
+    row = {"fixture_id": "f1", "section_completeness": 1.0, "factual_consistency": 1.0, "amount_coverage": 1.0,
+           "forbidden_per_1k_words": 0.0, "words": 100, "retries": 0, "latency_s": 1.0, "tokens_per_s": 100.0}
+    a = _run("a", [row, dict(row, fixture_id="f2")])
+    b = _run("b", [row, {"fixture_id": "f2", "error": "TimeoutError: slow", "latency_s": 30.0}])
+    report = compare_runs(a, b)
+    assert "errors" in report["regressions"]
+    assert "error_rate" in report["regressions"]
+    assert report["fixtures_worse"] == [{"fixture_id": "f2", "drops": {}, "error": "TimeoutError: slow"}]
+    assert compare_runs(a, a)["regressions"] == []
@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.rag.exemplars import ExemplarIndex, _select_diverse  # noqa: E402
+
+
+def sar(case_id, body, typology="structuring", risk_band="High"):
+    return {
+        "case_id": case_id, "typology": typology, "risk_band": risk_band,
+        "narrative": f"SITUATION\n{body}\n\nASSESSMENT\nActivity is consistent with {typology}.",
+    }
+
+
+def test_selection_masks_chosen_rows():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    assert _select_diverse(vectors, 2) == [0, 3]
+    # Identical rows are never picked twice, even with room left
+    assert _select_diverse(vectors, 4) == [0, 3]
+    assert _select_diverse(vectors[:0], 4) == []
+
+
+def test_selection_keeps_the_spread():
+    angles = np.linspace(0, np.pi / 2, 7)
+    vectors = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    chosen = _select_diverse(vectors, 3)
+    assert chosen == [0, 6, 3]
+
+
+def test_bucket_drops_duplicate_exemplars_and_retrieval_is_unique():
+    sars = [sar(i, "Cash deposits of 9,500 across branches on consecutive days.") for i in range(5)]
+    sars.append(sar(9, "Wire transfers routed through shell companies in three jurisdictions."))
+    index = ExemplarIndex.build(sars, per_bucket=4)
+    _, exemplars = index.buckets[("structuring", "High")]
+    assert sorted(e.case_id for e in exemplars) == [0, 9]
+
+    results = index.retrieve("structuring", "High", "cash deposits below the threshold", k=2, token_budget=10_000)
+    assert len(results) == 2 and len(set(results)) == 2
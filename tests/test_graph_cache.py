@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from backend.graph.transactions import GraphTraceCache, TransactionGraph, Transfer
+from backend.memory import MemoryBudget
+
+T0 = datetime(2026, 2, 1, 9, 0)
+
+
+def chain(amounts, start=T0):
+    accounts = ["A", "B", "C", "D", "E"]
+    return [
+        Transfer(accounts[i], accounts[i + 1], amount, start + timedelta(hours=i), f"tx{i}")
+        for i, amount in enumerate(amounts)
+    ]
+
+
+def test_fingerprint_sees_edits_that_keep_count_and_latest_timestamp():
+    base = chain([100.0, 90.0, 80.0])
+    edited = [base[0], Transfer("B", "X", 90.0, base[1].timestamp, "tx1"), base[2]]
+    assert TransactionGraph(base).fingerprint != TransactionGraph(edited).fingerprint
+    assert TransactionGraph(base).fingerprint == TransactionGraph(list(reversed(base))).fingerprint
+
+
+def test_cache_key_includes_search_parameters():
+    cache = GraphTraceCache()
+    graph = TransactionGraph(chain([100.0, 90.0, 80.0, 70.0]))
+    deep = cache.analyze_case(1, "A", graph, max_depth=4)
+    shallow = cache.analyze_case(1, "A", graph, max_depth=2)
+    assert max(p.hops for p in deep.paths) == 4
+    assert max(p.hops for p in shallow.paths) == 2
+    narrow = cache.analyze_case(1, "A", graph, max_depth=4, window=timedelta(hours=1))
+    assert max(p.hops for p in narrow.paths) < 4
+    assert cache.analyze_case(1, "A", graph, max_depth=4, window=timedelta(hours=1)) is narrow
+    assert cache.stats["hits"] == 1
+
+
+def test_cache_is_bounded_and_sheds_under_budget(tmp_path):
+    cache = GraphTraceCache(max_entries=2)
+    graph = TransactionGraph(chain([100.0, 90.0]))
+    for case_id in range(3):
+        cache.analyze_case(case_id, "A", graph)
+    assert cache.get(0) is None and cache.usage()["entries"] == 2
+
+    budget = MemoryBudget(1, spill_dir=str(tmp_path))
+    cache.register(budget)
+    cache.register(budget)
+    cache.analyze_case(9, "A", graph)
+    assert cache.memory_usage() == 0
+    assert budget.usage()["stores"]["flow_cache"]["evictions"] >= 2
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from backend.llm.guardrails import NarrativeGuard, check_narrative
+from backend.llm.sections import SAR_SECTIONS
+
+SAR_INPUT = SimpleNamespace(
+    customer_profile={"customer_id": "CUST-001", "risk_score": 87.5, "declared_annual_income": 180000},
+    transaction_summary={"total_amount": 1_234_567, "highest_single_transfer": 125000, "transaction_count": 4},
+    alert_reason="Four wires of up to 125,000 to offshore beneficiaries.",
+)
+
+
+def narrative(**bodies):
+    return "".join(
+        f"{i}. {title}\n{bodies.get(title, f'Observed activity for {title.lower()}.')}\n\n"
+        for i, title in enumerate(SAR_SECTIONS, start=1)
+    )
+
+
+def kinds(violations):
+    return [v.kind for v in violations]
+
+
+def test_clean_narrative_has_no_violations():
+    text = narrative(**{
+        "TRANSACTION ANALYSIS": "The customer sent $1.2 million in total, including a single wire of $125,000.",
+        "ASSESSMENT": "The customer's risk score of 87.5 reflects activity above the $10,000 reporting threshold.",
+    })
+    assert check_narrative(text, SAR_INPUT) == []
+
+
+def test_accusatory_phrasing_is_flagged_per_rule():
+    for line, rule in [
+        ("The customer is clearly guilty of structuring.", "guilt"),
+        ("The subject was a money launderer.", "criminal_label"),
+        ("The customer committed money laundering.", "committed_offence"),
+        ("Funds were definitely laundered through shells.", "certainty"),
+        ("The account holder was evading reporting.", "direct_charge"),
+    ]:
+        found = check_narrative(narrative(ASSESSMENT=line), SAR_INPUT)
+        assert kinds(found) == ["accusatory"], line
+        assert found[0].section == "ASSESSMENT" and rule in found[0].message
+
+
+def test_risk_score_must_match_profile():
+    found = check_narrative(narrative(ASSESSMENT="Risk score: 92 was assigned."), SAR_INPUT)
+    assert kinds(found) == ["risk_score"]
+    # Quoting fewer decimals is fine as long as it rounds to the profile score
+    assert check_narrative(narrative(ASSESSMENT="A risk score of 87.5 was assigned."), SAR_INPUT) == []
+
+
+def test_amounts_with_scale_words():
+    ok = "Transfers totalled $1.2 million (USD 1,234,567), with a high of $125k."
+    assert check_narrative(narrative(**{"TRANSACTION ANALYSIS": ok}), SAR_INPUT) == []
+
+    for wrong in ("Transfers totalled $1.5 million.", "Transfers totalled $1,243,567.", "A wire of $12k was sent."):
+        found = check_narrative(narrative(**{"TRANSACTION ANALYSIS": wrong}), SAR_INPUT)
+        assert kinds(found) == ["amount"], wrong
+        assert found[0].section == "TRANSACTION ANALYSIS"
+
+
+def test_missing_and_empty_sections():
+    text = narrative(ASSESSMENT="").replace("6. RECOMMENDATION\nObserved activity for recommendation.\n\n", "")
+    found = check_narrative(text, SAR_INPUT)
+    assert sorted((v.kind, v.section) for v in found) == [
+        ("empty_section", "ASSESSMENT"), ("missing_section", "RECOMMENDATION"),
+    ]
+
+
+def test_guard_scans_complete_lines_only():
+    guard = NarrativeGuard(SAR_INPUT)
+    assert guard.feed("1. SITUATION\nThe customer was a fraud") == []
+    assert kinds(guard.feed("ster.\n")) == ["accusatory"]
+    assert guard.feed("The wire of $999") == []
+    assert kinds(guard.flush()) == ["amount"]
+
+
+def test_rewind_after_aborted_section():
+    guard = NarrativeGuard(SAR_INPUT)
+    guard.feed("1. SITUATION\nAlerted on offshore wires.\n2. CUSTOMER PROFILE ANALYSIS\nIncome of $180,000.\n")
+    bad = guard.feed("3. TRANSACTION ANALYSIS\nThe customer is guilty.\n")
+    assert [(v.kind, v.section) for v in bad] == [("accusatory", "TRANSACTION ANALYSIS")]
+
+    kept = guard.rewind("TRANSACTION ANALYSIS")
+    assert kept.endswith("Income of $180,000.\n") and "guilty" not in kept
+    assert guard.current == "CUSTOMER PROFILE ANALYSIS"
+    assert "TRANSACTION ANALYSIS" in guard.missing()
+
+    assert guard.feed("3. TRANSACTION ANALYSIS\nFour wires totalling $1.2 million.\n") == []
+    assert guard.starts["TRANSACTION ANALYSIS"] == 4
+    assert guard.flush() == []
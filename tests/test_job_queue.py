@@ -0,0 +1,57 @@
+from backend.jobs.queue import DONE, FAILED, QUEUED, RUNNING, SQLiteJobQueue
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), **kwargs)
+    queue.init_table()
+    return queue
+
+
+def test_enqueue_reuses_active_job(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.enqueue(1, {"actor": "a"})
+    assert queue.enqueue(1, {"actor": "b"}).job_id == first.job_id
+    assert queue.enqueue(2, {}).job_id != first.job_id
+
+
+def test_stale_worker_cannot_overwrite_reclaimed_job(tmp_path):
+    # A negative lease expires immediately, as if the first worker hung
+    queue = make_queue(tmp_path, lease_seconds=-1)
+    job = queue.enqueue(1, {})
+    assert queue.claim("w1").job_id == job.job_id
+    assert queue.claim("w2").job_id == job.job_id
+
+    assert not queue.complete(job.job_id, "w1", {"draft_id": 1})
+    assert not queue.fail(job.job_id, "w1", "boom")
+    assert queue.get(job.job_id).status == RUNNING
+
+    assert queue.complete(job.job_id, "w2", {"draft_id": 2})
+    done = queue.get(job.job_id)
+    assert done.status == DONE and done.result == {"draft_id": 2}
+    # A finished job cannot be failed afterwards, even by its owner
+    assert not queue.fail(job.job_id, "w2", "late")
+
+
+def test_fail_requeues_until_attempts_run_out(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job = queue.enqueue(1, {})
+    queue.claim("w1")
+    assert queue.fail(job.job_id, "w1", "transient")
+    assert queue.get(job.job_id).status == QUEUED
+    queue.claim("w1")
+    assert queue.fail(job.job_id, "w1", "transient")
+    assert queue.get(job.job_id).status == FAILED
+
+
+def test_abandon_active_unblocks_enqueue(tmp_path):
+    queue = make_queue(tmp_path)
+    running = queue.enqueue(1, {})
+    queue.claim("old-process")
+    queued = queue.enqueue(2, {})
+
+    restarted = make_queue(tmp_path)
+    assert restarted.abandon_active("reset") == 2
+    assert restarted.get(running.job_id).status == FAILED
+    assert restarted.get(queued.job_id).status == FAILED
+    assert restarted.claim("new-process") is None
+    assert restarted.enqueue(1, {}).job_id != running.job_id
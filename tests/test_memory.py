@@ -0,0 +1,36 @@
+import os
+
+from backend.memory import MemoryBudget, SpillableStore
+
+
+def narrative(i):
+    return f"SAR draft {i}: " + "wire transfer to offshore beneficiary " * 40
+
+
+def test_spilled_entries_reload_unchanged(tmp_path):
+    budget = MemoryBudget(16 << 10, spill_dir=str(tmp_path))
+    store = SpillableStore("drafts", budget)
+    values = {i: {"case_id": i, "narrative": narrative(i)} for i in range(40)}
+    for key, value in values.items():
+        store.put(key, value)
+
+    usage = store.usage()
+    assert usage["spilled_entries"] > 0
+    assert store.memory_usage() <= budget.limit_bytes
+    assert os.listdir(tmp_path)
+
+    assert all(store.get(key) == value for key, value in values.items())
+    assert store.stats["reloads"] > 0
+    assert store.pop(0) == values[0] and 0 not in store
+    assert store.get(0, "gone") == "gone"
+    assert len(store) == len(values) - 1
+
+
+def test_dropped_store_evicts_without_spilling(tmp_path):
+    budget = MemoryBudget(16 << 10, spill_dir=str(tmp_path))
+    store = SpillableStore("context", budget, spill=False)
+    for i in range(40):
+        store.put(i, narrative(i))
+    assert store.stats["evictions"] > 0 and store.stats["spills"] == 0
+    assert store.get(0) is None
+    assert store.get(39) == narrative(39)
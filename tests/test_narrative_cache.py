@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from backend.llm.cache import SARNarrativeCache  # noqa: E402
+
+
+def sar_input(customer_id, amount=9500):
+    return {
+        "customer_profile": {"customer_id": customer_id, "region": "North", "tier": 2},
+        "transaction_summary": {"total_amount": amount, "transactions": 12},
+        "alert_reason": "Structuring detected below reporting threshold.",
+    }
+
+
+def test_exact_entry_under_other_tag_is_not_a_hit():
+    cache = SARNarrativeCache(max_entries=16)
+    cache.store(sar_input("C1"), "old template narrative", "llama3/fincen@v1")
+    assert cache.lookup(sar_input("C1"), allow_semantic=False, model_name="llama3/fincen@v2") is None
+    assert cache.stats["exact_hits"] == 0
+    assert cache.stats["misses"] == 1
+
+
+def test_falls_back_to_same_tag_semantic_entry():
+    cache = SARNarrativeCache(max_entries=16, similarity_threshold=0.8)
+    cache.store(sar_input("C1"), "v1 narrative", "llama3/fincen@v1")
+    cache.store(sar_input("C2"), "v2 narrative", "llama3/fincen@v2")
+    hit = cache.lookup(sar_input("C1"), model_name="llama3/fincen@v2")
+    assert hit is not None and hit.kind == "semantic"
+    assert hit.entry.narrative == "v2 narrative"
+    assert cache.stats == {"exact_hits": 0, "semantic_hits": 1, "misses": 0, "evictions": 0}
+
+
+def test_exact_hit_under_same_tag():
+    cache = SARNarrativeCache(max_entries=16)
+    cache.store(sar_input("C1"), "narrative", "llama3/fincen@v1")
+    hit = cache.lookup(sar_input("C1"), model_name="llama3/fincen@v1")
+    assert hit.kind == "exact" and cache.stats["exact_hits"] == 1
+
+
+def test_index_matrix_counts_towards_the_budget(tmp_path):
+    from backend.memory import MemoryBudget
+
+    budget = MemoryBudget(0, spill_dir=str(tmp_path))  # 0: track only, never shed
+    cache = SARNarrativeCache(max_entries=1000, budget=budget)
+    empty = cache.memory_usage()
+    assert empty == cache._vectors.nbytes > 0
+    for i in range(200):
+        cache.store(sar_input(f"C{i}", amount=9000 + i), f"narrative {i}", "m")
+    assert len(cache._vectors) == 256
+    assert budget.used_bytes() == cache.memory_usage() > cache._vectors.nbytes > empty
+
+    freed = cache.shed(cache.memory_usage() // 2)
+    assert freed > 0 and len(cache._vectors) < 256
+    assert cache.stats["evictions"] == 200 - len(cache)
+    # Entries kept across compaction are still found
+    for i in range(200 - len(cache), 200):
+        assert cache.lookup(sar_input(f"C{i}", amount=9000 + i), allow_semantic=False).entry.narrative == f"narrative {i}"
+
+
+def test_evictions_on_store_are_counted():
+    cache = SARNarrativeCache(max_entries=4)
+    for i in range(6):
+        cache.store(sar_input(f"C{i}", amount=9000 + i), f"narrative {i}", "m")
+    assert len(cache) == 4 and cache.stats["evictions"] == 2
+    assert cache.lookup(sar_input("C0", amount=9000), allow_semantic=False) is None
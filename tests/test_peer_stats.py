@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from backend.cases.demo import DEMO_CASES  # noqa: E402
+from backend.cases.repository import InMemoryCaseRepository  # noqa: E402
+from backend.cases.service import CaseService  # noqa: E402
+from backend.stats.peers import ALL, PeerStatsService, demo_peer_stats  # noqa: E402
+
+PROFILE = {"region": "North", "tier": 2, "customer_type": "individual"}
+
+
+def peer_count(stats, metric="total_amount", segment=(ALL, ALL, ALL)):
+    dist = stats._dists.get((segment, metric))
+    return dist.moments.n if dist else 0
+
+
+def alert(customer_id, amounts, risk_score=60.0):
+    return dict(
+        PROFILE, customer_id=customer_id, customer_name="New", risk_score=risk_score,
+        alert_reason="Cross-border wire spike.", transaction_summary="Wires abroad.",
+        transactions=[{"source": customer_id, "target": "OFF-1", "amount": a, "channel": "wire"} for a in amounts],
+    )
+
+
+def test_flush_merges_each_process_once(tmp_path):
+    path = str(tmp_path / "peers.json")
+    a, b = PeerStatsService(), PeerStatsService()
+    for total in (100, 200, 300):
+        a.observe_customer(PROFILE, {"total_amount": total, "risk_score": 50})
+    b.observe_customer(PROFILE, {"total_amount": 400, "risk_score": 70})
+
+    assert a.flush(path) and b.flush(path)
+    assert not a.flush(path)  # nothing new since the last flush
+    stored = PeerStatsService.load(path)
+    assert peer_count(stored) == 4
+    assert stored.compare(PROFILE, "total_amount", 250)["peer_count"] == 4
+
+
+def test_synthetic_population_is_not_persisted(tmp_path):
+    stats = demo_peer_stats({"C1": dict(PROFILE, declared_annual_income=60000)}, peers_per_segment=10)
+    assert not stats.flush(str(tmp_path / "peers.json"))
+
+
+def test_intake_updates_customer_percentiles(tmp_path):
+    stats = PeerStatsService(min_peers=1)
+    stats.observe_customer(PROFILE, {"total_amount": 1000.0, "risk_score": 40.0})
+    path = str(tmp_path / "peers.json")
+    service = CaseService(InMemoryCaseRepository(DEMO_CASES), peer_stats=stats, peer_stats_path=path)
+    before = stats.percentile(PROFILE, "total_amount", 5000.0)
+
+    service.ingest_alert(alert("CUST-950", (5000, 7000)))
+    assert stats.percentile(PROFILE, "total_amount", 5000.0) < before
+    assert peer_count(stats, "highest_single_transfer", ("North", "2", "individual")) == 1
+    assert stats.compare(PROFILE, "risk_score", 60.0)["peer_count"] == 2
+
+    # A replayed alert adds nothing; new transactions add the refreshed totals
+    service.ingest_alert(alert("CUST-950", (5000, 7000)))
+    assert peer_count(stats) == 2
+    service.ingest_alert(alert("CUST-950", (9000,), risk_score=70.0))
+    assert peer_count(stats) == 3
+    assert stats._dists[((ALL, ALL, ALL), "total_amount")].sketch.quantile(1.0) == 21000.0
+
+    service.flush_peer_stats()
+    assert peer_count(PeerStatsService.load(path)) == 3
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from types import SimpleNamespace  # noqa: E402
+
+from backend.llm.endpoints import EndpointPool  # noqa: E402
+from backend.llm.pooled import PooledChatOllama  # noqa: E402
+
+
+class FakeClient:
+    def __init__(self, error=None, chunks=("ok",)):
+        self.error = error
+        self.chunks = chunks
+        self.calls = 0
+
+    def stream(self, messages, stop=None, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        for text in self.chunks:
+            yield SimpleNamespace(content=text)
+
+
+def make_pool(*clients):
+    pool = EndpointPool([f"http://ollama-{i}:11434" for i in range(len(clients))])
+    for endpoint, client in zip(pool.endpoints, clients):
+        endpoint.chat_model = lambda *args, client=client, **kwargs: client
+    return pool
+
+
+def run(pool):
+    model = PooledChatOllama(pool=pool)
+    return "".join(chunk.message.content for chunk in model._stream([]))
+
+
+def test_unreachable_instance_fails_over():
+    down, up = FakeClient(error=ConnectionRefusedError("refused")), FakeClient(chunks=("SAR ", "draft"))
+    pool = make_pool(down, up)
+    assert run(pool) == "SAR draft"
+    assert not pool.endpoints[0].healthy and pool.endpoints[0].failures == 1
+    assert pool.endpoints[1].healthy
+
+
+def test_client_error_keeps_instance_healthy():
+    bad, other = FakeClient(error=ValueError("model 'llama3' not found")), FakeClient()
+    pool = make_pool(bad, other)
+    with pytest.raises(ValueError):
+        run(pool)
+    assert all(ep.healthy and ep.failures == 0 for ep in pool.endpoints)
+    assert other.calls == 0
@@ -0,0 +1,22 @@
+import threading
+import time
+
+from backend.jobs.prefetch import ForegroundGate, SARPrefetcher
+
+
+def test_gate_waits_out_grace_after_startup():
+    gate = ForegroundGate()
+    stop = threading.Event()
+    started = time.monotonic()
+    assert gate.wait_idle(0.3, stop)
+    assert time.monotonic() - started >= 0.25
+
+
+def test_first_pass_waits_for_start_delay():
+    prefetcher = SARPrefetcher(service=None, start_delay=5.0)
+    passes = []
+    prefetcher.run_once = lambda: passes.append(time.monotonic()) or 0
+    prefetcher.start()
+    time.sleep(0.2)
+    prefetcher.stop()
+    assert passes == []
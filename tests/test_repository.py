@@ -0,0 +1,45 @@
+import pytest
+
+from backend.cases.demo import DEMO_CASES
+from backend.cases.repository import InMemoryCaseRepository
+from backend.cases.state import InvalidTransition
+
+
+def test_page_past_the_end_still_reports_total():
+    repo = InMemoryCaseRepository(DEMO_CASES)
+    page = repo.query(offset=100, limit=2)
+    assert page.items == []
+    assert page.total == len(DEMO_CASES)
+    assert page.offset >= page.total
+
+
+def test_filters_and_pagination():
+    repo = InMemoryCaseRepository(DEMO_CASES)
+    high = [c for c in DEMO_CASES if c["risk_score"] >= 80]
+    page = repo.query(band="High", limit=1, sort_by="risk_score", descending=True)
+    assert page.total == len(high)
+    assert page.items[0]["risk_score"] == max(c["risk_score"] for c in high)
+
+
+def test_add_assigns_ids_after_explicit_ones():
+    repo = InMemoryCaseRepository(DEMO_CASES)
+    top = max(c["case_id"] for c in DEMO_CASES)
+    new_id = repo.add({"customer_id": "CUST-X", "customer_name": "X", "risk_score": 10.0, "status": "NEW"})
+    assert new_id == top + 1
+    repo.add({"case_id": top + 10, "customer_id": "CUST-Y", "customer_name": "Y", "risk_score": 10.0, "status": "NEW"})
+    assert repo.add({"customer_id": "CUST-Z", "customer_name": "Z", "risk_score": 10.0, "status": "NEW"}) == top + 11
+
+
+def test_search_ignores_punctuation_like_postgres():
+    repo = InMemoryCaseRepository()
+    case_id = repo.add({"customer_id": "C1", "customer_name": "O'Brien-Smith Ltd.", "risk_score": 50.0, "status": "NEW"})
+    assert [c["case_id"] for c in repo.query(search="o'brien").items] == [case_id]
+    assert [c["case_id"] for c in repo.query(search="obriensmith ltd").items] == [case_id]
+    assert [c["case_id"] for c in repo.query(search="Ltd,").items] == [case_id]
+
+
+def test_update_rejects_status_changes():
+    repo = InMemoryCaseRepository(DEMO_CASES)
+    with pytest.raises(InvalidTransition):
+        repo.update(1, status="SAR_DRAFTED")
+    assert repo.get(1)["status"] == next(c["status"] for c in DEMO_CASES if c["case_id"] == 1)
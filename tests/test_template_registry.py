@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from backend.llm.registry import TemplateRegistry  # noqa: E402
+
+INDEX = """
+default = "generic"
+
+[jurisdictions]
+US = "fincen"
+"""
+
+
+def write_template(directory, template_id, version, name=None, sections=("SITUATION", "ASSESSMENT")):
+    path = directory / f"{template_id}.v{version}.toml"
+    path.write_text(
+        f'id = "{template_id}"\nversion = {version}\nname = "{name or template_id}"\n'
+        f"sections = {list(sections)!r}\nsystem = 'Draft a SAR.'\n".replace("'", '"')
+    )
+    return path
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "index.toml").write_text(INDEX)
+    write_template(tmp_path, "generic", 1)
+    write_template(tmp_path, "fincen", 1)
+    write_template(tmp_path, "fincen", 2, sections=("SITUATION", "NARRATIVE"))
+    return tmp_path
+
+
+def test_selects_by_jurisdiction(template_dir):
+    registry = TemplateRegistry(str(template_dir))
+    assert registry.select("us").key == "fincen@v2"
+    assert registry.select("FR").key == "generic@v1"
+    assert registry.select(None).key == "generic@v1"
+    assert registry.select("US").sections == ("SITUATION", "NARRATIVE")
+
+
+def test_resolve_pins_versions_and_rejects_unknown(template_dir):
+    registry = TemplateRegistry(str(template_dir))
+    assert registry.resolve("fincen@v1").key == "fincen@v1"
+    assert registry.resolve("fincen").key == "fincen@v2"
+    with pytest.raises(KeyError):
+        registry.resolve("fincen@v9")
+    with pytest.raises(KeyError):
+        registry.resolve("uk_nca@v1")
+
+
+def test_edited_file_is_recompiled(template_dir):
+    registry = TemplateRegistry(str(template_dir), reload_interval=0)
+    first = registry.get("generic")
+    assert registry.get("generic") is first  # compiled once
+
+    path = write_template(template_dir, "generic", 1, name="Generic SAR (revised)")
+    os.utime(path, (first.source_mtime + 5, first.source_mtime + 5))
+    assert registry.get("generic").name == "Generic SAR (revised)"
+
+
+def test_added_version_is_picked_up_after_rescan(template_dir):
+    registry = TemplateRegistry(str(template_dir), reload_interval=0)
+    write_template(template_dir, "generic", 2)
+    assert registry.select("FR").key == "generic@v2"
+
+
+def test_deleted_file_keeps_last_compiled_copy(template_dir):
+    registry = TemplateRegistry(str(template_dir), reload_interval=3600)
+    compiled = registry.get("fincen")
+    (template_dir / "fincen.v2.toml").unlink()
+    assert registry.get("fincen") is compiled
+
+
+def test_deleted_file_never_compiled_falls_back(template_dir):
+    registry = TemplateRegistry(str(template_dir), reload_interval=3600)
+    (template_dir / "fincen.v2.toml").unlink()
+    (template_dir / "generic.v1.toml").unlink()
+    assert registry.select("US").key == "fincen@v1"
+    with pytest.raises(KeyError):
+        registry.select("FR")
@@ -0,0 +1,23 @@
+from backend.explainability.trace import JSONLTraceStore
+
+
+def trace(case_id, n):
+    return {"trace_id": f"t-{case_id}-{n}", "case_id": case_id, "model_name": "m"}
+
+
+def test_versions_continue_across_reopen(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    store = JSONLTraceStore(path)
+    assert [store.append_trace(trace(1, i)) for i in range(2)] == [1, 2]
+    reopened = JSONLTraceStore(path)
+    assert reopened.append_trace(trace(1, 2)) == 3
+    assert [t["version"] for t in reopened.traces_for_case(1)] == [1, 2, 3]
+
+
+def test_reset_starts_a_fresh_log(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    JSONLTraceStore(path).append_trace(trace(1, 0))
+    fresh = JSONLTraceStore(path, reset=True)
+    assert fresh.traces_for_case(1) == []
+    assert fresh.append_trace(trace(1, 1)) == 1
+    assert (tmp_path / "traces.jsonl.prev").exists()